@@ -2,18 +2,18 @@
 
 import { type ReactNode, useEffect } from 'react';
 import { DataContextProvider, useDataContext } from '@/context/DataContext';
-import { useTransactions } from '@/hooks/useTransactions';
+import { useRollups } from '@/hooks/useTransactions';
 import { ChatWidget } from '@/components/ChatWidget';
 
-function TransactionLoader({ children }: { children: ReactNode }) {
-  const { raw, loading } = useTransactions();
-  const { setTransactions } = useDataContext();
+// Transaction rows are not loaded here: pages fetch their date range and the
+// chat fetches rows on demand when a tool needs them
+function RollupLoader({ children }: { children: ReactNode }) {
+  const { rollups } = useRollups();
+  const { setRollups } = useDataContext();
 
   useEffect(() => {
-    if (!loading && raw.length > 0) {
-      setTransactions(raw);
-    }
-  }, [loading, raw, setTransactions]);
+    setRollups(rollups);
+  }, [rollups, setRollups]);
 
   return <>{children}</>;
 }
@@ -21,10 +21,10 @@ function TransactionLoader({ children }: { children: ReactNode }) {
 export function ClientShell({ children }: { children: ReactNode }) {
   return (
     <DataContextProvider>
-      <TransactionLoader>
+      <RollupLoader>
         {children}
         <ChatWidget />
-      </TransactionLoader>
+      </RollupLoader>
     </DataContextProvider>
   );
 }
@@ -7,6 +7,7 @@ import { ForecastChart } from '@/components/dashboard/ForecastChart';
 import { formatCompact } from '@/lib/format';
 import { buildBowlingSummary } from '@/lib/build-data-summary';
 import { useDataContext } from '@/context/DataContext';
+import { fetchData } from '@/lib/data-url';
 
 interface SeasonalityData {
   byYearWeek: Record<string, Array<{ week: number; revenue: number }>>;
@@ -36,8 +37,8 @@ export default function BowlingPage() {
 
   useEffect(() => {
     Promise.all([
-      fetch('/data/bowling_seasonality.json').then(r => r.json()),
-      fetch('/data/bowling_forecast.json').then(r => r.json()),
+      fetchData('/data/bowling_seasonality.json').then(r => r.json()),
+      fetchData('/data/bowling_forecast.json').then(r => r.json()),
     ]).then(([s, f]) => {
       setSeasonality(s);
       setForecast(f);
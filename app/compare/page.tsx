@@ -1,9 +1,10 @@
 'use client';
 
 import { useState, useMemo, Suspense } from 'react';
-import { useTransactions, useSummary, useFilteredData, useModifiers, useModifierTransactions } from '@/hooks/useTransactions';
+import { useTransactions, useSummary, useFilteredData, useModifiers, useModifierTransactions, useRollups } from '@/hooks/useTransactions';
 import type { Filters } from '@/types';
 import { aggregateByPeriod, type PeriodGranularity } from '@/lib/aggregate-by-period';
+import { rollupByPeriod } from '@/lib/rollups';
 import { Nav } from '@/components/Nav';
 import { ComparisonPeriodPicker } from '@/components/dashboard/ComparisonPeriodPicker';
 import { ComparisonKpiCards } from '@/components/dashboard/ComparisonKpiCards';
@@ -31,13 +32,14 @@ function getDefaultPeriods(): { periodA: DateRange; periodB: DateRange } {
 }
 
 function CompareContent() {
-  const { raw, loading: txnLoading } = useTransactions();
   const { summary, loading: sumLoading } = useSummary();
   const { modifiers } = useModifiers();
   const { modifierTransactions, loading: modTxnLoading } = useModifierTransactions();
+  const { rollups } = useRollups();
 
   const [periodA, setPeriodA] = useState<DateRange>(() => getDefaultPeriods().periodA);
   const [periodB, setPeriodB] = useState<DateRange>(() => getDefaultPeriods().periodB);
+  const { raw, loading: txnLoading } = useTransactions(periodA, periodB);
   const [department, setDepartment] = useState('All');
   const [categories, setCategories] = useState<string[]>([]);
   const [granularity, setGranularity] = useState<PeriodGranularity>('week');
@@ -89,13 +91,19 @@ function CompareContent() {
   const filteredA = useFilteredData(sourceData, filtersA);
   const filteredB = useFilteredData(sourceData, filtersB);
 
+  // Period series from the rollup cube when exported (modifiers aren't in it)
+  const cube = department === 'Modifiers' ? null : rollups;
   const periodDataA = useMemo(
-    () => aggregateByPeriod(filteredA.filtered, granularity),
-    [filteredA.filtered, granularity]
+    () => cube
+      ? rollupByPeriod(cube, periodA, granularity, { department, categories })
+      : aggregateByPeriod(filteredA.filtered, granularity),
+    [cube, periodA, department, categories, filteredA.filtered, granularity]
   );
   const periodDataB = useMemo(
-    () => aggregateByPeriod(filteredB.filtered, granularity),
-    [filteredB.filtered, granularity]
+    () => cube
+      ? rollupByPeriod(cube, periodB, granularity, { department, categories })
+      : aggregateByPeriod(filteredB.filtered, granularity),
+    [cube, periodB, department, categories, filteredB.filtered, granularity]
   );
 
   const loading = txnLoading || sumLoading || (department === 'Modifiers' && modTxnLoading);
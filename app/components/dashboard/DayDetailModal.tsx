@@ -1,16 +1,20 @@
 'use client';
 
-import { useCallback, useEffect } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import { X } from 'lucide-react';
 import { formatCurrency, formatNumber } from '@/lib/format';
-import type { Transaction } from '@/types';
+import { useDayDetail } from '@/hooks/useDayDetail';
+import type { Filters, Transaction } from '@/types';
 
 interface Props {
   date: string;
-  items: Transaction[];
+  /** The day's rows when already in memory (Modifiers view, no filters) */
+  items?: Transaction[];
   totalRevenue: number;
   colors: Record<string, string>;
   onClose: () => void;
+  /** Explorer filters: load the day from the days/ export (or its partition) instead of items */
+  filters?: Filters;
 }
 
 const FALLBACK = '#10b981';
@@ -21,7 +25,14 @@ function formatDateLabel(dateStr: string): string {
   return `${monthNames[d.getMonth()]} ${d.getDate()}, ${d.getFullYear()}`;
 }
 
-export function DayDetailModal({ date, items, totalRevenue, colors, onClose }: Props) {
+export function DayDetailModal({ date, items = [], totalRevenue, colors, onClose, filters }: Props) {
+  const [showAll, setShowAll] = useState(false);
+  const { detail, loading } = useDayDetail(date, filters, showAll);
+  const rows = detail ? detail.items : items;
+  const revenue = detail ? detail.totalRevenue : totalRevenue;
+  const itemCount = detail ? detail.itemCount : items.length;
+  const transactions = detail ? detail.transactions : items.reduce((s, r) => s + r.transactions, 0);
+
   const handleBackdropClick = useCallback(
     (e: React.MouseEvent) => {
       if (e.target === e.currentTarget) onClose();
@@ -41,7 +52,7 @@ export function DayDetailModal({ date, items, totalRevenue, colors, onClose }: P
     return () => document.removeEventListener('keydown', handleEscape);
   }, [handleEscape]);
 
-  const sortedItems = [...items].sort((a, b) => b.revenue - a.revenue);
+  const sortedItems = [...rows].sort((a, b) => b.revenue - a.revenue);
 
   return (
     <div
@@ -60,8 +71,22 @@ export function DayDetailModal({ date, items, totalRevenue, colors, onClose }: P
         <div className="flex items-start justify-between gap-4 p-6 border-b border-[var(--color-border)]">
           <div>
             <h2 className="text-xl font-semibold text-white">{formatDateLabel(date)}</h2>
-            <p className="mt-1 text-sm text-accent font-mono">{formatCurrency(totalRevenue)} total sales</p>
-            <p className="mt-0.5 text-sm text-muted">{formatNumber(items.length)} item types · {formatNumber(items.reduce((s, r) => s + r.transactions, 0))} transactions</p>
+            <p className="mt-1 text-sm text-accent font-mono">{formatCurrency(revenue)} total sales</p>
+            <p className="mt-0.5 text-sm text-muted">
+              {formatNumber(itemCount)} item types · {formatNumber(transactions)} transactions
+              {rows.length < itemCount && (
+                <>
+                  {` · top ${formatNumber(rows.length)} shown · `}
+                  <button
+                    type="button"
+                    onClick={() => setShowAll(true)}
+                    className="text-accent hover:underline"
+                  >
+                    show all
+                  </button>
+                </>
+              )}
+            </p>
           </div>
           <button
             onClick={onClose}
@@ -84,6 +109,11 @@ export function DayDetailModal({ date, items, totalRevenue, colors, onClose }: P
               </tr>
             </thead>
             <tbody>
+              {loading && !detail && (
+                <tr>
+                  <td colSpan={5} className="py-6 px-4 text-center text-muted animate-pulse">Loading...</td>
+                </tr>
+              )}
               {sortedItems.map((row, i) => (
                 <tr key={`${row.name}-${row.category}-${i}`} className="border-b border-[var(--color-border)]/50">
                   <td className="py-2.5 px-4 text-white truncate max-w-[200px]">{row.name}</td>
@@ -14,7 +14,7 @@ import {
 } from 'recharts';
 import { formatCompact, formatCurrency, formatNumber } from '@/lib/format';
 import { useItemHistory, type HistoryGranularity } from '@/hooks/useItemHistory';
-import type { Transaction } from '@/types';
+import type { Filters, Transaction } from '@/types';
 
 interface ItemData {
   name: string;
@@ -26,6 +26,8 @@ interface ItemData {
 interface Props {
   item: ItemData;
   transactions: Transaction[];
+  /** Active filters; when set, history comes from the per-item series export. */
+  filters?: Filters;
   colors: Record<string, string>;
   onClose: () => void;
 }
@@ -84,10 +86,10 @@ function PeriodTooltip({
   );
 }
 
-export function ItemHistoryPanel({ item, transactions, colors, onClose }: Props) {
+export function ItemHistoryPanel({ item, transactions, filters, colors, onClose }: Props) {
   const [granularity, setGranularity] = useState<HistoryGranularity>('month');
   const [isFullscreen, setIsFullscreen] = useState(false);
-  const periodData = useItemHistory(transactions, item.name, granularity);
+  const periodData = useItemHistory(transactions, item.name, granularity, filters);
 
   const handleBackdropClick = useCallback(
     (e: React.MouseEvent) => {
@@ -3,13 +3,11 @@
 import { useState, useMemo } from 'react';
 import { ChevronLeft, ChevronRight } from 'lucide-react';
 import { formatCompact } from '@/lib/format';
-import type { Transaction } from '@/types';
 
 export interface DailyData {
   date: string;
   revenue: number;
   transactions: number;
-  items: Transaction[];
 }
 
 interface Props {
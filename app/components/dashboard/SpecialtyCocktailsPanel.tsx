@@ -12,6 +12,7 @@ import {
   Cell,
 } from 'recharts';
 import { formatCurrency } from '@/lib/format';
+import { fetchData } from '@/lib/data-url';
 
 interface ItemData {
   name: string;
@@ -59,7 +60,7 @@ export function SpecialtyCocktailsPanel({ items, colors }: Props) {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetch('/data/specialty_cocktails.json')
+    fetchData('/data/specialty_cocktails.json')
       .then((res) => res.json())
       .then((data: string[]) => {
         setSpecialtyNames(data || []);
@@ -1,39 +1,32 @@
 'use client';
 
-import { createContext, useContext, useState, useCallback, useRef, type ReactNode } from 'react';
-import type { Transaction } from '@/types';
+import { createContext, useContext, useState, useCallback, type ReactNode } from 'react';
+import type { RollupCube } from '@/lib/rollups';
 
 interface DataContextValue {
   summary: string;
   setDataSummary: (summary: string) => void;
-  transactions: Transaction[];
-  setTransactions: (txns: Transaction[]) => void;
+  rollups: RollupCube | null;
+  setRollups: (cube: RollupCube | null) => void;
 }
 
 const DataContext = createContext<DataContextValue>({
   summary: '',
   setDataSummary: () => {},
-  transactions: [],
-  setTransactions: () => {},
+  rollups: null,
+  setRollups: () => {},
 });
 
 export function DataContextProvider({ children }: { children: ReactNode }) {
   const [summary, setSummary] = useState('');
-  const [transactions, setTxns] = useState<Transaction[]>([]);
-  const loadedRef = useRef(false);
+  const [rollups, setRollups] = useState<RollupCube | null>(null);
 
   const setDataSummary = useCallback((s: string) => {
     setSummary(prev => prev === s ? prev : s);
   }, []);
 
-  const setTransactions = useCallback((txns: Transaction[]) => {
-    if (loadedRef.current) return;
-    loadedRef.current = true;
-    setTxns(txns);
-  }, []);
-
   return (
-    <DataContext.Provider value={{ summary, setDataSummary, transactions, setTransactions }}>
+    <DataContext.Provider value={{ summary, setDataSummary, rollups, setRollups }}>
       {children}
     </DataContext.Provider>
   );
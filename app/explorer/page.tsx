@@ -6,6 +6,7 @@ import { useTransactions, useSummary, useFilteredData, useModifiers, useModifier
 import type { Filters } from '@/types';
 import { getYTD } from '@/lib/date-ranges';
 import { buildExplorerSummary } from '@/lib/build-data-summary';
+import { rollupByPeriod } from '@/lib/rollups';
 import { useDataContext } from '@/context/DataContext';
 import { FilterBar } from '@/components/dashboard/FilterBar';
 import { KpiRow } from '@/components/dashboard/KpiRow';
@@ -24,9 +25,8 @@ import { Nav } from '@/components/Nav';
 function ExplorerContent() {
   const searchParams = useSearchParams();
   const initialDept = searchParams.get('dept') || 'All';
-  const { setDataSummary } = useDataContext();
+  const { setDataSummary, rollups } = useDataContext();
 
-  const { raw, loading: txnLoading } = useTransactions();
   const { summary, loading: sumLoading } = useSummary();
   const { modifiers } = useModifiers();
   const { modifierTransactions, loading: modTxnLoading } = useModifierTransactions();
@@ -37,6 +37,8 @@ function ExplorerContent() {
     categories: [],
     searchTerm: '',
   });
+  // Only the selected window's rows; the all-time calendar reads rollups.json
+  const { raw, loading: txnLoading } = useTransactions(filters.dateRange);
   const [selectedItem, setSelectedItem] = useState<ItemData | null>(null);
   const [selectedDate, setSelectedDate] = useState<string | null>(null);
   const [selectedCard, setSelectedCard] = useState<'category' | 'trends' | 'calendar' | null>(null);
@@ -74,7 +76,7 @@ function ExplorerContent() {
     return summary.departments[filters.department]?.categories || [];
   }, [summary, filters.department, modifiers]);
 
-  const { filtered, kpis, categoryBreakdown, weeklyTrends, topItems, dailyRevenue, dailyRevenueAllTime } =
+  const { filtered, kpis, categoryBreakdown, weeklyTrends, topItems, dailyRevenue } =
     useFilteredData(raw, filters);
 
   const modifierFiltered = useFilteredData(modifierTransactions, filters);
@@ -85,9 +87,18 @@ function ExplorerContent() {
   const displayCategoryBreakdown = isModifiersView ? modifierFiltered.categoryBreakdown : categoryBreakdown;
   const displayTopItems = isModifiersView ? modifierFiltered.topItems : topItems;
   const displayWeeklyTrends = isModifiersView ? modifierFiltered.weeklyTrends : weeklyTrends;
-  const displayDailyRevenueAllTime = isModifiersView ? modifierFiltered.dailyRevenueAllTime : dailyRevenueAllTime;
   const displayFiltered = isModifiersView ? modifierFiltered.filtered : filtered;
 
+  // All-time calendar: per-day totals from the rollup cube's day level. A
+  // search term needs item names, so the calendar then covers the loaded window.
+  const calendarDays = useMemo(() => {
+    if (isModifiersView) return modifierFiltered.dailyRevenueAllTime;
+    if (!rollups || filters.searchTerm) return dailyRevenue;
+    return rollupByPeriod(rollups, null, 'day', { department: filters.department, categories: filters.categories })
+      .map(p => ({ date: p.period, revenue: p.revenue, transactions: p.transactions }));
+  }, [isModifiersView, modifierFiltered.dailyRevenueAllTime, rollups, filters.searchTerm,
+      filters.department, filters.categories, dailyRevenue]);
+
   const summaryText = useMemo(() => {
     if (txnLoading || sumLoading) return '';
     return buildExplorerSummary({
@@ -178,7 +189,7 @@ function ExplorerContent() {
               }`}
             >
               <RevenueCalendarCard
-                dailyRevenue={displayDailyRevenueAllTime}
+                dailyRevenue={calendarDays}
                 dateRange={null}
                 department={filters.department}
                 onDayClick={(date) => {
@@ -211,21 +222,25 @@ function ExplorerContent() {
         <ItemHistoryPanel
           item={selectedItem}
           transactions={displayFiltered}
+          filters={isModifiersView ? undefined : filters}
           colors={categoryColors}
           onClose={() => setSelectedItem(null)}
         />
       )}
 
       {selectedDate && (() => {
-        const dayData = displayDailyRevenueAllTime.find(d => d.date === selectedDate);
-        const items = dayData?.items ?? [];
-        const totalRevenue = dayData?.revenue ?? items.reduce((s, r) => s + r.revenue, 0);
+        // The modal loads the day itself; only Modifiers rows (their own file) are passed in
+        const dayData = calendarDays.find(d => d.date === selectedDate);
+        const items = isModifiersView
+          ? modifierFiltered.dailyRevenueAllTime.find(d => d.date === selectedDate)?.items
+          : undefined;
         return (
           <DayDetailModal
             date={selectedDate}
             items={items}
-            totalRevenue={totalRevenue}
+            totalRevenue={dayData?.revenue ?? 0}
             colors={categoryColors}
+            filters={isModifiersView ? undefined : filters}
             onClose={() => setSelectedDate(null)}
           />
         );
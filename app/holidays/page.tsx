@@ -7,6 +7,7 @@ import { DepartmentFilter } from '@/components/dashboard/DepartmentFilter';
 import { HolidayRanking } from '@/components/dashboard/HolidayRanking';
 import { HolidayYoYTable } from '@/components/dashboard/HolidayYoYTable';
 import { HolidayComparisonChart } from '@/components/dashboard/HolidayComparisonChart';
+import { fetchData } from '@/lib/data-url';
 
 interface HolidayYearData {
   year: number;
@@ -35,7 +36,7 @@ export default function HolidaysPage() {
   const [department, setDepartment] = useState<string>('All');
 
   useEffect(() => {
-    fetch('/data/holiday_analysis.json')
+    fetchData('/data/holiday_analysis.json')
       .then((r) => {
         if (!r.ok) throw new Error(`Failed to load (${r.status})`);
         return r.json();
@@ -2,6 +2,7 @@
 
 import { useState, useCallback, useRef } from 'react';
 import { useDataContext } from '@/context/DataContext';
+import { loadTransactions } from '@/hooks/useTransactions';
 import { executeToolCall } from '@/lib/query-tools';
 
 export interface ChatMessage {
@@ -16,7 +17,7 @@ export function useChat() {
   const [status, setStatus] = useState<ChatStatus>('idle');
   const [error, setError] = useState<string | null>(null);
   const abortRef = useRef<AbortController | null>(null);
-  const { summary: dataContext, transactions } = useDataContext();
+  const { summary: dataContext, rollups } = useDataContext();
 
   const send = useCallback(async (userMessage: string) => {
     const trimmed = userMessage.trim();
@@ -63,23 +64,24 @@ export function useChat() {
             function: { name: string; arguments: string };
           }>;
 
-          const toolResults = toolCalls.map(call => {
+          const toolResults = await Promise.all(toolCalls.map(async call => {
             let args: Record<string, unknown>;
             try {
               args = JSON.parse(call.function.arguments);
             } catch {
               args = {};
             }
-            const result = executeToolCall(
+            const result = await executeToolCall(
               { name: call.function.name, arguments: args },
-              transactions
+              loadTransactions,
+              rollups
             );
             return {
               role: 'tool' as const,
               tool_call_id: call.id,
               content: result,
             };
-          });
+          }));
 
           apiMessages = [...apiMessages, response.message, ...toolResults];
           continue;
@@ -101,7 +103,7 @@ export function useChat() {
       setStatus('idle');
       abortRef.current = null;
     }
-  }, [messages, status, dataContext, transactions]);
+  }, [messages, status, dataContext, rollups]);
 
   const clear = useCallback(() => {
     abortRef.current?.abort();
@@ -0,0 +1,59 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+import type { Filters, Transaction } from '@/types';
+import { dayDetailFromRows, loadDayDetail, type DayDetail } from '@/lib/day-detail';
+import { loadTransactions } from '@/hooks/useTransactions';
+
+/** The day's rows matching filters (same matching as useFilteredData). */
+function matchingRows(rows: Transaction[], date: string, filters: Filters): Transaction[] {
+  const term = filters.searchTerm.toLowerCase();
+  return rows.filter(r =>
+    r.date === date &&
+    (!filters.department || filters.department === 'All' || r.department === filters.department) &&
+    (filters.categories.length === 0 || filters.categories.includes(r.category)) &&
+    (!term || r.name.toLowerCase().includes(term))
+  );
+}
+
+/**
+ * A calendar day's detail restricted to the Explorer filters, without
+ * needing any rows in memory: from the days/ export bundle, or from the
+ * day's month partition when every item is wanted (all), there is a search
+ * term (names aren't all in the export) or the export has no record of the
+ * day. Without filters (Modifiers view) detail stays null and callers use
+ * their rows.
+ */
+export function useDayDetail(date: string | null, filters?: Filters, all = false) {
+  const [detail, setDetail] = useState<DayDetail | null>(null);
+  const [loading, setLoading] = useState(false);
+  const enabled = filters !== undefined;
+  const department = filters?.department ?? 'All';
+  const categories = filters?.categories;
+  const searchTerm = filters?.searchTerm ?? '';
+
+  useEffect(() => {
+    setDetail(null);
+    if (!date || !enabled) return;
+    let cancelled = false;
+    setLoading(true);
+    const bundle = all || searchTerm
+      ? Promise.resolve(null)
+      : loadDayDetail(date, { department, categories }).catch(() => null);
+    bundle
+      .then(data => data ?? loadTransactions([[date, date]]).then(rows =>
+        dayDetailFromRows(matchingRows(rows, date, { department, categories: categories || [], searchTerm, dateRange: null }))
+      ))
+      .catch(() => null)
+      .then((data) => {
+        if (cancelled) return;
+        setDetail(data);
+        setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [date, enabled, department, categories, searchTerm, all]);
+
+  return { detail, loading };
+}
@@ -1,7 +1,8 @@
 'use client';
 
-import { useMemo } from 'react';
-import type { Transaction } from '@/types';
+import { useEffect, useMemo, useState } from 'react';
+import type { Filters, Transaction } from '@/types';
+import { loadItemIndex, loadItemSeries, matchItemNames, seriesPeriods } from '@/lib/item-series';
 
 export type HistoryGranularity = 'month' | 'week' | 'day';
 
@@ -20,13 +21,49 @@ function getWeekStart(dateStr: string): string {
   return dt.toISOString().slice(0, 10);
 }
 
+/**
+ * Item history by period. With filters (transaction rows, not modifiers), the
+ * series come from the sharded items/ export clipped to the filters; without
+ * them, or when the export has no item index, transactions are scanned.
+ */
 export function useItemHistory(
   transactions: Transaction[],
   itemName: string | null,
-  granularity: HistoryGranularity = 'month'
+  granularity: HistoryGranularity = 'month',
+  filters?: Filters
 ): PeriodData[] {
-  return useMemo(() => {
-    if (!itemName) return [];
+  // undefined = still loading, null = not in the item index (scan instead)
+  const seriesEnabled = filters !== undefined;
+  const [fromSeries, setFromSeries] = useState<PeriodData[] | null | undefined>(seriesEnabled ? undefined : null);
+  const department = filters?.department;
+  const dateRange = filters?.dateRange;
+  const categories = filters?.categories;
+
+  useEffect(() => {
+    if (!itemName || !seriesEnabled) {
+      setFromSeries(null);
+      return;
+    }
+    let cancelled = false;
+    setFromSeries(undefined);
+    loadItemIndex()
+      .then(async (index) => {
+        const names = index ? matchItemNames(index, itemName) : [];
+        if (!index || names.length === 0) return null;
+        const series = await loadItemSeries(index, names, { department, categories });
+        return seriesPeriods(index, series, granularity, dateRange);
+      })
+      .catch(() => null)
+      .then((periods) => {
+        if (!cancelled) setFromSeries(periods);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [itemName, granularity, seriesEnabled, department, dateRange, categories]);
+
+  const scanned = useMemo(() => {
+    if (!itemName || fromSeries !== null) return [];
 
     const data = transactions.filter(
       (r) => r.name.toLowerCase() === itemName.toLowerCase()
@@ -56,5 +93,7 @@ export function useItemHistory(
     return Array.from(map.entries())
       .map(([period, d]) => ({ period, ...d }))
       .sort((a, b) => a.period.localeCompare(b.period));
-  }, [transactions, itemName, granularity]);
+  }, [transactions, itemName, granularity, fromSeries]);
+
+  return fromSeries || scanned;
 }
@@ -2,18 +2,86 @@
 
 import { useState, useEffect, useMemo } from 'react';
 import type { Transaction, Summary, Filters } from '@/types';
+import { toTransactions } from '@/lib/columnar';
+import type { RollupCube } from '@/lib/rollups';
+import { fetchData } from '@/lib/data-url';
 
-const LOAD_TIMEOUT_MS = 60000; // 60 seconds for large transactions.json
+const LOAD_TIMEOUT_MS = 60000; // 60 seconds for the full-history fallback
+const PARTITION_TIMEOUT_MS = 30000;
 
 function fetchWithTimeout(url: string, timeout = LOAD_TIMEOUT_MS): Promise<Response> {
   return Promise.race([
-    fetch(url),
+    fetchData(url),
     new Promise<never>((_, reject) =>
       setTimeout(() => reject(new Error('Load timeout')), timeout)
     ),
   ]);
 }
 
+/** One year/month slice of transactions.json (see export_dashboards.export_transaction_partitions). */
+export interface TransactionPartition {
+  key: string;
+  path: string;
+  dateRange: [string, string];
+  rows: number;
+  bytes: number;
+  sha256: string;
+}
+
+export interface TransactionManifest {
+  generatedAt: string;
+  dateRange: [string, string];
+  rows: number;
+  format: string;
+  partitions: TransactionPartition[];
+}
+
+// Shared across hooks and pages so each partition is downloaded once per session
+let manifestPromise: Promise<TransactionManifest | null> | null = null;
+const partitionCache = new Map<string, Promise<Transaction[]>>();
+
+function loadManifest(): Promise<TransactionManifest | null> {
+  if (!manifestPromise) {
+    // Missing manifest (older export): fall back to the single transactions.json
+    manifestPromise = fetchWithTimeout('/data/transactions/manifest.json', 15000)
+      .then((res) => (res.ok ? res.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+function loadRows(url: string, timeout: number): Promise<Transaction[]> {
+  let rows = partitionCache.get(url);
+  if (!rows) {
+    rows = fetchWithTimeout(url, timeout)
+      .then((res) => {
+        if (!res.ok) throw new Error(`Failed to load (${res.status})`);
+        return res.json();
+      })
+      .then(toTransactions);
+    rows.catch(() => partitionCache.delete(url));
+    partitionCache.set(url, rows);
+  }
+  return rows;
+}
+
+function overlaps(partition: TransactionPartition, ranges: [string, string][]): boolean {
+  const [first, last] = partition.dateRange;
+  return ranges.some(([start, end]) => first <= end && last >= start);
+}
+
+/** Rows of the partitions overlapping ranges (null = full history); each partition is fetched once. */
+export async function loadTransactions(ranges: [string, string][] | null): Promise<Transaction[]> {
+  const manifest = await loadManifest();
+  if (!manifest) return loadRows('/data/transactions.json', LOAD_TIMEOUT_MS);
+  const wanted = manifest.partitions.filter(p => !ranges || overlaps(p, ranges));
+  // Content hash in the URL: unchanged months stay cacheable across exports
+  const chunks = await Promise.all(
+    wanted.map(p => loadRows(`/data/${p.path}?v=${p.sha256.slice(0, 12)}`, PARTITION_TIMEOUT_MS))
+  );
+  return chunks.flat();
+}
+
 export function useSummary() {
   const [summary, setSummary] = useState<Summary | null>(null);
   const [loading, setLoading] = useState(true);
@@ -34,22 +102,32 @@ export function useSummary() {
   return { summary, loading };
 }
 
-export function useTransactions() {
+/**
+ * Transaction rows covering the given date ranges (only those months'
+ * partitions are fetched). No ranges, or any null range, loads the full history.
+ */
+export function useTransactions(...ranges: ([string, string] | null | undefined)[]) {
   const [raw, setRaw] = useState<Transaction[]>([]);
   const [loading, setLoading] = useState(true);
+  const windowKey = ranges.length === 0 || ranges.some(r => !r) ? 'all' : JSON.stringify(ranges);
 
   useEffect(() => {
-    fetchWithTimeout('/data/transactions.json')
-      .then((res) => {
-        if (!res.ok) throw new Error(`Failed to load (${res.status})`);
-        return res.json();
-      })
-      .then((data: Transaction[]) => {
+    let cancelled = false;
+    setLoading(true);
+    const windows: [string, string][] | null = windowKey === 'all' ? null : JSON.parse(windowKey);
+    loadTransactions(windows)
+      .then((data) => {
+        if (cancelled) return;
         setRaw(data);
         setLoading(false);
       })
-      .catch(() => setLoading(false));
-  }, []);
+      .catch(() => {
+        if (!cancelled) setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [windowKey]);
 
   return { raw, loading };
 }
@@ -88,19 +166,38 @@ export function useModifierTransactions() {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetchWithTimeout('/data/modifier_transactions.json', 60000)
+    // Compact columnar file first; older exports only have the row array
+    loadRows('/data/modifier_transactions.columnar.json', 15000)
+      .catch(() => loadRows('/data/modifier_transactions.json', 60000))
+      .then((rows) => {
+        setData(rows);
+        setLoading(false);
+      })
+      .catch(() => setLoading(false));
+  }, []);
+
+  return { modifierTransactions: data, loading };
+}
+
+/** Precomputed period x department x category cube; null when not exported. */
+export function useRollups() {
+  const [rollups, setRollups] = useState<RollupCube | null>(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    fetchWithTimeout('/data/rollups.json', 15000)
       .then((res) => {
         if (!res.ok) throw new Error(`Failed to load (${res.status})`);
         return res.json();
       })
-      .then((rows: Transaction[]) => {
-        setData(Array.isArray(rows) ? rows : []);
+      .then((data: RollupCube) => {
+        setRollups(data.format === 'rollup-v1' ? data : null);
         setLoading(false);
       })
       .catch(() => setLoading(false));
   }, []);
 
-  return { modifierTransactions: data, loading };
+  return { rollups, loading };
 }
 
 export function useFilteredData(raw: Transaction[], filters: Filters) {
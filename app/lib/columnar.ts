@@ -0,0 +1,62 @@
+import type { Transaction } from '@/types';
+
+/**
+ * Decoder for the compact columnar export (scripts/columnar_export.py):
+ * string dictionaries + parallel integer arrays instead of an array of objects.
+ */
+export const COLUMNAR_FORMAT = 'columnar-v1';
+
+type StringField = 'name' | 'department' | 'subdepartment' | 'category';
+const DAY_MS = 86400000;
+
+export interface ColumnarTransactions {
+  format: typeof COLUMNAR_FORMAT;
+  rows: number;
+  epoch: string;
+  dictionaries: Record<StringField, string[]>;
+  columns: Record<StringField | 'day' | 'quantity' | 'revenueCents' | 'transactions', number[]>;
+  rawDates?: Record<string, string>;
+}
+
+export function isColumnar(data: unknown): data is ColumnarTransactions {
+  return typeof data === 'object' && data !== null && (data as { format?: string }).format === COLUMNAR_FORMAT;
+}
+
+/** Expand a columnar payload into Transaction rows (original row order). */
+export function decodeColumnar(data: ColumnarTransactions): Transaction[] {
+  const { columns, dictionaries, rawDates = {} } = data;
+  const epochMs = Date.parse(data.epoch + 'T00:00:00Z');
+  const dayStrings = new Map<number, string>();
+  const rows: Transaction[] = new Array(data.rows);
+
+  for (let i = 0; i < data.rows; i++) {
+    const day = columns.day[i];
+    let date: string;
+    if (day < 0) {
+      date = rawDates[String(i)] ?? '';
+    } else {
+      date = dayStrings.get(day) ?? '';
+      if (!date) {
+        date = new Date(epochMs + day * DAY_MS).toISOString().slice(0, 10);
+        dayStrings.set(day, date);
+      }
+    }
+    rows[i] = {
+      date,
+      name: dictionaries.name[columns.name[i]],
+      department: dictionaries.department[columns.department[i]],
+      subdepartment: dictionaries.subdepartment[columns.subdepartment[i]],
+      category: dictionaries.category[columns.category[i]],
+      quantity: columns.quantity[i],
+      revenue: columns.revenueCents[i] / 100,
+      transactions: columns.transactions[i],
+    };
+  }
+  return rows;
+}
+
+/** Rows from either payload shape: columnar or a plain Transaction array. */
+export function toTransactions(data: unknown): Transaction[] {
+  if (isColumnar(data)) return decodeColumnar(data);
+  return Array.isArray(data) ? (data as Transaction[]) : [];
+}
@@ -0,0 +1,41 @@
+/**
+ * Resolve /data/ URLs to the content-hashed copies listed in
+ * /data/asset-manifest.json (scripts/publish.py). Hashed files never change
+ * and are served immutable, so only files whose content changed since the
+ * last visit are downloaded again. Without a manifest (or for files it
+ * doesn't list) the plain URL is used.
+ */
+interface AssetManifest {
+  generatedAt: string;
+  files: Record<string, { hashed: string; sha256: string; bytes: number }>;
+}
+
+const MANIFEST_TIMEOUT_MS = 10000;
+
+let manifestPromise: Promise<AssetManifest | null> | null = null;
+
+function loadAssetManifest(): Promise<AssetManifest | null> {
+  if (!manifestPromise) {
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), MANIFEST_TIMEOUT_MS);
+    manifestPromise = fetch('/data/asset-manifest.json', { cache: 'no-cache', signal: controller.signal })
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null)
+      .finally(() => clearTimeout(timer));
+  }
+  return manifestPromise;
+}
+
+/** '/data/summary.json' -> '/data/hashed/summary.<hash>.json' when published. */
+export async function dataUrl(url: string): Promise<string> {
+  if (!url.startsWith('/data/')) return url;
+  const path = url.slice('/data/'.length).split('?')[0];
+  const manifest = await loadAssetManifest();
+  const entry = manifest?.files?.[path];
+  return entry ? `/data/${entry.hashed}` : url;
+}
+
+/** fetch() through dataUrl. */
+export async function fetchData(url: string, init?: RequestInit): Promise<Response> {
+  return fetch(await dataUrl(url), init);
+}
@@ -0,0 +1,138 @@
+import type { Transaction } from '@/types';
+import { fetchJson } from './item-series';
+
+/**
+ * Per-day detail written by export_dashboards.export_day_details:
+ * days/YYYY/MM.json month bundles hold each day's department and category
+ * totals (cents), its top items per department and its adjustment & refund
+ * rows; days/index.json lists the bundles. Opening a calendar day is one
+ * bundle fetch instead of needing every transaction row loaded.
+ */
+export const DAY_DETAIL_FORMAT = 'day-detail-v1';
+export const DEDUCTION_NAME = '[Adjustments & Refunds]';
+
+type Totals = [revenueCents: number, quantity: number, transactions: number, items: number];
+
+interface DayRecord {
+  departments: [department: number, ...totals: Totals][];
+  categories: [department: number, category: number, ...totals: Totals][];
+  items: [name: number, department: number, category: number, revenueCents: number, quantity: number, transactions: number][];
+  deductions: [department: number, revenueCents: number][];
+}
+
+interface DayBundle {
+  format: typeof DAY_DETAIL_FORMAT;
+  month: string;
+  names: string[];
+  departments: string[];
+  categories: string[];
+  days: Record<string, DayRecord>;
+}
+
+interface DayMonthInfo {
+  month: string;
+  path: string;
+  dateRange: [string, string];
+  days: number;
+  bytes: number;
+  sha256: string;
+}
+
+export interface DayIndex {
+  format: typeof DAY_DETAIL_FORMAT;
+  generatedAt: string;
+  topItems: number;
+  dateRange: [string, string] | [];
+  months: DayMonthInfo[];
+}
+
+export interface DayDetailFilter {
+  department?: string;   // undefined or 'All' = every department
+  categories?: string[]; // empty = every category
+}
+
+export interface DayDetail {
+  items: Transaction[]; // top items plus adjustment rows matching the filter
+  totalRevenue: number;
+  itemCount: number;    // every matching row of the day, not just those listed
+  transactions: number;
+}
+
+let indexPromise: Promise<DayIndex | null> | null = null;
+const bundleCache = new Map<string, Promise<DayBundle>>();
+
+/** days/index.json, fetched once; null when the export doesn't have it. */
+export function loadDayIndex(): Promise<DayIndex | null> {
+  if (!indexPromise) {
+    indexPromise = fetchJson<DayIndex>('/data/days/index.json')
+      .then(data => (data.format === DAY_DETAIL_FORMAT ? data : null))
+      .catch(() => null);
+  }
+  return indexPromise;
+}
+
+function loadBundle(info: DayMonthInfo): Promise<DayBundle> {
+  let pending = bundleCache.get(info.month);
+  if (!pending) {
+    pending = fetchJson<DayBundle>(`/data/${info.path}?v=${info.sha256.slice(0, 12)}`);
+    pending.catch(() => bundleCache.delete(info.month));
+    bundleCache.set(info.month, pending);
+  }
+  return pending;
+}
+
+/** One day's detail restricted to filter (same matching as useFilteredData). */
+function dayDetail(bundle: DayBundle, date: string, day: DayRecord, filter: DayDetailFilter): DayDetail {
+  const cats = filter.categories || [];
+  const deptOk = (d: string) => !filter.department || filter.department === 'All' || d === filter.department;
+  const catOk = (c: string) => cats.length === 0 || cats.includes(c);
+  const row = (name: string, department: string, category: string, cents: number, quantity: number, transactions: number): Transaction =>
+    ({ date, name, department, subdepartment: '', category, quantity, revenue: cents / 100, transactions });
+
+  let cents = 0;
+  let itemCount = 0;
+  let transactions = 0;
+  const totals = cats.length === 0
+    ? day.departments.map(([d, ...t]) => ({ dept: bundle.departments[d], cat: '', t }))
+    : day.categories.map(([d, c, ...t]) => ({ dept: bundle.departments[d], cat: bundle.categories[c], t }));
+  for (const { dept, cat, t } of totals) {
+    if (!deptOk(dept) || (cat && !catOk(cat))) continue;
+    cents += t[0];
+    transactions += t[2];
+    itemCount += t[3];
+  }
+
+  const items = day.items
+    .filter(([, d, c]) => deptOk(bundle.departments[d]) && catOk(bundle.categories[c]))
+    .map(([n, d, c, rev, qty, txns]) => row(bundle.names[n], bundle.departments[d], bundle.categories[c], rev, qty, txns));
+
+  // Adjustment rows use the department as their category
+  for (const [d, rev] of day.deductions) {
+    const dept = bundle.departments[d];
+    if (!deptOk(dept) || !catOk(dept)) continue;
+    cents += rev;
+    itemCount += 1;
+    items.push(row(DEDUCTION_NAME, dept, dept, rev, 0, 0));
+  }
+  return { items, totalRevenue: cents / 100, itemCount, transactions };
+}
+
+/** Detail listing every one of a day's rows (already filtered), for when the bundle can't answer. */
+export function dayDetailFromRows(rows: Transaction[]): DayDetail {
+  return {
+    items: rows,
+    totalRevenue: rows.reduce((s, r) => s + r.revenue, 0),
+    itemCount: rows.length,
+    transactions: rows.reduce((s, r) => s + r.transactions, 0),
+  };
+}
+
+/** Detail for date (YYYY-MM-DD); null when the export has no record of that day. */
+export async function loadDayDetail(date: string, filter: DayDetailFilter = {}): Promise<DayDetail | null> {
+  const index = await loadDayIndex();
+  const info = index?.months.find(m => date >= m.dateRange[0] && date <= m.dateRange[1]);
+  if (!info) return null;
+  const bundle = await loadBundle(info);
+  const day = bundle.days[date];
+  return day ? dayDetail(bundle, date, day, filter) : null;
+}
@@ -0,0 +1,115 @@
+import { fetchJson } from './item-series';
+
+/**
+ * Item-name search over item_search.json (export_dashboards.item_search_index):
+ * candidate items come from the trigram postings of the query and are then
+ * checked with the same name.toLowerCase().includes(query) test the row scan
+ * uses, so results match it without touching transaction rows.
+ */
+export const ITEM_SEARCH_FORMAT = 'item-search-v1';
+
+export interface ItemSearchIndex {
+  format: typeof ITEM_SEARCH_FORMAT;
+  generatedAt: string;
+  items: {
+    name: string[];
+    normalized: string[];
+    department: string[];
+    category: string[];
+    revenueCents: number[];
+    quantity: number[];
+    transactions: number[];
+  };
+  trigrams: Record<string, number[]>;
+}
+
+export interface ItemSearchFilter {
+  department?: string; // undefined or 'All' = every department
+  category?: string;
+}
+
+export interface ItemTotals {
+  name: string;
+  department: string;
+  category: string;
+  revenue: number;
+  quantity: number;
+  transactions: number;
+}
+
+let indexPromise: Promise<ItemSearchIndex | null> | null = null;
+
+/** item_search.json, fetched once; null when the export doesn't have it. */
+export function loadItemSearchIndex(): Promise<ItemSearchIndex | null> {
+  if (!indexPromise) {
+    indexPromise = fetchJson<ItemSearchIndex>('/data/item_search.json')
+      .then(data => (data.format === ITEM_SEARCH_FORMAT ? data : null))
+      .catch(() => null);
+  }
+  return indexPromise;
+}
+
+/** Intersect two ascending id lists. */
+function intersect(a: number[], b: number[]): number[] {
+  const out: number[] = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      out.push(a[i]);
+      i++;
+      j++;
+    } else if (a[i] < b[j]) i++;
+    else j++;
+  }
+  return out;
+}
+
+/** Ids of items whose normalized name contains query (lowercased). */
+export function matchItemIds(index: ItemSearchIndex, query: string): number[] {
+  const q = query.toLowerCase();
+  const { normalized } = index.items;
+
+  // Short queries (and surrogate pairs, which the exporter counts differently) can't use trigrams
+  let candidates: number[] | null = null;
+  if (q.length >= 3 && !/[\uD800-\uDFFF]/.test(q)) {
+    const grams = new Set<string>();
+    for (let i = 0; i + 3 <= q.length; i++) grams.add(q.slice(i, i + 3));
+    const lists = Array.from(grams, g => index.trigrams[g] || []).sort((a, b) => a.length - b.length);
+    candidates = lists.reduce(intersect);
+  }
+
+  const ids = candidates ?? normalized.map((_, i) => i);
+  return ids.filter(i => normalized[i].includes(q));
+}
+
+/**
+ * All-time totals per item name for names containing query, grouped like
+ * the row scan: department / category from the item's first matching row,
+ * names in order of first appearance.
+ */
+export function searchItemTotals(index: ItemSearchIndex, query: string, filter: ItemSearchFilter = {}): ItemTotals[] {
+  const { items } = index;
+  const dept = filter.department && filter.department !== 'All' ? filter.department.toLowerCase() : null;
+  const cat = filter.category ? filter.category.toLowerCase() : null;
+
+  const byName = new Map<string, ItemTotals>();
+  for (const i of matchItemIds(index, query)) {
+    if (dept !== null && items.department[i].toLowerCase() !== dept) continue;
+    if (cat !== null && items.category[i].toLowerCase() !== cat) continue;
+    const name = items.name[i];
+    const entry = byName.get(name) || {
+      name,
+      department: items.department[i],
+      category: items.category[i],
+      revenue: 0,
+      quantity: 0,
+      transactions: 0,
+    };
+    entry.revenue += items.revenueCents[i];
+    entry.quantity += items.quantity[i];
+    entry.transactions += items.transactions[i];
+    byName.set(name, entry);
+  }
+  return Array.from(byName.values(), e => ({ ...e, revenue: e.revenue / 100 }));
+}
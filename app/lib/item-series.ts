@@ -0,0 +1,163 @@
+import { fetchData } from './data-url';
+
+/**
+ * Per-item series written by export_dashboards.export_item_series:
+ * items/index.json maps each item name to [shard, offset, department,
+ * category] entries; items/shards/NN.json holds the daily and weekly (Monday)
+ * series. Opening an item's history is one shard fetch instead of a scan of
+ * every transaction row.
+ */
+export const ITEM_SERIES_FORMAT = 'item-series-v1';
+
+export type ItemGranularity = 'day' | 'week' | 'month';
+
+export interface SeriesColumns {
+  day: number[]; // days since epoch (weekly: the week's Monday)
+  revenueCents: number[];
+  quantity: number[];
+  transactions: number[];
+}
+
+export interface ItemSeries {
+  name: string;
+  department: string;
+  category: string;
+  daily: SeriesColumns;
+  weekly: SeriesColumns;
+}
+
+interface ItemShardInfo {
+  shard: number;
+  path: string;
+  items: number;
+  bytes: number;
+  sha256: string;
+}
+
+type IndexEntry = [shard: number, offset: number, department: string, category: string];
+
+export interface ItemIndex {
+  format: typeof ITEM_SERIES_FORMAT;
+  generatedAt: string;
+  epoch: string;
+  shards: ItemShardInfo[];
+  items: Record<string, IndexEntry[]>;
+}
+
+export interface ItemPeriod {
+  period: string;
+  revenue: number;
+  quantity: number;
+  transactions: number;
+}
+
+export interface ItemSeriesFilter {
+  department?: string;   // undefined or 'All' = every department
+  categories?: string[]; // empty = every category
+}
+
+const DAY_MS = 86400000;
+const INDEX_TIMEOUT_MS = 15000;
+
+let indexPromise: Promise<ItemIndex | null> | null = null;
+const shardCache = new Map<number, Promise<ItemSeries[]>>();
+
+/** GET url as JSON with a timeout (shared by the item index loaders). */
+export async function fetchJson<T>(url: string): Promise<T> {
+  const controller = new AbortController();
+  const timer = setTimeout(() => controller.abort(), INDEX_TIMEOUT_MS);
+  try {
+    const res = await fetchData(url, { signal: controller.signal });
+    if (!res.ok) throw new Error(`Failed to load (${res.status})`);
+    return (await res.json()) as T;
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
+/** items/index.json, fetched once; null when the export doesn't have it. */
+export function loadItemIndex(): Promise<ItemIndex | null> {
+  if (!indexPromise) {
+    indexPromise = fetchJson<ItemIndex>('/data/items/index.json')
+      .then(data => (data.format === ITEM_SERIES_FORMAT ? data : null))
+      .catch(() => null);
+  }
+  return indexPromise;
+}
+
+function loadShard(index: ItemIndex, shard: number): Promise<ItemSeries[]> {
+  let pending = shardCache.get(shard);
+  if (!pending) {
+    const info = index.shards.find(s => s.shard === shard);
+    if (!info) return Promise.resolve([]);
+    pending = fetchJson<{ items: ItemSeries[] }>(`/data/${info.path}?v=${info.sha256.slice(0, 12)}`)
+      .then(data => data.items);
+    pending.catch(() => shardCache.delete(shard));
+    shardCache.set(shard, pending);
+  }
+  return pending;
+}
+
+function entryMatches(entry: IndexEntry, filter: ItemSeriesFilter): boolean {
+  const [, , department, category] = entry;
+  if (filter.department && filter.department !== 'All'
+      && department.toLowerCase() !== filter.department.toLowerCase()) return false;
+  const cats = filter.categories || [];
+  return cats.length === 0 || cats.includes(category);
+}
+
+/** Index names matching an exact (case-insensitive) name, or a substring. */
+export function matchItemNames(index: ItemIndex, query: string, substring = false): string[] {
+  const q = query.toLowerCase();
+  return Object.keys(index.items).filter(name =>
+    substring ? name.toLowerCase().includes(q) : name.toLowerCase() === q
+  );
+}
+
+/** Series for the given item names, restricted to matching departments/categories. */
+export async function loadItemSeries(
+  index: ItemIndex,
+  names: string[],
+  filter: ItemSeriesFilter = {}
+): Promise<ItemSeries[]> {
+  const entries = names.flatMap(name => (index.items[name] || []).filter(e => entryMatches(e, filter)));
+  const shards = await Promise.all(entries.map(([shard]) => loadShard(index, shard)));
+  return entries.map(([, offset], i) => shards[i][offset]).filter(Boolean);
+}
+
+/**
+ * Sum series into sorted periods (day / Monday week / month), optionally
+ * clipped to [start, end]. Uses the weekly series when no range is given.
+ */
+export function seriesPeriods(
+  index: ItemIndex,
+  series: ItemSeries[],
+  granularity: ItemGranularity,
+  range?: [string, string] | null
+): ItemPeriod[] {
+  const epochMs = Date.parse(index.epoch + 'T00:00:00Z');
+  const dayString = (day: number) => new Date(epochMs + day * DAY_MS).toISOString().slice(0, 10);
+  const useWeekly = granularity === 'week' && !range;
+
+  const map = new Map<string, { cents: number; quantity: number; transactions: number }>();
+  for (const s of series) {
+    const cols = useWeekly ? s.weekly : s.daily;
+    for (let i = 0; i < cols.day.length; i++) {
+      const date = dayString(cols.day[i]);
+      if (range && (date < range[0] || date > range[1])) continue;
+      let key = date;
+      if (granularity === 'month') key = date.slice(0, 7);
+      else if (granularity === 'week' && !useWeekly) {
+        key = dayString(cols.day[i] - ((new Date(date + 'T00:00:00Z').getUTCDay() + 6) % 7));
+      }
+      const entry = map.get(key) || { cents: 0, quantity: 0, transactions: 0 };
+      entry.cents += cols.revenueCents[i];
+      entry.quantity += cols.quantity[i];
+      entry.transactions += cols.transactions[i];
+      map.set(key, entry);
+    }
+  }
+  return Array.from(map.entries())
+    .map(([period, e]) => ({ period, revenue: e.cents / 100, quantity: e.quantity, transactions: e.transactions }))
+    .sort((a, b) => a.period.localeCompare(b.period));
+}
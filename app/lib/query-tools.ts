@@ -1,11 +1,22 @@
 import type { Transaction } from '@/types';
 import { formatCurrency, formatNumber, formatPercent } from './format';
+import { rollupByCategory, rollupRange, rollupTotals, type RollupCube } from './rollups';
+import { loadItemIndex, loadItemSeries, matchItemNames, seriesPeriods } from './item-series';
+import { loadItemSearchIndex, matchItemIds, searchItemTotals } from './item-search';
 
 interface ToolCall {
   name: string;
   arguments: Record<string, unknown>;
 }
 
+/** Transaction rows covering ranges (null = full history), e.g. useTransactions' loadTransactions. */
+export type TransactionLoader = (ranges: [string, string][] | null) => Promise<Transaction[]>;
+
+/** Rows for [startDate, endDate] (open ends unbounded): only the months it covers are fetched. */
+function loadRange(load: TransactionLoader, startDate?: string, endDate?: string): Promise<Transaction[]> {
+  return load(startDate || endDate ? [[startDate || '', endDate || '9999-12-31']] : null);
+}
+
 function filterByDept(data: Transaction[], department?: string): Transaction[] {
   if (!department || department === 'All') return data;
   return data.filter(r => r.department.toLowerCase() === department.toLowerCase());
@@ -34,7 +45,7 @@ function describeFilters(department?: string, startDate?: string, endDate?: stri
   return parts.join(', ');
 }
 
-function searchItems(transactions: Transaction[], args: Record<string, unknown>): string {
+async function searchItems(load: TransactionLoader, args: Record<string, unknown>): Promise<string> {
   const query = (args.query as string || '').toLowerCase();
   const department = args.department as string | undefined;
   const category = args.category as string | undefined;
@@ -42,25 +53,32 @@ function searchItems(transactions: Transaction[], args: Record<string, unknown>)
   const endDate = args.end_date as string | undefined;
   const limit = Math.min((args.limit as number) || 20, 50);
 
-  let data = filterByDept(transactions, department);
-  data = filterByDateRange(data, startDate, endDate);
-  data = filterByCategory(data, category);
-
-  if (query) {
-    data = data.filter(r => r.name.toLowerCase().includes(query));
+  // All-time searches are answered from the exported name index (per-item totals)
+  const searchIndex = startDate || endDate ? null : await loadItemSearchIndex();
+  let matched: { name: string; revenue: number; quantity: number; transactions: number; category: string; department: string }[];
+  if (searchIndex) {
+    matched = searchItemTotals(searchIndex, query, { department, category });
+  } else {
+    let data = filterByDept(await loadRange(load, startDate, endDate), department);
+    data = filterByDateRange(data, startDate, endDate);
+    data = filterByCategory(data, category);
+
+    if (query) {
+      data = data.filter(r => r.name.toLowerCase().includes(query));
+    }
+
+    const itemMap = new Map<string, { revenue: number; quantity: number; transactions: number; category: string; department: string }>();
+    for (const r of data) {
+      const entry = itemMap.get(r.name) || { revenue: 0, quantity: 0, transactions: 0, category: r.category, department: r.department };
+      entry.revenue += r.revenue;
+      entry.quantity += r.quantity;
+      entry.transactions += r.transactions;
+      itemMap.set(r.name, entry);
+    }
+    matched = Array.from(itemMap.entries()).map(([name, d]) => ({ name, ...d }));
   }
 
-  const itemMap = new Map<string, { revenue: number; quantity: number; transactions: number; category: string; department: string }>();
-  for (const r of data) {
-    const entry = itemMap.get(r.name) || { revenue: 0, quantity: 0, transactions: 0, category: r.category, department: r.department };
-    entry.revenue += r.revenue;
-    entry.quantity += r.quantity;
-    entry.transactions += r.transactions;
-    itemMap.set(r.name, entry);
-  }
-
-  const items = Array.from(itemMap.entries())
-    .map(([name, d]) => ({ name, ...d }))
+  const items = matched
     .sort((a, b) => b.revenue - a.revenue)
     .slice(0, limit);
 
@@ -77,33 +95,47 @@ function searchItems(transactions: Transaction[], args: Record<string, unknown>)
   return lines.join('\n');
 }
 
-function getItemHistory(transactions: Transaction[], args: Record<string, unknown>): string {
+async function getItemHistory(load: TransactionLoader, args: Record<string, unknown>): Promise<string> {
   const itemName = (args.item_name as string || '').toLowerCase();
   const department = args.department as string | undefined;
 
-  let data = filterByDept(transactions, department);
-  data = data.filter(r => r.name.toLowerCase().includes(itemName));
-
-  if (data.length === 0) {
-    return `No data found for item matching "${args.item_name}".`;
-  }
-
-  const matchedNames = [...new Set(data.map(r => r.name))];
-
-  const monthMap = new Map<string, { revenue: number; quantity: number; transactions: number }>();
-  for (const r of data) {
-    const month = r.date.slice(0, 7);
-    const entry = monthMap.get(month) || { revenue: 0, quantity: 0, transactions: 0 };
-    entry.revenue += r.revenue;
-    entry.quantity += r.quantity;
-    entry.transactions += r.transactions;
-    monthMap.set(month, entry);
+  let matchedNames: string[];
+  let months: { month: string; revenue: number; quantity: number; transactions: number }[];
+
+  // Per-item series shards when exported: match names (trigram index if present), fetch only their shards
+  const [index, searchIndex] = await Promise.all([loadItemIndex(), loadItemSearchIndex()]);
+  const names = !index ? [] : searchIndex
+    ? [...new Set(matchItemIds(searchIndex, itemName).map(i => searchIndex.items.name[i]))]
+    : matchItemNames(index, itemName, true);
+  const series = index ? await loadItemSeries(index, names, { department }) : [];
+  if (index && series.length > 0) {
+    matchedNames = [...new Set(series.map(s => s.name))];
+    months = seriesPeriods(index, series, 'month').map(({ period, ...d }) => ({ month: period, ...d }));
+  } else {
+    let data = filterByDept(await load(null), department);
+    data = data.filter(r => r.name.toLowerCase().includes(itemName));
+
+    if (data.length === 0) {
+      return `No data found for item matching "${args.item_name}".`;
+    }
+
+    matchedNames = [...new Set(data.map(r => r.name))];
+
+    const monthMap = new Map<string, { revenue: number; quantity: number; transactions: number }>();
+    for (const r of data) {
+      const month = r.date.slice(0, 7);
+      const entry = monthMap.get(month) || { revenue: 0, quantity: 0, transactions: 0 };
+      entry.revenue += r.revenue;
+      entry.quantity += r.quantity;
+      entry.transactions += r.transactions;
+      monthMap.set(month, entry);
+    }
+
+    months = Array.from(monthMap.entries())
+      .map(([month, d]) => ({ month, ...d }))
+      .sort((a, b) => a.month.localeCompare(b.month));
   }
 
-  const months = Array.from(monthMap.entries())
-    .map(([month, d]) => ({ month, ...d }))
-    .sort((a, b) => a.month.localeCompare(b.month));
-
   const totalRev = months.reduce((s, m) => s + m.revenue, 0);
   const totalQty = months.reduce((s, m) => s + m.quantity, 0);
 
@@ -125,7 +157,7 @@ function getItemHistory(transactions: Transaction[], args: Record<string, unknow
   return lines.join('\n');
 }
 
-function comparePeriods(transactions: Transaction[], args: Record<string, unknown>): string {
+async function comparePeriods(load: TransactionLoader, args: Record<string, unknown>, rollups?: RollupCube | null): Promise<string> {
   const department = args.department as string | undefined;
   const itemName = args.item_name as string | undefined;
   const period1Start = args.period1_start as string;
@@ -133,24 +165,30 @@ function comparePeriods(transactions: Transaction[], args: Record<string, unknow
   const period2Start = args.period2_start as string;
   const period2End = args.period2_end as string;
 
-  let data = filterByDept(transactions, department);
-  if (itemName) {
-    const q = itemName.toLowerCase();
-    data = data.filter(r => r.name.toLowerCase().includes(q));
-  }
-
-  const p1 = filterByDateRange(data, period1Start, period1End);
-  const p2 = filterByDateRange(data, period2Start, period2End);
-
   const aggregate = (rows: Transaction[]) => ({
     revenue: rows.reduce((s, r) => s + r.revenue, 0),
     quantity: rows.reduce((s, r) => s + r.quantity, 0),
     transactions: rows.reduce((s, r) => s + r.transactions, 0),
-    uniqueItems: new Set(rows.map(r => r.name)).size,
   });
 
-  const a1 = aggregate(p1);
-  const a2 = aggregate(p2);
+  let a1, a2;
+  if (rollups && !itemName) {
+    // Department-level totals come straight from the rollup cube
+    a1 = rollupTotals(rollups, rollupRange(rollups, period1Start, period1End), { department });
+    a2 = rollupTotals(rollups, rollupRange(rollups, period2Start, period2End), { department });
+  } else {
+    const periods: [string, string][] = [
+      [period1Start || '', period1End || '9999-12-31'],
+      [period2Start || '', period2End || '9999-12-31'],
+    ];
+    let data = filterByDept(await load(periods), department);
+    if (itemName) {
+      const q = itemName.toLowerCase();
+      data = data.filter(r => r.name.toLowerCase().includes(q));
+    }
+    a1 = aggregate(filterByDateRange(data, period1Start, period1End));
+    a2 = aggregate(filterByDateRange(data, period2Start, period2End));
+  }
 
   const pctRev = a1.revenue > 0 ? ((a2.revenue - a1.revenue) / a1.revenue) * 100 : 0;
   const pctQty = a1.quantity > 0 ? ((a2.quantity - a1.quantity) / a1.quantity) * 100 : 0;
@@ -168,21 +206,23 @@ function comparePeriods(transactions: Transaction[], args: Record<string, unknow
   return lines.join('\n');
 }
 
-function getCategoryBreakdown(transactions: Transaction[], args: Record<string, unknown>): string {
+async function getCategoryBreakdown(load: TransactionLoader, args: Record<string, unknown>, rollups?: RollupCube | null): Promise<string> {
   const department = args.department as string | undefined;
   const startDate = args.start_date as string | undefined;
   const endDate = args.end_date as string | undefined;
 
-  let data = filterByDept(transactions, department);
-  data = filterByDateRange(data, startDate, endDate);
-
-  const catMap = new Map<string, { revenue: number; quantity: number; transactions: number }>();
-  for (const r of data) {
-    const entry = catMap.get(r.category) || { revenue: 0, quantity: 0, transactions: 0 };
-    entry.revenue += r.revenue;
-    entry.quantity += r.quantity;
-    entry.transactions += r.transactions;
-    catMap.set(r.category, entry);
+  let catMap = new Map<string, { revenue: number; quantity: number; transactions: number }>();
+  if (rollups) {
+    catMap = rollupByCategory(rollups, rollupRange(rollups, startDate, endDate), { department });
+  } else {
+    const data = filterByDateRange(filterByDept(await loadRange(load, startDate, endDate), department), startDate, endDate);
+    for (const r of data) {
+      const entry = catMap.get(r.category) || { revenue: 0, quantity: 0, transactions: 0 };
+      entry.revenue += r.revenue;
+      entry.quantity += r.quantity;
+      entry.transactions += r.transactions;
+      catMap.set(r.category, entry);
+    }
   }
 
   const cats = Array.from(catMap.entries())
@@ -204,14 +244,14 @@ function getCategoryBreakdown(transactions: Transaction[], args: Record<string,
   return lines.join('\n');
 }
 
-function getTopItems(transactions: Transaction[], args: Record<string, unknown>): string {
+async function getTopItems(load: TransactionLoader, args: Record<string, unknown>): Promise<string> {
   const department = args.department as string | undefined;
   const startDate = args.start_date as string | undefined;
   const endDate = args.end_date as string | undefined;
   const sortBy = (args.sort_by as string) || 'revenue';
   const limit = Math.min((args.limit as number) || 10, 50);
 
-  let data = filterByDept(transactions, department);
+  let data = filterByDept(await loadRange(load, startDate, endDate), department);
   data = filterByDateRange(data, startDate, endDate);
 
   const itemMap = new Map<string, { revenue: number; quantity: number; transactions: number; category: string }>();
@@ -239,7 +279,13 @@ function getTopItems(transactions: Transaction[], args: Record<string, unknown>)
   return lines.join('\n');
 }
 
-const TOOL_HANDLERS: Record<string, (txns: Transaction[], args: Record<string, unknown>) => string> = {
+type ToolHandler = (
+  load: TransactionLoader,
+  args: Record<string, unknown>,
+  rollups?: RollupCube | null
+) => Promise<string>;
+
+const TOOL_HANDLERS: Record<string, ToolHandler> = {
   search_items: searchItems,
   get_item_history: getItemHistory,
   compare_periods: comparePeriods,
@@ -247,11 +293,19 @@ const TOOL_HANDLERS: Record<string, (txns: Transaction[], args: Record<string, u
   get_top_items: getTopItems,
 };
 
-export function executeToolCall(call: ToolCall, transactions: Transaction[]): string {
+/**
+ * load fetches transaction rows when a tool needs them (only the months its
+ * dates cover); rollups (rollups.json) lets period/category totals skip rows.
+ */
+export async function executeToolCall(
+  call: ToolCall,
+  load: TransactionLoader,
+  rollups?: RollupCube | null
+): Promise<string> {
   const handler = TOOL_HANDLERS[call.name];
   if (!handler) return `Unknown tool: ${call.name}`;
   try {
-    return handler(transactions, call.arguments);
+    return await handler(load, call.arguments, rollups);
   } catch (err) {
     return `Error executing ${call.name}: ${err instanceof Error ? err.message : 'unknown error'}`;
   }
@@ -0,0 +1,216 @@
+import type { PeriodData, PeriodGranularity } from './aggregate-by-period';
+
+/**
+ * Queries over rollups.json (export_dashboards.rollup_cube): revenue /
+ * quantity / transactions pre-summed per (period, department, category) at
+ * day, ISO week (Monday key), month and year granularity.
+ *
+ * A date range is answered exactly by tiling it with the coarsest periods
+ * that fit entirely inside it (whole years, then months, then days at the
+ * edges), so a year-to-date query reads a few dozen cells instead of every
+ * transaction row.
+ */
+export type RollupLevel = 'day' | 'week' | 'month' | 'year';
+
+export interface RollupLevelData {
+  periods: string[];
+  period: number[];
+  department: number[];
+  category: number[];
+  revenueCents: number[];
+  quantity: number[];
+  transactions: number[];
+}
+
+export interface RollupCube {
+  format: 'rollup-v1';
+  generatedAt: string;
+  departments: string[];
+  categories: string[];
+  levels: Record<RollupLevel, RollupLevelData>;
+}
+
+export interface RollupFilter {
+  department?: string;   // undefined or 'All' = every department
+  categories?: string[]; // empty = every category
+}
+
+export interface RollupTotals {
+  revenue: number;
+  quantity: number;
+  transactions: number;
+}
+
+const DAY_MS = 86400000;
+
+// Levels usable to tile a range when results are bucketed by a granularity
+const TILE_LEVELS: Record<PeriodGranularity, RollupLevel[]> = {
+  day: ['day'],
+  week: ['week', 'day'],
+  month: ['month', 'day'],
+  year: ['year', 'month', 'day'],
+};
+
+function addDays(date: string, days: number): string {
+  return new Date(Date.parse(date + 'T00:00:00Z') + days * DAY_MS).toISOString().slice(0, 10);
+}
+
+/** Period key containing date (week = Monday of its ISO week). */
+export function periodKeyOf(level: RollupLevel, date: string): string {
+  switch (level) {
+    case 'week': {
+      const weekday = (new Date(date + 'T00:00:00Z').getUTCDay() + 6) % 7;
+      return addDays(date, -weekday);
+    }
+    case 'month':
+      return date.slice(0, 7);
+    case 'year':
+      return date.slice(0, 4);
+    default:
+      return date;
+  }
+}
+
+function periodStart(level: RollupLevel, key: string): string {
+  if (level === 'month') return key + '-01';
+  if (level === 'year') return key + '-01-01';
+  return key;
+}
+
+function periodEnd(level: RollupLevel, key: string): string {
+  switch (level) {
+    case 'week':
+      return addDays(key, 6);
+    case 'month': {
+      const [y, m] = key.split('-').map(Number);
+      return new Date(Date.UTC(y, m, 0)).toISOString().slice(0, 10);
+    }
+    case 'year':
+      return key + '-12-31';
+    default:
+      return key;
+  }
+}
+
+interface Tile {
+  level: RollupLevel;
+  start: string;
+  end: string;
+}
+
+/** Cover [start, end] with whole periods, coarsest level first. */
+function tile(start: string, end: string, levels: RollupLevel[]): Tile[] {
+  if (start > end) return [];
+  const [level, ...finer] = levels;
+  if (finer.length === 0) return [{ level, start, end }];
+
+  const firstKey = periodKeyOf(level, start);
+  const blockStart = periodStart(level, firstKey) === start ? start : addDays(periodEnd(level, firstKey), 1);
+  const lastKey = periodKeyOf(level, end);
+  const blockEnd = periodEnd(level, lastKey) === end ? end : addDays(periodStart(level, lastKey), -1);
+  if (blockStart > blockEnd) return tile(start, end, finer);
+
+  return [
+    ...tile(start, addDays(blockStart, -1), finer),
+    { level, start: blockStart, end: blockEnd },
+    ...tile(addDays(blockEnd, 1), end, finer),
+  ];
+}
+
+/**
+ * Visit the cube cells covering range (null = all time) that match filter;
+ * visit gets the tile level, period key, category code and the cell index.
+ */
+function visitCells(
+  cube: RollupCube,
+  range: [string, string] | null,
+  levels: RollupLevel[],
+  filter: RollupFilter,
+  visit: (level: RollupLevel, period: string, category: number, data: RollupLevelData, i: number) => void
+) {
+  const dept = filter.department && filter.department !== 'All' ? filter.department.toLowerCase() : null;
+  const deptOk = cube.departments.map(d => dept === null || d.toLowerCase() === dept);
+  const cats = (filter.categories || []).map(c => c.toLowerCase());
+  const catOk = cube.categories.map(c => cats.length === 0 || cats.includes(c.toLowerCase()));
+
+  // All time: every cell of the coarsest level
+  const tiles: Array<Tile | { level: RollupLevel; start?: undefined; end?: undefined }> = range
+    ? tile(range[0], range[1], levels)
+    : [{ level: levels[0] }];
+  for (const t of tiles) {
+    const data = cube.levels[t.level];
+    const inTile = data.periods.map(p => {
+      if (t.start === undefined) return true;
+      const s = periodStart(t.level, p);
+      return s >= t.start && s <= t.end;
+    });
+    for (let i = 0; i < data.period.length; i++) {
+      const p = data.period[i];
+      if (inTile[p] && deptOk[data.department[i]] && catOk[data.category[i]]) {
+        visit(t.level, data.periods[p], data.category[i], data, i);
+      }
+    }
+  }
+}
+
+/** Same result as aggregateByPeriod over the matching transaction rows. */
+export function rollupByPeriod(
+  cube: RollupCube,
+  range: [string, string] | null,
+  granularity: PeriodGranularity,
+  filter: RollupFilter = {}
+): PeriodData[] {
+  const map = new Map<string, { cents: number; transactions: number; quantity: number }>();
+  visitCells(cube, range, TILE_LEVELS[granularity], filter, (level, period, _cat, data, i) => {
+    const key = periodKeyOf(granularity, periodStart(level, period));
+    const entry = map.get(key) || { cents: 0, transactions: 0, quantity: 0 };
+    entry.cents += data.revenueCents[i];
+    entry.transactions += data.transactions[i];
+    entry.quantity += data.quantity[i];
+    map.set(key, entry);
+  });
+  return Array.from(map.entries())
+    .map(([period, e]) => ({ period, revenue: e.cents / 100, transactions: e.transactions, quantity: e.quantity }))
+    .sort((a, b) => a.period.localeCompare(b.period));
+}
+
+/** Totals per category over range. */
+export function rollupByCategory(
+  cube: RollupCube,
+  range: [string, string] | null,
+  filter: RollupFilter = {}
+): Map<string, RollupTotals> {
+  const cents = new Map<number, RollupTotals>();
+  visitCells(cube, range, TILE_LEVELS.year, filter, (_level, _period, cat, data, i) => {
+    const entry = cents.get(cat) || { revenue: 0, quantity: 0, transactions: 0 };
+    entry.revenue += data.revenueCents[i];
+    entry.quantity += data.quantity[i];
+    entry.transactions += data.transactions[i];
+    cents.set(cat, entry);
+  });
+  const out = new Map<string, RollupTotals>();
+  cents.forEach((e, cat) => out.set(cube.categories[cat], { ...e, revenue: e.revenue / 100 }));
+  return out;
+}
+
+/** Revenue / quantity / transactions over range. */
+export function rollupTotals(
+  cube: RollupCube,
+  range: [string, string] | null,
+  filter: RollupFilter = {}
+): RollupTotals {
+  const totals = { revenue: 0, quantity: 0, transactions: 0 };
+  rollupByCategory(cube, range, filter).forEach(e => {
+    totals.revenue += e.revenue;
+    totals.quantity += e.quantity;
+    totals.transactions += e.transactions;
+  });
+  return totals;
+}
+
+/** [start, end] with open ends filled from the cube's first/last day. */
+export function rollupRange(cube: RollupCube, start?: string, end?: string): [string, string] | null {
+  if (!start && !end) return null;
+  const days = cube.levels.day.periods;
+  return [start || days[0] || '', end || days[days.length - 1] || ''];
+}
@@ -22,11 +22,12 @@ const DEPT_ICONS: Record<string, string> = {
 };
 
 export default function HomePage() {
-  const { raw, loading: txnLoading } = useTransactions();
   const { summary, loading: sumLoading } = useSummary();
   const { setDataSummary } = useDataContext();
 
   const [dateRange, setDateRange] = useState<[string, string] | null>(getYTD());
+  // Only the months the picker covers are fetched (null = all time)
+  const { raw, loading: txnLoading } = useTransactions(dateRange);
   const filters = useMemo<Filters>(() => ({
     department: 'All',
     dateRange,
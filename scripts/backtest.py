@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+backtest.py
+
+Rolling-origin backtest of the weekly forecast engines per department.
+Every origin (by default every week of the last full year) is a Monday:
+each engine sees only the weeks before it and forecasts the next
+--horizon weeks, which are then scored against what actually happened.
+
+  seasonal  seasonal_forecast (bowling_seasonality's 52-week means)
+  ma4       flat MOVING_AVG_WEEKS-week moving average (forecast_food_sales /
+            forecast_bar_sales)
+  fourier   fourier_forecast, all departments in one fit per origin
+  sarima    bowling_sarima's SARIMA, one fit per department and origin in
+            worker processes; fitted parameters are cached per origin under
+            data/.cache/sarima/backtest/, so a rerun only re-filters
+
+Only (department, origin) pairs every selected engine forecast are scored,
+so engines are compared on the same weeks. Prints MAE / MAPE / bias
+(forecast minus actual) per engine, horizon and department, and writes them
+to CSV.
+
+Run export_dashboards.py first.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bowling_sarima import fit_sarima, fmt_currency, sarima_forecast, weekly_to_series
+from forecast_food_sales import MOVING_AVG_WEEKS
+from fourier_forecast import fit_fourier
+from sarima_batch import FIT_TIMEOUT, MIN_WEEKS
+from sarima_cache import MODEL_DIR, SarimaCache
+from seasonal_forecast import seasonal_forecast
+from weekly_series import TRANSACTIONS_FILE, WeeklySeries, load_rows, weekly_revenue
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(_ROOT, 'output', 'backtest.csv')
+BACKTEST_MODEL_DIR = os.path.join(MODEL_DIR, 'backtest')
+ENGINES = ['seasonal', 'ma4', 'fourier', 'sarima']
+MIN_HISTORY = {             # weeks of history (from first sale) an engine needs at an origin
+    'seasonal': 1,
+    'ma4': MOVING_AVG_WEEKS,
+    'fourier': 52,
+    'sarima': MIN_WEEKS,
+}
+METRICS_CSV_COLS = ['engine', 'department', 'horizon', 'n', 'mae', 'mape', 'bias']
+
+
+# =============================================================================
+# ENGINES (one origin, every series)
+# =============================================================================
+
+def _history(series, origin):
+    """The WeeklySeries cut off before week index origin."""
+    return WeeklySeries(series.level, series.keys, series.first_week, series.cents[:, :origin])
+
+
+def seasonal_engine(series, origin, horizon):
+    _, preds, _ = seasonal_forecast(_history(series, origin), num_future_weeks=horizon)
+    return preds
+
+
+def ma4_engine(series, origin, horizon):
+    recent = series.cents[:, max(origin - MOVING_AVG_WEEKS, 0):origin]
+    return np.repeat(recent.mean(axis=1)[:, None] / 100, horizon, axis=1)
+
+
+def fourier_engine(series, origin, horizon):
+    Y = series.cents[:, :origin].T / 100
+    mask = np.cumsum(Y != 0, axis=0) > 0
+    weeks = series.first_week + 7 * np.arange(origin)
+    future = weeks[-1] + 7 * np.arange(1, horizon + 1)
+    model = fit_fourier(weeks, Y, mask, horizon_year=date.fromordinal(int(future[-1])).year)
+    return model.forecast(future).T
+
+
+VECTOR_ENGINES = {
+    'seasonal': seasonal_engine,
+    'ma4': ma4_engine,
+    'fourier': fourier_engine,
+}
+
+
+def fit_origin(job):
+    """
+    SARIMA for one department and origin; runs in a worker process. job is
+    (name, weekly history, horizon, timeout, use_cache). Returns
+    (forecast list or None, seconds).
+    """
+    name, weekly, horizon, timeout, use_cache = job
+    started = time.monotonic()
+    series = weekly_to_series(weekly)
+    cache = SarimaCache(name, model_dir=BACKTEST_MODEL_DIR) if use_cache else None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        fitted, _ = fit_sarima(series, timeout=timeout, quiet=True, cache=cache)
+    preds = [v for _, v in sarima_forecast(fitted, series, horizon)] if fitted is not None else None
+    return preds, time.monotonic() - started
+
+
+# =============================================================================
+# BACKTEST
+# =============================================================================
+
+def run_backtest(series, origins, horizon, engines, workers=None, timeout=FIT_TIMEOUT, use_cache=True):
+    """
+    Forecast every series from every origin (week indexes into series).
+    Returns {engine: dollars (series, origins, horizon)}, NaN where the
+    engine had too little history, and {engine: seconds}.
+    """
+    n_series = len(series)
+    first_sale = np.where(series.cents.any(axis=1), (series.cents != 0).argmax(axis=1), series.cents.shape[1])
+    forecasts, seconds = {}, {}
+
+    for engine in engines:
+        started = time.monotonic()
+        out = np.full((n_series, len(origins), horizon), np.nan)
+        enough = np.array([[o - f >= MIN_HISTORY[engine] for o in origins] for f in first_sale.tolist()])
+        if engine in VECTOR_ENGINES:
+            for j, origin in enumerate(origins):
+                out[:, j] = VECTOR_ENGINES[engine](series, origin, horizon)
+        else:
+            cells = [(i, j) for i in range(n_series) for j in range(len(origins)) if enough[i, j]]
+            jobs = []
+            for i, j in cells:
+                history = _history(series, origins[j])
+                name = f'backtest {series.label(i)} {datetime.fromordinal(series.first_week + 7 * origins[j]):%Y-%m-%d}'
+                jobs.append((name, history.weekly(i), horizon, timeout, use_cache))
+            if jobs:
+                n_workers = min(workers or os.cpu_count() or 1, len(jobs))
+                with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                    for (i, j), (preds, _) in zip(cells, pool.map(fit_origin, jobs)):
+                        if preds is not None:
+                            out[i, j] = preds
+        out[~enough] = np.nan
+        forecasts[engine] = out
+        seconds[engine] = time.monotonic() - started
+    return forecasts, seconds
+
+
+def actuals(series, origins, horizon):
+    """Dollars (series, origins, horizon); NaN past the last week."""
+    n_weeks = series.cents.shape[1]
+    out = np.full((len(series), len(origins), horizon), np.nan)
+    for j, origin in enumerate(origins):
+        stop = min(origin + horizon, n_weeks)
+        out[:, j, :stop - origin] = series.cents[:, origin:stop] / 100
+    return out
+
+
+def score(series, forecasts, actual):
+    """
+    [(engine, department, horizon, n, mae, mape, bias)] over the
+    (series, origin, horizon) cells every engine forecast. Department 'All'
+    pools every department; MAPE skips zero-actual weeks.
+    """
+    common = np.isfinite(actual)
+    for preds in forecasts.values():
+        common &= np.isfinite(preds)
+    groups = [(series.label(i), [i]) for i in range(len(series))] + [('All', list(range(len(series))))]
+    rows = []
+    for engine, preds in forecasts.items():
+        err = preds - actual
+        for label, idx in groups:
+            for h in range(actual.shape[2]):
+                use = common[idx, :, h]
+                if not use.any():
+                    continue
+                e = err[idx, :, h][use]
+                a = actual[idx, :, h][use]
+                nonzero = a != 0
+                mape = float(np.abs(e[nonzero] / a[nonzero]).mean() * 100) if nonzero.any() else float('nan')
+                rows.append((engine, label, h + 1, int(use.sum()), float(np.abs(e).mean()), mape, float(e.mean())))
+    return rows
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def print_metrics(rows):
+    print(f'\n{"Engine":<10} {"Department":<24} {"h":>3} {"n":>5} {"MAE":>12} {"MAPE":>8} {"Bias":>12}')
+    print('-' * 80)
+    previous = None
+    for engine, label, h, n, mae, mape, bias in sorted(rows, key=lambda r: (r[1] != 'All', r[1], r[2], r[0])):
+        if previous and (label, h) != previous:
+            print()
+        previous = (label, h)
+        print(f'{engine:<10} {label:<24} {h:>3} {n:>5} {fmt_currency(mae):>12} {mape:>7.1f}% {bias:>+12,.0f}')
+
+
+def save_metrics(rows, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(METRICS_CSV_COLS)
+        for engine, label, h, n, mae, mape, bias in rows:
+            w.writerow([engine, label, h, n, f'{mae:.2f}', f'{mape:.2f}', f'{bias:.2f}'])
+    print(f'\n  Metrics saved to: {path}')
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rolling-origin backtest of the weekly forecast engines per department.'
+    )
+    parser.add_argument(
+        '--transactions', default=TRANSACTIONS_FILE,
+        help=f'transactions.json from export_dashboards.py (default: {TRANSACTIONS_FILE})'
+    )
+    parser.add_argument(
+        '--engines', nargs='+', choices=ENGINES, default=ENGINES,
+        help=f'Engines to compare (default: {" ".join(ENGINES)})'
+    )
+    parser.add_argument(
+        '--departments', nargs='+', default=None,
+        help='Only these departments (default: all)'
+    )
+    parser.add_argument(
+        '--year', type=int, default=None,
+        help='Forecast origins are the Mondays of YEAR (default: the year before the last week of data)'
+    )
+    parser.add_argument(
+        '--every', type=int, default=1, metavar='N',
+        help='Use every Nth week of the year as an origin (default: 1)'
+    )
+    parser.add_argument(
+        '--horizon', type=int, default=4,
+        help='Weeks forecast from each origin (default: 4)'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None, metavar='N',
+        help='SARIMA fits in N worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=FIT_TIMEOUT,
+        help=f'Seconds per SARIMA series fit, fallback included (default: {FIT_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Fit SARIMA from scratch without reading or writing the per-origin cache'
+    )
+    parser.add_argument(
+        '--output', default=DEFAULT_OUTPUT,
+        help=f'Metrics CSV path (default: {DEFAULT_OUTPUT})'
+    )
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('FORECAST BACKTEST')
+    print('=' * 60)
+
+    rows = load_rows(args.transactions)
+    if not rows:
+        return 1
+    if args.departments:
+        rows = [r for r in rows if r['department'] in args.departments]
+    series = weekly_revenue(rows, 'department')
+    if not len(series):
+        print('No sales to backtest.')
+        return 1
+
+    weeks = series.weeks
+    year = args.year or weeks[-1].year - 1
+    origins = [i for i, w in enumerate(weeks) if w.year == year and i > 0][::args.every]
+    if not origins:
+        print(f'No weeks in {year} to use as forecast origins.')
+        return 1
+    print(f'  {len(series)} departments  |  {len(origins)} origins '
+          f'({weeks[origins[0]]:%Y-%m-%d} to {weeks[origins[-1]]:%Y-%m-%d})  |  horizon {args.horizon} weeks')
+
+    forecasts, seconds = run_backtest(series, origins, args.horizon, args.engines,
+                                      workers=args.workers, timeout=args.timeout,
+                                      use_cache=not args.no_cache)
+    for engine in args.engines:
+        print(f'  {engine:<10} {seconds[engine]:>8.2f}s')
+
+    metrics = score(series, forecasts, actuals(series, origins, args.horizon))
+    if not metrics:
+        print('\nNo origin that every engine could forecast.')
+        return 1
+    print_metrics(metrics)
+    save_metrics(metrics, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -4,12 +4,18 @@ bowling_sarima.py
 
 SARIMA-based bowling revenue forecast. Loads the same POS data as bowling_seasonality,
 fits a SARIMAX model with 52-week seasonality, and produces a forecast chart and CSV.
+Fitted parameters are cached (sarima_cache): when only new weeks were
+appended they are reapplied without an optimizer run, with a warm-started
+full refit every --refit-weeks weeks. --engine fourier swaps SARIMA for the
+Fourier-seasonality regression (fourier_forecast); --holdout N compares both.
 """
 
 import argparse
 import csv
 import os
 import sys
+import time
+import warnings
 from datetime import datetime, timedelta, date
 
 # Allow import from same directory
@@ -20,11 +26,14 @@ from bowling_seasonality import (
     load_forecast,
     compare_forecast_to_actual,
 )
+from sarima_cache import REFIT_WEEKS, SarimaCache
+from fourier_forecast import FOURIER_K, fit_fourier
 
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
@@ -40,6 +49,7 @@ FORECAST_CSV_COLS = ['week_start', 'week_of_year', 'year', 'predicted_revenue',
 # SARIMA orders
 ORDER = (1, 0, 1)
 SEASONAL_ORDER = (1, 0, 1, 52)
+FALLBACK_SEASONAL_ORDER = (0, 0, 0, 52)
 
 # Theme (match bowling_seasonality)
 BG_DARK = '#1a1a2e'
@@ -68,40 +78,136 @@ def weekly_to_series(weekly):
     return s
 
 
-def fit_sarima(series, order=ORDER, seasonal_order=SEASONAL_ORDER):
+class FitTimeout(Exception):
+    """Raised from the optimizer callback when a fit runs past its time limit."""
+
+
+FIT_MODES = {
+    'apply': 'cached parameters reused for the new weeks (no optimizer run)',
+    'warm': 'refit warm-started from cached parameters',
+    'cold': 'full fit',
+}
+
+
+def _fit_model(series, order, seasonal_order, timeout=None, cache=None):
+    """
+    SARIMAX fit; with timeout (seconds) the optimizer is stopped once it runs
+    over. With a SarimaCache, cached parameters are applied or used as
+    start_params (sarima_cache.SarimaCache.plan). Returns (fitted, mode).
+    """
+    model = SARIMAX(
+        series,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=True,
+        enforce_invertibility=True,
+    )
+    mode, params = cache.plan(series, order, seasonal_order, model.param_names) if cache else ('cold', None)
+    if mode == 'apply':
+        fitted = model.filter(params)
+    else:
+        callback = None
+        if timeout:
+            deadline = time.monotonic() + timeout
+
+            def stop_at_deadline(params):
+                if time.monotonic() > deadline:
+                    raise FitTimeout(f'no convergence within {timeout:g}s')
+            callback = stop_at_deadline
+        fitted = model.fit(start_params=params, disp=False, callback=callback)
+    if cache:
+        cache.store(series, order, seasonal_order, fitted, mode)
+    return fitted, mode
+
+
+def fit_sarima(series, order=ORDER, seasonal_order=SEASONAL_ORDER, timeout=None, quiet=False,
+               cache=None):
     """
-    Fit SARIMAX model. Returns (model, forecast_result) or (None, None) on failure.
-    Tries simpler fallback if convergence fails.
+    Fit SARIMAX model. Returns (fitted, None), or (None, error message) when
+    the fallback fails too. Tries simpler fallback if convergence fails (or
+    takes too long): timeout (seconds) bounds both fits together, so the
+    fallback only gets what the first fit left. cache: optional SarimaCache
+    for warm refits.
     """
+    log = (lambda msg: None) if quiet else print
+    deadline = time.monotonic() + timeout if timeout else None
     try:
-        model = SARIMAX(
-            series,
-            order=order,
-            seasonal_order=seasonal_order,
-            enforce_stationarity=True,
-            enforce_invertibility=True,
-        )
-        fitted = model.fit(disp=False)
+        fitted, mode = _fit_model(series, order, seasonal_order, timeout, cache)
+        if cache:
+            log(f'  Model: {FIT_MODES[mode]}')
         return fitted, None
     except Exception as e:
-        print(f'  SARIMA fit failed: {e}')
+        log(f'  SARIMA fit failed: {e}')
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log('  No time left for the fallback fit')
+                return None, str(e)
         # Fallback: simpler seasonal order
         try:
-            model = SARIMAX(
-                series,
-                order=(1, 0, 1),
-                seasonal_order=(0, 0, 0, 52),  # No seasonal AR/MA
-                enforce_stationarity=True,
-                enforce_invertibility=True,
-            )
-            fitted = model.fit(disp=False)
-            print('  Using fallback: seasonal_order=(0,0,0,52)')
+            fitted, mode = _fit_model(series, (1, 0, 1), FALLBACK_SEASONAL_ORDER, remaining, cache)  # No seasonal AR/MA
+            log('  Using fallback: seasonal_order=(0,0,0,52)')
+            if cache:
+                log(f'  Model: {FIT_MODES[mode]}')
             return fitted, None
         except Exception as e2:
-            print(f'  Fallback failed: {e2}')
+            log(f'  Fallback failed: {e2}')
             return None, str(e2)
 
 
+def sarima_forecast(fitted, series, steps):
+    """[(week_start, revenue)] for the steps weeks after a fitted series."""
+    predicted = fitted.get_forecast(steps=steps).predicted_mean
+    last_week = series.index[-1].to_pydatetime()
+    return [(last_week + timedelta(days=7 * (i + 1)), float(predicted.iloc[i])) for i in range(steps)]
+
+
+def fourier_forecast(series, steps):
+    """Fourier-engine (fourier_forecast.fit_fourier) forecast for the steps weeks after series."""
+    weeks = np.array([ts.toordinal() for ts in series.index], dtype=np.int64)
+    future = weeks[-1] + 7 * np.arange(1, steps + 1)
+    last_year = datetime.fromordinal(int(future[-1])).year
+    model = fit_fourier(weeks, series.to_numpy(dtype=np.float64)[:, None], horizon_year=last_year)
+    preds = model.forecast(future)[:, 0]
+    return [(datetime.fromordinal(int(w)), float(p)) for w, p in zip(future.tolist(), preds.tolist())]
+
+
+def compare_engines(series, holdout):
+    """
+    Fit SARIMA and the Fourier engine on all but the last holdout weeks and
+    print their forecasts for those weeks side by side with the actuals.
+    """
+    train, actual = series.iloc[:-holdout], series.iloc[-holdout:]
+    print(f'\n  Holdout: last {holdout} weeks ({actual.index[0]:%Y-%m-%d} to {actual.index[-1]:%Y-%m-%d})')
+    started = time.monotonic()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        fitted, _ = fit_sarima(train, quiet=True)
+    engines = {'SARIMA': (sarima_forecast(fitted, train, holdout) if fitted is not None else None,
+                          time.monotonic() - started)}
+    started = time.monotonic()
+    engines['Fourier'] = (fourier_forecast(train, holdout), time.monotonic() - started)
+
+    print('=' * 52)
+    print(f'{"Week of":<12} {"Actual":>12} {"SARIMA":>12} {"Fourier":>12}')
+    print('-' * 52)
+    for i, (ws, value) in enumerate(actual.items()):
+        cells = [fmt_currency(preds[i][1]) if preds else '-' for preds, _ in engines.values()]
+        print(f'{ws:%Y-%m-%d}   {fmt_currency(value):>12} {cells[0]:>12} {cells[1]:>12}')
+    print('-' * 52)
+    for name, (preds, seconds) in engines.items():
+        if not preds:
+            print(f'  {name:<8} fit failed ({seconds:.1f}s)')
+            continue
+        pairs = [(a, a - p) for a, (_, p) in zip(actual.tolist(), preds)]
+        mae = sum(abs(e) for _, e in pairs) / len(pairs)
+        nonzero = [abs(e / a) for a, e in pairs if a]
+        mape = sum(nonzero) * 100 / len(nonzero) if nonzero else 0
+        print(f'  {name:<8} MAE: {fmt_currency(mae)}  |  MAPE: {mape:.1f}%  |  fit {seconds:.2f}s')
+    print()
+
+
 def apply_theme():
     plt.rcParams.update({
         'figure.facecolor': BG_DARK,
@@ -305,6 +411,26 @@ def main():
         '--actuals', nargs='*', default=None,
         help='POS-format CSV(s) with actuals for forecast period (same format as --data); overlay on forecast chart'
     )
+    parser.add_argument(
+        '--engine', choices=('sarima', 'fourier'), default='sarima',
+        help='Forecast engine: SARIMA (s=52) or Fourier-seasonality regression (fast)'
+    )
+    parser.add_argument(
+        '--holdout', type=int, default=0, metavar='N',
+        help='Also fit both engines without the last N weeks and compare their errors on them'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Ignore and do not update the fitted-parameter cache (data/.cache/sarima/)'
+    )
+    parser.add_argument(
+        '--refit', action='store_true',
+        help='Force a full optimizer run from scratch (the cache is then updated)'
+    )
+    parser.add_argument(
+        '--refit-weeks', type=int, default=REFIT_WEEKS,
+        help=f'Re-optimize once this many weeks were added since the last optimizer run (default: {REFIT_WEEKS})'
+    )
     args = parser.parse_args()
 
     start_date = None
@@ -362,27 +488,40 @@ def main():
         loaded = load_forecast(args.compare_forecast)
         compare_forecast_to_actual(loaded, weekly)
 
-    if args.forecast_weeks > 0:
+    if args.forecast_weeks > 0 or args.holdout:
         series = weekly_to_series(weekly)
         if series is None or len(series) < 104:  # Need at least 2 seasons for s=52
             print('  Need at least 104 weeks (2 years) for SARIMA. Have:', len(series) if series is not None else 0)
             return 1
 
+    if args.holdout:
+        compare_engines(series, args.holdout)
+
+    if args.forecast_weeks > 0 and args.engine == 'fourier':
+        print(f'  Fitting Fourier regression (K={FOURIER_K}, holiday dummies, AR(1) errors)...')
+        started = time.monotonic()
+        forecast_weeks = fourier_forecast(series, args.forecast_weeks)
+        print(f'  Fitted in {time.monotonic() - started:.2f}s')
+        preds = [v for _, v in forecast_weeks]
+        print(f'  Forecast: {args.forecast_weeks} weeks (Fourier) '
+              f'range {fmt_currency(min(preds))}-{fmt_currency(max(preds))}/week')
+        if args.save_forecast:
+            save_forecast(forecast_weeks, args.save_forecast)
+
+    elif args.forecast_weeks > 0:
         print(f'  Fitting SARIMA order={ORDER} seasonal_order={SEASONAL_ORDER}...')
-        fitted, err = fit_sarima(series)
+        cache = None
+        if not args.no_cache:
+            cache = SarimaCache('bowling', refit_weeks=args.refit_weeks, force_refit=args.refit)
+        started = time.monotonic()
+        fitted, err = fit_sarima(series, cache=cache)
         if fitted is None:
             print('  Could not fit model.')
             return 1
+        print(f'  Fitted in {time.monotonic() - started:.1f}s')
 
         print(f'  Forecasting {args.forecast_weeks} weeks...')
-        forecast_result = fitted.get_forecast(steps=args.forecast_weeks)
-
-        last_week = max(weekly.keys())
-        forecast_weeks = []
-        for i in range(args.forecast_weeks):
-            pred = float(forecast_result.predicted_mean.iloc[i])
-            next_week = last_week + timedelta(days=7 * (i + 1))
-            forecast_weeks.append((next_week, pred))
+        forecast_weeks = sarima_forecast(fitted, series, args.forecast_weeks)
 
         preds = [v for _, v in forecast_weeks]
         print(f'  Forecast: {args.forecast_weeks} weeks (SARIMA) '
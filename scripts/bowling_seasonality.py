@@ -2,8 +2,8 @@
 """
 bowling_seasonality.py
 
-Bowling revenue seasonality graph. Loads bowling sales from POS CSV,
-aggregates by day and week, and produces a graph showing trends over time.
+Bowling revenue seasonality graph. Loads bowling sales from POS CSV (via the
+pos_cache columnar cache), aggregates by day and week, and produces a graph showing trends over time.
 Extensible for any date range and any CSV with the same format.
 """
 
@@ -11,9 +11,17 @@ import argparse
 import csv
 import os
 import statistics
+import sys
 from collections import defaultdict
 from datetime import datetime, timedelta, date
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from date_index import encode_dates, table_dates
+from money import group_sum, to_dollars
+from pos_cache import active_rows, load_pos_tables, revenue_column
+
 FORECAST_WEEKS_LOOKBACK = 4
 FORECAST_CSV_COLS = ['week_start', 'week_of_year', 'year', 'predicted_revenue', 'saved_at']
 
@@ -55,70 +63,54 @@ def load_bowling_data(data_paths, start_date=None, end_date=None):
     Transaction Type=Sales, Item Type=Product, not Deleted/Voided.
     data_paths: single path (str) or list of paths.
     Returns (daily_revenue, weekly_revenue, date_range) or (None, None, None).
+    Revenue is summed in integer cents and returned in dollars.
     """
     if isinstance(data_paths, str):
         data_paths = [data_paths]
-    daily = defaultdict(float)
-    all_dates = []
+    daily = defaultdict(int)
+    min_d = max_d = None
 
-    for data_path in data_paths:
-        if not os.path.isfile(data_path):
+    for table in load_pos_tables(data_paths):
+        if not table.has('Transaction Type', 'Item Type', 'Department',
+                         'Item Created Date', 'Total', 'Quantity', 'Unit Amount'):
             continue
-        with open(data_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: header.index(c) for c in [
-                'Transaction Type', 'Item Type', 'Department',
-                'Item Created Date', 'Total', 'Quantity', 'Unit Amount',
-                'Deleted', 'Voided',
-            ]}
-            max_idx = max(idx.values())
-
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if row[idx['Transaction Type']] != 'Sales':
-                    continue
-                if row[idx['Item Type']] != 'Product':
-                    continue
-                if row[idx['Department']].strip() != 'Bowling':
-                    continue
-
-                date_str = row[idx['Item Created Date']].strip()
-                total_val = float(row[idx['Total']] or 0)
-                qty = float(row[idx['Quantity']] or 0)
-                unit = float(row[idx['Unit Amount']] or 0)
-
-                revenue = total_val if total_val != 0 else (qty * unit if qty else unit)
-
-                try:
-                    dt = datetime.strptime(date_str, '%Y-%m-%d')
-                except ValueError:
-                    continue
-
-                if start_date and dt < start_date:
-                    continue
-                if end_date and dt > end_date:
-                    continue
-
-                daily[date_str] += revenue
-                all_dates.append(dt)
+        rows = np.flatnonzero(
+            active_rows(table)
+            & table.matches('Transaction Type', 'Sales')
+            & table.matches('Item Type', 'Product')
+            & table.matches('Department', 'Bowling', strip=True)
+        )
+
+        # Each distinct date string is parsed once (date_index)
+        codes, days = table_dates(table)
+        keep = days.valid.copy()
+        if start_date:
+            keep &= days.ordinal >= start_date.toordinal()
+        if end_date:
+            keep &= days.ordinal <= end_date.toordinal()
+        rows = rows[keep[codes[rows]]]
+        if not len(rows):
+            continue
+
+        totals = group_sum(codes[rows], revenue_column(table)[rows], len(days))
+        for code in np.unique(codes[rows]).tolist():
+            daily[days.values[code]] += int(totals[code])
+        ordinals = days.ordinal[codes[rows]]
+        lo, hi = datetime.fromordinal(int(ordinals.min())), datetime.fromordinal(int(ordinals.max()))
+        min_d = lo if min_d is None else min(min_d, lo)
+        max_d = hi if max_d is None else max(max_d, hi)
 
     if not daily:
         return None, None, None
 
     # Weekly aggregation (Monday start)
-    weekly = defaultdict(float)
-    for date_str, rev in daily.items():
-        dt = datetime.strptime(date_str, '%Y-%m-%d')
-        week_start = dt - timedelta(days=dt.weekday())
+    days = encode_dates(list(daily))[1]
+    weekly = defaultdict(int)
+    for week_start, rev in zip(days.datetimes(days.week_start), daily.values()):
         weekly[week_start] += rev
 
-    min_d = min(all_dates)
-    max_d = max(all_dates)
-    return dict(daily), dict(weekly), (min_d, max_d)
+    return ({d: to_dollars(rev) for d, rev in daily.items()},
+            {w: to_dollars(rev) for w, rev in weekly.items()}, (min_d, max_d))
 
 
 def compute_weekly_forecast(weekly, by_year_week, num_future_weeks=4,
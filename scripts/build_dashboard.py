@@ -8,12 +8,13 @@ Data period: Oct 2025 - Jan 2026
 Theme: Dark sports-bar aesthetic
 """
 
-import csv
 import os
+import sys
 import math
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict, OrderedDict
 
+import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -21,6 +22,11 @@ from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.patches import FancyBboxPatch, Rectangle
 import matplotlib.ticker as mticker
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from date_index import table_dates
+from modifier_resolve import PRODUCT, item_kinds, resolve_unit_prices
+from pos_cache import active_rows, load_pos_table
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -228,74 +234,46 @@ def apply_theme():
 # DATA LOADING
 # =============================================================================
 
-def _read_transactions():
-    """Phase 1: Read CSV rows and group by Transaction ID."""
-    transactions = defaultdict(list)
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f, delimiter=';')
-        header = next(reader)
-        idx = {c: header.index(c) for c in [
-            'Transaction ID', 'Item ID', 'Name', 'Item Type',
-            'Department', 'Quantity', 'Unit Amount',
-            'Deleted', 'Voided', 'Item Created Date',
-        ]}
-        max_idx = max(idx.values())
-        for row in reader:
-            if len(row) <= max_idx:
-                continue
-            if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                continue
-            item_type = row[idx['Item Type']]
-            if item_type not in ('Product', 'Modifier'):
-                continue
-            transactions[row[idx['Transaction ID']]].append({
-                'item_id':    int(row[idx['Item ID']]),
-                'name':       NAME_MERGE.get(row[idx['Name']].strip(),
-                                             row[idx['Name']].strip()),
-                'item_type':  item_type,
-                'department': row[idx['Department']].strip(),
-                'qty':        float(row[idx['Quantity']] or 0),
-                'unit_price': float(row[idx['Unit Amount']] or 0),
-                'date':       row[idx['Item Created Date']].strip(),
-            })
-    return transactions
-
-
-def _resolve_products(transactions, allowed):
-    """Phase 2: Walk each transaction, link modifiers to parent products,
-    compute true costs, and yield resolved food product dicts."""
-    for rows in transactions.values():
-        rows.sort(key=lambda r: r['item_id'])
-        current_product = None
-        modifier_cost = 0.0
-
-        for r in rows:
-            if r['item_type'] == 'Product':
-                # Emit the previous product if it's one of ours
-                if current_product is not None:
-                    if current_product['unit_price'] == 0 and modifier_cost > 0:
-                        current_product['unit_price'] = modifier_cost
-                    yield current_product
-                    current_product = None
-                    modifier_cost = 0.0
-
-                # Check if this product is one we care about
-                if (r['name'] in allowed
-                        and r['department'] == 'Food'):
-                    current_product = r
-                    modifier_cost = 0.0
-                else:
-                    current_product = None
-                    modifier_cost = 0.0
-
-            elif r['item_type'] == 'Modifier' and current_product is not None:
-                modifier_cost += r['unit_price']
-
-        # Don't forget the last product in the transaction
-        if current_product is not None:
-            if current_product['unit_price'] == 0 and modifier_cost > 0:
-                current_product['unit_price'] = modifier_cost
-            yield current_product
+def _read_columns():
+    """Phase 1: Load Product/Modifier rows (columnar, via pos_cache)."""
+    table = load_pos_table(DATA_FILE)
+    rows = np.flatnonzero(active_rows(table) & table.matches('Item Type', 'Product', 'Modifier'))
+    names = [n.strip() for n in table.decode('Name', rows)]
+    day_codes, days = table_dates(table)
+    return {
+        'txn_id':     table['Transaction ID'][rows],
+        'item_id':    table['Item ID'][rows],
+        'kind':       item_kinds(table.decode('Item Type', rows)),
+        'name':       np.array([NAME_MERGE.get(n, n) for n in names], dtype=object),
+        'department': np.array([d.strip() for d in table.decode('Department', rows)], dtype=object),
+        'qty':        table['Quantity'][rows],
+        'unit_price': table['Unit Amount'][rows],
+        'date':       np.array(days.values, dtype=object)[day_codes[rows]],
+        'day':        day_codes[rows],
+        'days':       days,   # DateIndex for the 'day' codes
+    }
+
+
+def _resolve_products(cols, allowed):
+    """Phase 2: Link modifiers to parent products (modifier_resolve), fill
+    zero-priced products with their modifier cost, and yield resolved food
+    product dicts in transaction order."""
+    order, unit_prices = resolve_unit_prices(cols['txn_id'], cols['item_id'],
+                                             cols['kind'], cols['unit_price'])
+    names = cols['name'][order]
+    keep = ((cols['kind'][order] == PRODUCT)
+            & np.array([n in allowed for n in names], dtype=np.bool_)
+            & (cols['department'][order] == 'Food'))
+    for i in np.flatnonzero(keep).tolist():
+        j = order[i]
+        yield {
+            'name':       names[i],
+            'department': cols['department'][j],
+            'qty':        float(cols['qty'][j]),
+            'unit_price': int(unit_prices[i]) / 100,   # cents -> dollars
+            'date':       cols['date'][j],
+            'day':        int(cols['day'][j]),
+        }
 
 
 def load_data():
@@ -306,16 +284,22 @@ def load_data():
         allowed = set(line.strip() for line in f if line.strip())
 
     print('  Phase 1: Reading transactions...')
-    transactions = _read_transactions()
-    print(f'  Phase 2: Resolving {len(transactions):,} transactions...')
+    cols = _read_columns()
+    print(f'  Phase 2: Resolving {len(cols["txn_id"]):,} line items...')
 
     items = {}
     weekly = defaultdict(lambda: {'revenue': 0.0, 'qty': 0.0, 'transactions': 0})
     categories = defaultdict(lambda: {'revenue': 0.0, 'qty': 0.0, 'transactions': 0})
     monthly_cat = defaultdict(lambda: defaultdict(lambda: {'revenue': 0.0, 'qty': 0.0}))
-    all_dates = []
+    all_days = []
+
+    # Calendar lookups per distinct date (date_index), not strptime per row
+    days = cols['days']
+    valid = days.valid.tolist()
+    ordinals = days.ordinal.tolist()
+    week_starts = days.datetimes(days.week_start)
 
-    for p in _resolve_products(transactions, allowed):
+    for p in _resolve_products(cols, allowed):
         name = p['name']
         qty = p['qty']
         unit_price = p['unit_price']
@@ -333,15 +317,13 @@ def load_data():
         if unit_price > 0:
             items[name]['unit_price'] = unit_price
 
-        # Date parsing
-        try:
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-        except (ValueError, IndexError):
+        day = p['day']
+        if not valid[day]:
             continue
-        all_dates.append(dt)
+        all_days.append(ordinals[day])
 
         # Weekly (Monday start)
-        ws = dt - timedelta(days=dt.weekday())
+        ws = week_starts[day]
         weekly[ws]['revenue'] += revenue
         weekly[ws]['qty'] += qty
         weekly[ws]['transactions'] += 1
@@ -363,8 +345,8 @@ def load_data():
     total_qty = sum(i['qty'] for i in items.values())
     total_trans = sum(i['transactions'] for i in items.values())
 
-    min_d = min(all_dates).strftime('%b %d, %Y') if all_dates else 'N/A'
-    max_d = max(all_dates).strftime('%b %d, %Y') if all_dates else 'N/A'
+    min_d = datetime.fromordinal(min(all_days)).strftime('%b %d, %Y') if all_days else 'N/A'
+    max_d = datetime.fromordinal(max(all_days)).strftime('%b %d, %Y') if all_days else 'N/A'
 
     return dict(
         items=items,
@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+check_parity.py
+
+Checks the vectorized ETL/forecast code against the per-row Python paths it
+replaced, on small generated fixtures (no data/ files needed):
+
+  modifiers   modifier_parents / resolve_products vs the old per-transaction
+              walker (Package breaks the chain, orphan Modifiers dropped)
+  dedup       DedupIndex vs a Python set of (Transaction ID, Item ID) tuples
+  parse       byte-range chunked parse_pos_csv vs a serial parse
+  money       integer-cents lines vs the old float-dollar lines
+  dates       date_index.encode_dates vs per-row strptime
+  columnar    columnar-v1 encode -> JSON -> decode round trip
+  etl         etl_state appended-tail detection (straddling transactions)
+              and incremental runs vs a single full scan
+  forecast    seasonal_forecast vs bowling_seasonality.compute_weekly_forecast
+
+Usage:
+  python scripts/check_parity.py                  # all checks
+  python scripts/check_parity.py --only etl dates
+  python scripts/check_parity.py --seed 7         # different random fixtures
+
+Exits 1 when any check fails.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import etl_state
+import pos_cache
+from bowling_seasonality import build_52week_by_year, compute_weekly_forecast
+from columnar_export import decode_rows, encode_rows
+from date_index import encode_dates
+from dedup_index import DedupIndex, pack_keys, unpack_keys
+from export_dashboards import collect_aggregates, resolve_products
+from modifier_resolve import (
+    item_kinds,
+    modifier_parents,
+    resolve_unit_prices,
+    rollup_modifiers,
+    transaction_order,
+)
+from money import ROW_CENTS, line_revenue_cents, parse_cents, row_cents, scale_cents, to_dollars
+from seasonal_forecast import seasonal_forecast
+from weekly_series import WeeklySeries
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+CSV_HEADER = ['Transaction ID', 'Item ID', 'Transaction Type', 'Name', 'Item Type',
+              'Item Created Date', 'Item Created Time', 'Quantity', 'Unit Amount', 'Total',
+              'Deleted', 'Voided', 'Department', 'Subdepartment']
+NAMES = {
+    'Food': ['Pizza', 'Wings', 'Nachos', 'Burger'],
+    'Bar': ['Draft Beer', 'Margarita', 'Soda'],
+    'Bowling': ['Time Bowling', 'Shoe Rental'],
+}
+MODIFIER_NAMES = ['Extra Cheese', 'Ranch', 'Add Bacon', 'Large']
+QUANTITIES = ['1', '1', '2', '3', '', '0', '0.5', '0.1667', '1.5']
+
+
+def random_lines(rng, first_txn, n_txns, start=date(2025, 1, 1), days=10):
+    """POS line items for n_txns transactions, as lists of CSV_HEADER values."""
+    lines = []
+    item_id = first_txn * 100
+    for txn in range(first_txn, first_txn + n_txns):
+        day = (start + timedelta(days=rng.randrange(days))).isoformat()
+        txn_type = 'Refund' if rng.random() < 0.05 else 'Sales'
+        for _ in range(rng.randint(1, 7)):
+            item_id += rng.randint(1, 3)
+            dept = rng.choice(sorted(NAMES))
+            kind = rng.choice(['Product', 'Product', 'Modifier', 'Modifier', 'Package', 'Adjustment'])
+            name = rng.choice(MODIFIER_NAMES if kind == 'Modifier' else NAMES[dept])
+            unit = rng.choice([0, 0, 150, 475, 1299, 2000])
+            total = rng.choice([0, unit]) if kind != 'Adjustment' else -rng.randint(1, 500)
+            lines.append([
+                str(txn), str(item_id), txn_type, name, kind, day, '18:00:00',
+                rng.choice(QUANTITIES), f'{unit / 100:.4f}', f'{total / 100:.4f}',
+                'True' if rng.random() < 0.03 else 'False', 'False',
+                dept, rng.choice(['', '10. Pizza', 'Pizza', '2. Draft Beer']),
+            ])
+            if rng.random() < 0.05:
+                lines.append(list(lines[-1]))   # duplicate (Transaction ID, Item ID)
+    return lines
+
+
+def write_csv(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8', newline='') as f:
+        if mode == 'w':
+            f.write(';'.join(CSV_HEADER) + '\n')
+        for line in lines:
+            f.write(';'.join(line) + '\n')
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the ETL's progress output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class Report:
+    """Collects per-check results and prints them as they come in."""
+
+    def __init__(self):
+        self.failed = []
+
+    def check(self, name, ok, detail=''):
+        print(f'  {"OK  " if ok else "FAIL"}  {name}' + (f'  ({detail})' if detail and not ok else ''))
+        if not ok:
+            self.failed.append(name)
+
+
+# =============================================================================
+# MODIFIER RESOLUTION
+# =============================================================================
+
+def walk_parents(txn_ids, item_ids, item_types):
+    """
+    Old path: group rows by transaction (first-seen order), sort each by Item
+    ID and attach every Modifier to the latest Product. A Package or the
+    start of a transaction breaks the chain. Returns (order, parents).
+    """
+    groups = {}
+    for i, txn in enumerate(txn_ids):
+        groups.setdefault(txn, []).append(i)
+    order = []
+    parents = []
+    for rows in groups.values():
+        rows.sort(key=lambda i: item_ids[i])
+        current = None
+        for i in rows:
+            pos = len(order)
+            order.append(i)
+            parents.append(-1)
+            if item_types[i] == 'Package':
+                current = None
+            elif item_types[i] == 'Product':
+                current = pos
+            elif item_types[i] == 'Modifier' and current is not None:
+                parents[pos] = current
+    return order, parents
+
+
+def walk_transaction(rows):
+    """Old export_dashboards.resolve_transaction, on cents: [(item_id, item_total)] of Products and Packages."""
+    rows = sorted(rows, key=lambda r: r['item_id'])
+    out = []
+    current = None
+    mod_cost = 0
+    for r in rows:
+        if r['item_type'] in ('Package', 'Product'):
+            if current is not None:
+                out.append((current['item_id'], current['item_total'] + (mod_cost if mod_cost > 0 else 0)))
+            current = r if r['item_type'] == 'Product' else None
+            mod_cost = 0
+            if r['item_type'] == 'Package':
+                out.append((r['item_id'], r['item_total']))
+        elif r['item_type'] == 'Modifier' and current is not None:
+            mt = r['item_total']
+            mod_cost += mt if mt != 0 else scale_cents(r['unit_price'], r['qty'] if r['qty'] else 1)
+    if current is not None:
+        out.append((current['item_id'], current['item_total'] + (mod_cost if mod_cost > 0 else 0)))
+    return out
+
+
+def vector_parents(txn_ids, item_ids, item_types):
+    order = transaction_order(np.array(txn_ids), np.array(item_ids))
+    kinds = item_kinds(np.array(item_types, dtype=object))[order]
+    return order.tolist(), modifier_parents(np.array(txn_ids)[order], kinds).tolist()
+
+
+MODIFIER_CASES = [
+    # (name, [(txn, item, type)], expected parent item per row in walk order, None = unattached)
+    ('chain', [(1, 10, 'Product'), (1, 11, 'Modifier'), (1, 12, 'Modifier')], [None, 10, 10]),
+    ('orphan modifier first in transaction',
+     [(1, 10, 'Modifier'), (1, 11, 'Product'), (1, 12, 'Modifier')], [None, None, 11]),
+    ('Package breaks the chain',
+     [(1, 10, 'Product'), (1, 11, 'Package'), (1, 12, 'Modifier'), (1, 13, 'Modifier')],
+     [None, None, None, None]),
+    ('Product after Package restarts the chain',
+     [(1, 10, 'Package'), (1, 11, 'Modifier'), (1, 12, 'Product'), (1, 13, 'Modifier')],
+     [None, None, None, 12]),
+    ('transaction start breaks the chain',
+     [(1, 10, 'Product'), (2, 11, 'Modifier'), (2, 12, 'Product'), (2, 13, 'Modifier')],
+     [None, None, None, 12]),
+    ('rows sorted by Item ID first',
+     [(1, 12, 'Modifier'), (1, 11, 'Product'), (1, 10, 'Modifier')], [None, None, 11]),
+    ('interleaved transactions, first-seen order',
+     [(7, 20, 'Product'), (3, 30, 'Product'), (7, 21, 'Modifier'), (3, 31, 'Modifier')],
+     [None, 20, None, 30]),
+]
+
+
+def check_modifiers(report, rng):
+    for name, rows, expected in MODIFIER_CASES:
+        txns, items, types = (list(col) for col in zip(*rows))
+        old_order, old_parents = walk_parents(txns, items, types)
+        new_order, new_parents = vector_parents(txns, items, types)
+        got = [items[new_order[p]] if p >= 0 else None for p in new_parents]
+        report.check(f'modifier_parents: {name}',
+                     new_order == old_order and new_parents == old_parents and got == expected,
+                     f'expected {expected}, got {got}')
+
+    n = 5000
+    txns = [rng.randrange(400) for _ in range(n)]
+    items = [rng.randrange(10 ** 6) for _ in range(n)]
+    types = [rng.choice(['Product', 'Product', 'Modifier', 'Modifier', 'Modifier', 'Package'])
+             for _ in range(n)]
+    report.check('modifier_parents: 5,000 random rows',
+                 vector_parents(txns, items, types) == walk_parents(txns, items, types))
+
+    # Modifier sums in row order: int cents exactly, floats bit for bit
+    order, parents = walk_parents(txns, items, types)
+    cents = [rng.randrange(-500, 5000) for _ in range(n)]
+    dollars = [c / 100 for c in cents]
+    for label, amounts in (('int cents', cents), ('float dollars', dollars)):
+        expected = [0] * n
+        for pos, parent in enumerate(parents):
+            if parent >= 0:
+                expected[parent] += amounts[order[pos]]
+        got = rollup_modifiers(np.array(parents), np.array(amounts)[order]).tolist()
+        report.check(f'rollup_modifiers: {label}', got == expected)
+
+    # PDF/CSV exporters: zero-priced Product takes its Modifiers' summed Unit Amount
+    units = [rng.choice([0, 0, 250, 999]) for _ in range(n)]
+    expected = [units[i] for i in order]
+    mod_sum = [0] * n
+    for pos, parent in enumerate(parents):
+        if parent >= 0:
+            mod_sum[parent] += units[order[pos]]
+    for pos in range(n):
+        if types[order[pos]] == 'Product' and expected[pos] == 0 and mod_sum[pos] > 0:
+            expected[pos] = mod_sum[pos]
+    new_order, new_units = resolve_unit_prices(np.array(txns), np.array(items),
+                                               item_kinds(np.array(types, dtype=object)), np.array(units))
+    report.check('resolve_unit_prices vs walker', new_order.tolist() == order and new_units.tolist() == expected)
+
+    # export_dashboards.resolve_products vs the old resolve_transaction walker
+    cols = {
+        'txn_id': np.array(txns, dtype=np.int64),
+        'item_id': np.array(items, dtype=np.int64),
+        'item_type': np.array(types, dtype=object),
+        'qty': np.array([rng.choice([0, 1, 2, 0.5]) for _ in range(n)], dtype=np.float64),
+        'unit_price': np.array(units, dtype=np.int64),
+        'item_total': np.array([rng.choice([0, 0, 120, -80, 1500]) for _ in range(n)], dtype=np.int64),
+    }
+    _, first = np.unique(cols['txn_id'], return_index=True)
+    rank = {t: r for r, t in enumerate(cols['txn_id'][np.sort(first)].tolist())}
+    cols['ordinal'] = np.array([rank[t] for t in txns], dtype=np.int64)
+    groups = {}
+    for i in range(n):
+        groups.setdefault(txns[i], []).append({k: v[i].item() if hasattr(v[i], 'item') else v[i]
+                                               for k, v in cols.items()})
+    expected = [pair for rows in groups.values() for pair in walk_transaction(rows)]
+    resolved = resolve_products(cols)
+    got = list(zip(resolved['item_id'].tolist(), resolved['item_total'].tolist()))
+    report.check('resolve_products vs resolve_transaction walker', got == expected)
+
+
+# =============================================================================
+# DEDUP
+# =============================================================================
+
+def check_dedup(report, rng):
+    batches = [[(rng.randrange(-1, 300), rng.randrange(-1, 50)) for _ in range(2000)] for _ in range(3)]
+    seen = set()
+    index = DedupIndex()
+    same = True
+    for batch in batches:
+        expected = []
+        for key in batch:
+            expected.append(key in seen)
+            seen.add(key)
+        keys = pack_keys([t for t, _ in batch], [i for _, i in batch])
+        same &= index.mark_duplicates(keys).tolist() == expected
+    report.check('DedupIndex.mark_duplicates vs set, 3 batches with repeats', same and len(index) == len(seen))
+
+    txn, item = unpack_keys(index.keys)
+    report.check('pack_keys / unpack_keys round trip (including -1 IDs)',
+                 set(zip(txn.tolist(), item.tolist())) == seen)
+
+    def random_set():
+        return {rng.randrange(200) for _ in range(rng.randrange(1, 120))}
+
+    ok = True
+    for _ in range(50):
+        a, b = random_set(), random_set()
+        ia, ib = DedupIndex(sorted(a)), DedupIndex(sorted(b))
+        ok &= ia.missing(sorted(b)).keys.tolist() == sorted(b - a)
+        ok &= ia.isdisjoint(ib) == a.isdisjoint(b)
+        merged = ia.copy()
+        merged.update(ib)
+        ok &= merged.keys.tolist() == sorted(a | b) and ia.keys.tolist() == sorted(a)
+    report.check('DedupIndex missing/isdisjoint/update vs set algebra (etl_state ownership)', ok)
+
+
+# =============================================================================
+# CHUNKED PARSE
+# =============================================================================
+
+def tables_equal(a, b):
+    if a.columns != b.columns or len(a) != len(b):
+        return False
+    for col in a.columns:
+        if col in a.dictionaries:
+            if a.decode(col) != b.decode(col):
+                return False
+        elif not np.array_equal(a[col], b[col]):
+            return False
+    return True
+
+
+def check_parse(report, rng, tmp):
+    path = os.path.join(tmp, 'chunked.csv')
+    write_csv(path, random_lines(rng, 1000, 300))
+    saved = pos_cache.MIN_CHUNK_BYTES
+    pos_cache.MIN_CHUNK_BYTES = 1
+    try:
+        serial = pos_cache.parse_pos_csv(path)
+        for workers in (2, 3, 7):
+            report.check(f'parse_pos_csv: {workers} byte-range chunks vs serial',
+                         tables_equal(serial, pos_cache.parse_pos_csv(path, workers=workers)))
+        # A quoted field anywhere falls back to a serial parse
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('1300;999999;Sales;"Pizza; large";Product;2025-01-02;18:00:00;1;5.0000;5.0000;'
+                    'False;False;Food;Pizza\n')
+        serial = pos_cache.parse_pos_csv(path)
+        report.check('parse_pos_csv: quoted field -> serial fallback',
+                     tables_equal(serial, pos_cache.parse_pos_csv(path, workers=3))
+                     and 'Pizza; large' in serial.strings('Name'))
+    finally:
+        pos_cache.MIN_CHUNK_BYTES = saved
+
+
+# =============================================================================
+# MONEY
+# =============================================================================
+
+def old_line_dollars(total_text, unit_text, qty):
+    """Old float path: Total when set, else Unit Amount x Quantity (or Unit Amount)."""
+    total = float(total_text or 0)
+    if total != 0:
+        return total
+    unit = float(unit_text or 0)
+    return unit * qty if qty else unit
+
+
+def check_money(report, rng):
+    exact = True
+    close = True
+    old_sum = 0.0
+    new_sum = 0
+    fractional = 0
+    for _ in range(20000):
+        unit = f'{rng.randrange(-5000, 50000) / 100:.4f}'
+        total = rng.choice(['', '0.0000', unit, f'{rng.randrange(1, 99999) / 100:.4f}'])
+        qty = float(rng.choice(QUANTITIES) or 0)
+        old = old_line_dollars(total, unit, qty)
+        new = line_revenue_cents(parse_cents(total), parse_cents(unit), qty)
+        old_sum += old
+        new_sum += new
+        if qty == int(qty):
+            exact &= new == round(old * 100)
+        else:
+            fractional += 1
+            close &= abs(new - old * 100) <= 0.5 + 1e-6
+    report.check('line_revenue_cents vs float dollars, whole quantities', exact)
+    report.check('line_revenue_cents vs float dollars, fractional quantities (nearest cent)', close)
+    # Only fractional-quantity lines can round differently, by under half a cent each
+    report.check('20,000-line total vs the float sum',
+                 abs(to_dollars(new_sum) - old_sum) <= 0.005 * fractional + 1e-6,
+                 f'{to_dollars(new_sum)} vs {old_sum:.4f}')
+
+    cents = list(range(-200000, 200001)) + [10 ** 9 + 1, 123456789012]
+    report.check('row_cents(to_dollars(c)) == c (exported dollars read back)',
+                 all(row_cents({'revenue': to_dollars(c)}) == c for c in cents))
+    report.check('row_cents prefers the ETL cents',
+                 row_cents({'revenue': 0.1 + 0.2, ROW_CENTS: 30}) == 30
+                 and row_cents({'revenue': None}) == 0)
+
+
+# =============================================================================
+# DATES
+# =============================================================================
+
+def check_dates(report, rng):
+    values = ['2024-02-29', '2023-02-29', '2020-12-31', '2021-01-03', '2026-01-01', '2027-01-01',
+              '', None, 'bad-date', '2025-1-5', ' 2025-01-05']
+    values += [(date(2019, 1, 1) + timedelta(days=rng.randrange(3000))).isoformat() for _ in range(500)]
+    codes, days = encode_dates(values)
+    ok = True
+    for value, code in zip(values, codes.tolist()):
+        try:
+            d = datetime.strptime(value, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            ok &= not days.valid[code] and days.ordinal[code] == -1
+            continue
+        iso = d.isocalendar()
+        ok &= bool(days.valid[code]) and [
+            days.ordinal[code], days.year[code], days.month[code], days.weekday[code],
+            days.week_start[code], days.iso_year[code], days.iso_week[code],
+        ] == [d.toordinal(), d.year, d.month, d.weekday(),
+              d.toordinal() - d.weekday(), iso[0], iso[1]]
+    report.check('encode_dates vs per-row strptime (ISO week 53, leap days, invalid)', ok)
+    report.check('DateIndex.datetimes',
+                 days.datetimes()[codes[0]] == datetime(2024, 2, 29) and days.datetimes()[codes[7]] is None)
+
+
+# =============================================================================
+# COLUMNAR
+# =============================================================================
+
+def check_columnar(report, rng):
+    rows = []
+    for i in range(1000):
+        cents = rng.randrange(-5000, 500000)
+        rows.append({
+            'date': rng.choice(['2025-03-01', '2025-03-02', '2024-12-31', 'bad-date', '2025-3-4', '']),
+            'name': rng.choice(['Pizza', 'Café Latte', 'Wings', '']),
+            'department': rng.choice(['Food', 'Bar']),
+            'subdepartment': rng.choice(['', 'Pizza', 'Draft Beer']),
+            'category': rng.choice(['Pizza', 'Other']),
+            'quantity': rng.choice([1, 2.5, 0.1667]),
+            'revenue': to_dollars(cents),
+            'transactions': rng.randrange(1, 9),
+            ROW_CENTS: cents,
+        })
+    decoded = decode_rows(json.loads(json.dumps(encode_rows(rows), separators=(',', ':'))))
+    plain = [{k: v for k, v in r.items() if k != ROW_CENTS} for r in rows]
+    report.check('columnar-v1 encode -> JSON -> decode round trip (raw dates kept)', decoded == plain)
+    from_dollars = encode_rows(plain)['columns']['revenueCents']
+    report.check('columnar revenueCents from ETL cents == from exported dollars',
+                 from_dollars == [r[ROW_CENTS] for r in rows])
+
+
+# =============================================================================
+# ETL STATE
+# =============================================================================
+
+def old_straddles(txn_ids, watermark):
+    """Old per-row check: any appended row belongs to a transaction seen before the watermark."""
+    before = set(txn_ids[:watermark])
+    return any(t in before for t in txn_ids[watermark:])
+
+
+def appended_watermark(path, entry):
+    return etl_state._appended_rows(path, entry, pos_cache.parse_pos_csv(path))
+
+
+def same_values(a, b):
+    """Equal, except float quantities summed per file may differ in the last bits."""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_values(a[k], b[k]) for k in a)
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-12, abs_tol=1e-9)
+    return a == b
+
+
+def aggregates_equal(a, b):
+    return all(same_values(a[k], b[k]) for k in a if k != 'stats')
+
+
+def check_etl(report, rng, tmp):
+    data = os.path.join(tmp, 'data')
+    os.makedirs(data)
+    saved = pos_cache.CACHE_DIR, etl_state.STATE_DIR, etl_state.MANIFEST
+    pos_cache.CACHE_DIR = os.path.join(data, '.cache')
+    etl_state.STATE_DIR = os.path.join(pos_cache.CACHE_DIR, 'etl')
+    etl_state.MANIFEST = os.path.join(etl_state.STATE_DIR, 'manifest.json')
+    try:
+        a, b = os.path.join(data, 'a.csv'), os.path.join(data, 'b.csv')
+        a_lines = random_lines(rng, 1, 80)
+        write_csv(a, a_lines)
+        # b re-lists a's first transactions (dedup across files)
+        write_csv(b, random_lines(rng, 200, 80) + [l for l in a_lines if int(l[0]) <= 5])
+        files = [a, b]
+
+        def incremental_matches(label):
+            with quiet():
+                got = etl_state.update_aggregates(files, collect_aggregates)
+                full = collect_aggregates(files, seen=None)
+            report.check(f'incremental ETL == full scan: {label}', aggregates_equal(got, full))
+
+        incremental_matches('first run')
+
+        cases = [
+            ('new transactions appended', random_lines(rng, 300, 10), False),
+            ('appended row of an already-ingested transaction',
+             [['250', '99999', 'Sales', 'Pizza', 'Product', '2025-01-03', '18:00:00', '1',
+               '9.0000', '9.0000', 'False', 'False', 'Food', 'Pizza']], True),
+            ('appended copies of another file\'s transactions',
+             [l for l in a_lines if 10 <= int(l[0]) <= 12], False),
+        ]
+        for label, lines, straddle in cases:
+            entry = etl_state._read_manifest()[os.path.abspath(b)]
+            write_csv(b, lines, mode='a')
+            watermark = appended_watermark(b, entry)
+            txn = pos_cache.parse_pos_csv(b)['Transaction ID'].tolist()
+            report.check(f'straddle detection vs per-row set: {label}',
+                         (watermark is None) == old_straddles(txn, entry['rows']) == straddle
+                         and (straddle or watermark == entry['rows']))
+            incremental_matches(label)
+
+        # Old bytes rewritten (same size): never treated as an append
+        entry = etl_state._read_manifest()[os.path.abspath(a)]
+        with open(a, 'r', encoding='utf-8') as f:
+            text = f.read()
+        with open(a, 'w', encoding='utf-8') as f:
+            f.write(text.replace('Pizza', 'Pizzb', 1) + '\n'.join(';'.join(l) for l in random_lines(rng, 400, 2)) + '\n')
+        report.check('rewritten prefix is not an append', appended_watermark(a, entry) is None)
+        incremental_matches('rewritten prefix')
+    finally:
+        pos_cache.CACHE_DIR, etl_state.STATE_DIR, etl_state.MANIFEST = saved
+
+
+# =============================================================================
+# FORECAST
+# =============================================================================
+
+def check_forecast(report, rng):
+    first = datetime(2022, 1, 3)
+    n_weeks = 170
+    cents = np.array([[rng.randrange(0, 60000) for _ in range(n_weeks)] for _ in range(4)], dtype=np.int64)
+    cents[1, :60] = 0           # history starts at the first sale
+    cents[2, 100:110] = 0       # gaps count as zero weeks
+    cents[3, :] = 0
+    cents[3, 150:] = 5000       # too short for any seasonal history
+    series = WeeklySeries('department', [(f'D{i}',) for i in range(4)], first.toordinal(), cents)
+
+    for kwargs in ({'num_future_weeks': 6}, {'num_future_weeks': 1, 'lookback': 2},
+                   {'start_from_year': 2024}, {'start_from_year': 2025}):
+        future, preds, _ = seasonal_forecast(series, **kwargs)
+        ok = True
+        for i in range(len(series)):
+            start = int((cents[i] != 0).argmax())
+            weekly = {first + timedelta(days=7 * w): cents[i, w] / 100 for w in range(start, n_weeks)}
+            old = compute_weekly_forecast(weekly, build_52week_by_year(weekly), **kwargs)
+            ok &= [w for w, _ in old] == future   # date == datetime is False, so types must match
+            ok &= bool(np.allclose([v for _, v in old], preds[i], rtol=0, atol=1e-9))
+        report.check(f'seasonal_forecast vs compute_weekly_forecast {kwargs}', ok)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+CHECKS = {
+    'modifiers': check_modifiers,
+    'dedup': check_dedup,
+    'parse': check_parse,
+    'money': check_money,
+    'dates': check_dates,
+    'columnar': check_columnar,
+    'etl': check_etl,
+    'forecast': check_forecast,
+}
+NEEDS_TMP = {'parse', 'etl'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check vectorized ETL/forecast code against the old per-row paths.')
+    parser.add_argument('--only', nargs='+', choices=list(CHECKS), default=list(CHECKS),
+                        help='Run only these checks (default: all)')
+    parser.add_argument('--seed', type=int, default=1, help='Random fixture seed (default: 1)')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('PARITY CHECKS')
+    print('=' * 60)
+    report = Report()
+    tmp = tempfile.mkdtemp(prefix='parity-')
+    try:
+        for name in args.only:
+            print(f'\n{name}:')
+            rng = random.Random(f'{args.seed}-{name}')
+            if name in NEEDS_TMP:
+                os.makedirs(os.path.join(tmp, name))
+                CHECKS[name](report, rng, os.path.join(tmp, name))
+            else:
+                CHECKS[name](report, rng)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print()
+    if report.failed:
+        print(f'{len(report.failed)} check(s) FAILED')
+        return 1
+    print('All checks passed.')
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
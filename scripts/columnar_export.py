@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+columnar_export.py
+
+Compact columnar JSON for item x date rows (transactions / modifier
+transactions). Instead of an array of objects repeating every key and string,
+rows become parallel integer arrays:
+
+  {
+    "format": "columnar-v1",
+    "rows": 3,
+    "epoch": "2026-01-01",                  day 0
+    "dictionaries": {"name": [...], "department": [...],
+                     "subdepartment": [...], "category": [...]},
+    "columns": {
+      "day":          [0, 0, 1],            days since epoch
+      "name":         [0, 1, 0],            codes into dictionaries
+      "department":   [...], "subdepartment": [...], "category": [...],
+      "quantity":     [2, 1, 5],
+      "revenueCents": [1390, 250, 3475],
+      "transactions": [2, 1, 4]
+    },
+    "rawDates": {"17": "bad-date"}          only for rows whose date isn't YYYY-MM-DD
+  }
+
+Row order is kept. The app decodes it with app/lib/columnar.ts.
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from money import row_cents
+
+FORMAT = 'columnar-v1'
+STRING_FIELDS = ('name', 'department', 'subdepartment', 'category')
+# Serialized fields of an item x date row, in transactions.json key order
+ROW_FIELDS = ('date', 'name', 'department', 'subdepartment', 'category',
+              'quantity', 'revenue', 'transactions')
+
+
+def _ordinal(date_str):
+    """Day ordinal of a canonical 'YYYY-MM-DD' string, else None."""
+    try:
+        d = date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        return None
+    return d.toordinal() if d.isoformat() == date_str else None
+
+
+class ColumnarEncoder:
+    """
+    Builds a columnar-v1 dict one row at a time (add), so rows can be
+    encoded as they are streamed out instead of held in a list. Days are
+    stored as ordinals and shifted to the epoch in data().
+    """
+
+    def __init__(self):
+        self.lookups = {field: {} for field in STRING_FIELDS}
+        self.columns = {field: [] for field in ('day',) + STRING_FIELDS + ('quantity', 'revenueCents', 'transactions')}
+        self.raw_dates = {}
+        self.rows = 0
+
+    def add(self, r):
+        o = _ordinal(r['date'])
+        if o is None:
+            self.raw_dates[str(self.rows)] = r['date']
+        self.columns['day'].append(o)
+        for field in STRING_FIELDS:
+            d = self.lookups[field]
+            self.columns[field].append(d.setdefault(r[field], len(d)))
+        self.columns['quantity'].append(r['quantity'])
+        self.columns['revenueCents'].append(row_cents(r))
+        self.columns['transactions'].append(r['transactions'])
+        self.rows += 1
+
+    def data(self):
+        """The columnar-v1 dict for the rows added so far."""
+        valid = [o for o in self.columns['day'] if o is not None]
+        epoch = min(valid) if valid else date(1970, 1, 1).toordinal()
+        columns = dict(self.columns, day=[-1 if o is None else o - epoch for o in self.columns['day']])
+        data = {
+            'format': FORMAT,
+            'rows': self.rows,
+            'epoch': date.fromordinal(epoch).isoformat(),
+            'dictionaries': {field: list(d) for field, d in self.lookups.items()},
+            'columns': columns,
+        }
+        if self.raw_dates:
+            data['rawDates'] = dict(self.raw_dates)
+        return data
+
+
+def encode_rows(rows):
+    """Row dicts (date, name, department, subdepartment, category, quantity,
+    revenue in dollars, transactions) -> columnar-v1 dict."""
+    encoder = ColumnarEncoder()
+    for r in rows:
+        encoder.add(r)
+    return encoder.data()
+
+
+def decode_rows(data):
+    """columnar-v1 dict -> row dicts (inverse of encode_rows)."""
+    if data.get('format') != FORMAT:
+        raise ValueError(f'Unsupported columnar format: {data.get("format")!r}')
+    epoch = date.fromisoformat(data['epoch']).toordinal()
+    columns = data['columns']
+    dictionaries = data['dictionaries']
+    raw_dates = data.get('rawDates', {})
+    day_strings = {}
+
+    rows = []
+    for i in range(data['rows']):
+        day = columns['day'][i]
+        if day < 0:
+            date_str = raw_dates[str(i)]
+        else:
+            date_str = day_strings.get(day)
+            if date_str is None:
+                date_str = day_strings[day] = date.fromordinal(epoch + day).isoformat()
+        row = {'date': date_str}
+        for field in STRING_FIELDS:
+            row[field] = dictionaries[field][columns[field][i]]
+        row['quantity'] = columns['quantity'][i]
+        row['revenue'] = round(columns['revenueCents'][i] / 100, 2)
+        row['transactions'] = columns['transactions'][i]
+        rows.append(row)
+    return rows
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+date_index.py
+
+Shared date-encoding layer. Each distinct 'YYYY-MM-DD' string is parsed once
+into an integer day ordinal (datetime.toordinal()), with calendar fields
+precomputed as arrays indexed by the same code. Row loops then do integer
+lookups instead of calling strptime per row.
+
+  codes, days = encode_dates(date_strings)      # any row-ordered strings
+  codes, days = table_dates(table)              # PosTable string column
+  days.valid[codes]          True where the string parsed
+  days.ordinal[codes]        day ordinal (-1 when invalid)
+  days.weekday[codes]        0 = Monday
+  days.week_start[codes]     ordinal of that week's Monday
+  days.iso_year / iso_week / month / year [codes]
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+DATE_FORMAT = '%Y-%m-%d'
+_EPOCH = datetime(1970, 1, 1).toordinal()
+
+
+def parse_ordinal(date_str):
+    """Day ordinal of a 'YYYY-MM-DD' string, or -1 when it doesn't parse."""
+    try:
+        return datetime.strptime(date_str, DATE_FORMAT).toordinal()
+    except (TypeError, ValueError):
+        return -1
+
+
+class DateIndex:
+    """Calendar arrays for a list of distinct date strings (index = code)."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.ordinal = np.array([parse_ordinal(v) for v in self.values], dtype=np.int64)
+        self.valid = self.ordinal >= 0
+        o = np.where(self.valid, self.ordinal, _EPOCH)
+
+        days = (o - _EPOCH).astype('datetime64[D]')
+        self.year = days.astype('datetime64[Y]').astype(np.int64) + 1970
+        self.month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        self.weekday = (o + 6) % 7
+        self.week_start = o - self.weekday
+
+        # ISO week: the week's Thursday decides the ISO year
+        thursday = self.week_start + 3
+        iso_days = (thursday - _EPOCH).astype('datetime64[D]')
+        self.iso_year = iso_days.astype('datetime64[Y]').astype(np.int64) + 1970
+        jan1 = (iso_days.astype('datetime64[Y]').astype('datetime64[D]')
+                .astype(np.int64) + _EPOCH)
+        self.iso_week = (thursday - jan1) // 7 + 1
+
+    def __len__(self):
+        return len(self.values)
+
+    def datetimes(self, ordinals=None):
+        """
+        datetime per code for an ordinal array (default: the dates
+        themselves; e.g. pass week_start); None for invalid codes.
+        """
+        ordinals = self.ordinal if ordinals is None else ordinals
+        return [datetime.fromordinal(o) if ok else None
+                for o, ok in zip(ordinals.tolist(), self.valid.tolist())]
+
+
+def encode_dates(values):
+    """(int64 codes, DateIndex) for row-ordered date strings."""
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values),
+                        dtype=np.int64, count=len(values))
+    return codes, DateIndex(lookup)
+
+
+def table_dates(table, col='Item Created Date'):
+    """(codes, DateIndex) for a PosTable date column, whitespace stripped."""
+    codes, values = table.stripped(col)
+    return codes, DateIndex(values)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+etl_state.py
+
+Persisted per-file intermediate aggregates for export_dashboards, so a daily
+refresh only re-reads what changed. Stored under data/.cache/etl/:
+
+  manifest.json        one entry per ingested CSV: source fingerprint
+                       (size, mtime, sha256), POS row count (the watermark),
+                       dedup stats, date range and the files below
+  <name>-<tag>.json    that file's aggregates (item x date x department
+                       buckets, deductions per (date, dept), modifiers,
+                       bowling daily revenue)
+  <name>-<tag>.keys.npy  packed (Transaction ID, Item ID) keys the file owns
+                       (dedup_index), i.e. first seen in that file in
+                       find_csv_files() order
+
+Per file, an incremental run decides:
+  unchanged  fingerprint matches        -> reuse stored aggregates, never read
+  appended   old bytes are an unchanged prefix and no transaction straddles
+             the old end               -> scan only rows past the watermark
+                                          and merge the delta in
+  changed / new                        -> rescan that file only
+A removed file, or a rescan that shifts key ownership between files (which
+would change dedup results elsewhere), falls back to a full rebuild.
+
+Merging is in file order: numeric fields are summed, string fields keep the
+last non-empty value and unit_price keeps the last positive value, matching
+a single scan over all files.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pos_cache import CACHE_DIR, file_fingerprint, load_pos_table
+from dedup_index import DedupIndex, memory_report
+from pos_scan import sales_keys
+
+STATE_DIR = os.path.join(CACHE_DIR, 'etl')
+MANIFEST = os.path.join(STATE_DIR, 'manifest.json')
+STATE_VERSION = 3
+
+LAST_POSITIVE_FIELDS = {'unit_price'}
+
+
+# =============================================================================
+# AGGREGATE (DE)SERIALIZATION + MERGE
+# =============================================================================
+
+def _encode(aggregates):
+    """Tuple-keyed aggregate maps -> JSON-safe [key, value] pair lists."""
+    out = {'stats': aggregates['stats']}
+    for name, table in aggregates.items():
+        if name == 'stats':
+            continue
+        out[name] = [[list(k) if isinstance(k, tuple) else k, v] for k, v in table.items()]
+    return out
+
+
+def _decode(data):
+    aggregates = {'stats': data['stats']}
+    for name, pairs in data.items():
+        if name == 'stats':
+            continue
+        aggregates[name] = {(tuple(k) if isinstance(k, list) else k): v for k, v in pairs}
+    return aggregates
+
+
+def _merge_value(old, new):
+    if not isinstance(new, dict):
+        return old + new
+    merged = dict(old)
+    for field, value in new.items():
+        if isinstance(value, str):
+            if value:
+                merged[field] = value
+        elif field in LAST_POSITIVE_FIELDS:
+            if value > 0:
+                merged[field] = value
+        else:
+            merged[field] = merged.get(field, 0) + value
+    return merged
+
+
+def merge_aggregates(parts):
+    """Merge per-file aggregates (in file order) into one set."""
+    merged = {'stats': {}}
+    for part in parts:
+        for field, value in part['stats'].items():
+            merged['stats'][field] = merged['stats'].get(field, 0) + value
+        for name, table in part.items():
+            if name == 'stats':
+                continue
+            target = merged.setdefault(name, {})
+            for key, value in table.items():
+                target[key] = _merge_value(target[key], value) if key in target else value
+    return merged
+
+
+def _date_range(aggregates):
+    dates = [k[1] for k in aggregates.get('items', {}) if len(k[1]) >= 10]
+    return [min(dates), max(dates)] if dates else None
+
+
+# =============================================================================
+# STATE FILES
+# =============================================================================
+
+def _state_name(path):
+    tag = hashlib.sha1(path.encode('utf-8')).hexdigest()[:10]
+    return f'{os.path.basename(path)}-{tag}'
+
+
+def _read_manifest():
+    if not os.path.isfile(MANIFEST):
+        return {}
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != STATE_VERSION:
+        return {}
+    return {entry['source']['path']: entry for entry in manifest['files']}
+
+
+def _write_manifest(entries):
+    tmp = MANIFEST + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': STATE_VERSION, 'files': entries}, f, indent=2)
+    os.replace(tmp, MANIFEST)
+
+
+def _load_part(entry):
+    with open(os.path.join(STATE_DIR, entry['aggregates']), 'r', encoding='utf-8') as f:
+        part = _decode(json.load(f))
+    return part, DedupIndex(np.load(os.path.join(STATE_DIR, entry['keys'])))
+
+
+def _save_part(path, fingerprint, rows, part, owned):
+    name = _state_name(path)
+    entry = {
+        'source': fingerprint,
+        'rows': rows,
+        'stats': part['stats'],
+        'dateRange': _date_range(part),
+        'aggregates': name + '.json',
+        'keys': name + '.keys.npy',
+    }
+    with open(os.path.join(STATE_DIR, entry['aggregates']), 'w', encoding='utf-8') as f:
+        json.dump(_encode(part), f, separators=(',', ':'))
+    np.save(os.path.join(STATE_DIR, entry['keys']), owned.keys)
+    return entry
+
+
+# =============================================================================
+# CHANGE DETECTION
+# =============================================================================
+
+def _prefix_sha256(path, size):
+    h = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def _is_unchanged(path, entry):
+    src = entry['source']
+    fp = file_fingerprint(path, with_hash=False)
+    if fp['size'] != src['size']:
+        return False
+    if fp['mtime_ns'] == src['mtime_ns']:
+        return True
+    return file_fingerprint(path)['sha256'] == src['sha256']
+
+
+def _appended_rows(path, entry, table):
+    """
+    Watermark row when the file only grew by whole rows appended after the
+    old end and none of the new rows belong to an already-ingested
+    transaction; None otherwise.
+    """
+    src = entry['source']
+    old_size = src['size']
+    if os.path.getsize(path) <= old_size or len(table) <= entry['rows']:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(old_size - 1)
+        if f.read(1) != b'\n':
+            return None
+    if _prefix_sha256(path, old_size) != src['sha256']:
+        return None
+    if table.has('Transaction ID'):
+        txn = table['Transaction ID']
+        if np.isin(txn[entry['rows']:], txn[:entry['rows']]).any():
+            return None
+    return entry['rows']
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+def _inspect_file(path, entry, chunk_workers=1):
+    """Load (parse + cache) one file; return its watermark and dedup keys."""
+    table = load_pos_table(path, workers=chunk_workers)
+    if table is None:
+        return None
+    watermark = _appended_rows(path, entry, table) if entry is not None else None
+    return {
+        'fingerprint': file_fingerprint(path),
+        'rows': len(table),
+        'watermark': watermark,
+        'keys': sales_keys(table, watermark or 0),
+    }
+
+
+def _collect_file(collect, path, seen, first_row):
+    return collect([path], seen=seen, first_row=first_row)
+
+
+def _map(fn, jobs, workers):
+    """fn(*job) for each job, in a process pool when workers > 1; results keep job order."""
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(fn, *zip(*jobs)))
+
+
+# =============================================================================
+# UPDATE
+# =============================================================================
+
+def update_aggregates(csv_files, collect, incremental=True, workers=1):
+    """
+    Return merged aggregates for csv_files, rescanning only what changed since
+    the last run (everything when incremental=False) and persisting per-file
+    state for the next run.
+    collect(files, seen=..., first_row=...) scans and returns aggregates
+    (see export_dashboards.collect_aggregates); it must be a module-level
+    function when workers > 1.
+
+    Files are loaded and scanned in up to `workers` processes (one file per
+    process, or byte-range chunks of each file when there are fewer files
+    than workers, see pos_cache.parse_pos_csv). Dedup
+    ownership is resolved up front from each file's keys in csv_files order,
+    so every worker gets the exact keys earlier files own and the merged
+    result matches the serial path.
+    """
+    os.makedirs(STATE_DIR, exist_ok=True)
+    paths = [os.path.abspath(p) for p in csv_files if os.path.isfile(p)]
+    previous = _read_manifest() if incremental else {}
+
+    removed = sorted(set(previous) - set(paths))
+    if removed:
+        print(f'  {", ".join(os.path.basename(p) for p in removed)} removed -> full rebuild')
+        previous = {}
+
+    stored = {}
+    for path in paths:
+        entry = previous.get(path)
+        if entry is not None:
+            try:
+                stored[path] = _load_part(entry)
+            except (OSError, ValueError):
+                previous.pop(path)
+
+    reuse = {p for p in stored if _is_unchanged(p, previous[p])}
+    todo = [p for p in paths if p not in reuse]
+    if len(todo) >= workers:
+        loaded = _map(_inspect_file, [(p, previous.get(p)) for p in todo], workers)
+    else:
+        # Fewer files than workers: split each file into byte-range chunks instead
+        loaded = [_inspect_file(p, previous.get(p), workers) for p in todo]
+    inspected = dict(zip(todo, loaded))
+
+    # Dedup ownership in file order, from keys alone
+    seen = DedupIndex()
+    plan = []
+    for i, path in enumerate(paths):
+        name = os.path.basename(path)
+        if path in reuse:
+            entry = previous[path]
+            rng = entry['dateRange'] or ['-', '-']
+            print(f'  {name}: unchanged ({rng[0]}..{rng[1]}), reusing aggregates')
+            seen.update(stored[path][1])
+            plan.append((path, None, stored[path][1]))
+            continue
+
+        info = inspected[path]
+        if info is None:
+            continue
+        later = DedupIndex()
+        for p in paths[i + 1:]:
+            if p in stored:
+                later.update(stored[p][1])
+
+        if info['watermark'] is not None:
+            old_owned = stored[path][1]
+            print(f'  {name}: {info["rows"] - info["watermark"]:,} rows appended '
+                  f'after row {info["watermark"]:,}')
+            scan_seen = seen.copy()
+            scan_seen.update(old_owned)
+            added = scan_seen.missing(info['keys'])
+            owned = old_owned.copy()
+            owned.update(added)
+            shifted = not added.isdisjoint(later)
+        else:
+            print(f'  {name}: {"changed" if path in stored else "new"}, rescanning')
+            scan_seen = seen.copy()
+            owned = seen.missing(info['keys'])
+            lost = len(owned.missing(stored[path][1].keys)) if path in stored else 0
+            # Lost keys may now belong to a later file; claimed ones already do
+            shifted = (lost and i + 1 < len(paths)) or not owned.isdisjoint(later)
+
+        if shifted:
+            print('  Dedup ownership shifted between files -> full rebuild')
+            return update_aggregates(csv_files, collect, incremental=False, workers=workers)
+
+        seen.update(owned)
+        plan.append((path, scan_seen, owned))
+
+    print(f'  Dedup index: {memory_report(seen)}')
+
+    jobs = [(collect, path, scan_seen, inspected[path]['watermark'] or 0)
+            for path, scan_seen, _ in plan if scan_seen is not None]
+    if workers > 1 and len(jobs) > 1:
+        print(f'  Scanning {len(jobs)} files in {min(workers, len(jobs))} worker processes...')
+    results = iter(_map(_collect_file, jobs, workers))
+
+    parts = []
+    entries = []
+    for path, scan_seen, owned in plan:
+        if scan_seen is None:
+            parts.append(stored[path][0])
+            entries.append(previous[path])
+            continue
+        info = inspected[path]
+        part = next(results)
+        if info['watermark'] is not None:
+            part = merge_aggregates([stored[path][0], part])
+        parts.append(part)
+        entries.append(_save_part(path, info['fingerprint'], info['rows'], part, owned))
+
+    _write_manifest(entries)
+    for stale in set(os.listdir(STATE_DIR)) - {os.path.basename(MANIFEST)} - {
+            f for e in entries for f in (e['aggregates'], e['keys'])}:
+        os.remove(os.path.join(STATE_DIR, stale))
+    return merge_aggregates(parts)
@@ -9,8 +9,15 @@ in food_items.txt, and writes a clean CSV with 5 columns:
 
 import csv
 import os
+import sys
 from datetime import datetime
-from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from date_index import table_dates
+from modifier_resolve import PRODUCT, item_kinds, resolve_unit_prices
+from pos_cache import active_rows, load_pos_table
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_FILE = os.path.join(_ROOT, 'data', 'oct25-jan26.csv')
@@ -33,74 +40,46 @@ DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
              'Friday', 'Saturday', 'Sunday']
 
 
-def _read_transactions():
-    """Phase 1: Read CSV rows and group by Transaction ID."""
-    transactions = defaultdict(list)
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f, delimiter=';')
-        header = next(reader)
-        idx = {c: header.index(c) for c in [
-            'Transaction ID', 'Item ID', 'Name', 'Item Type',
-            'Department', 'Unit Amount', 'Deleted', 'Voided',
-            'Item Created Date', 'Item Created Time',
-        ]}
-        max_idx = max(idx.values())
-        for row in reader:
-            if len(row) <= max_idx:
-                continue
-            if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                continue
-            item_type = row[idx['Item Type']]
-            if item_type not in ('Product', 'Modifier'):
-                continue
-            transactions[row[idx['Transaction ID']]].append({
-                'item_id':    int(row[idx['Item ID']]),
-                'name':       NAME_MERGE.get(row[idx['Name']].strip(),
-                                             row[idx['Name']].strip()),
-                'item_type':  item_type,
-                'department': row[idx['Department']].strip(),
-                'unit_price': float(row[idx['Unit Amount']] or 0),
-                'date':       row[idx['Item Created Date']].strip(),
-                'time':       row[idx['Item Created Time']].strip(),
-            })
-    return transactions
-
-
-def _resolve_products(transactions, allowed):
-    """Phase 2: Walk each transaction, link modifiers to parent products,
-    compute true costs, and yield resolved food product dicts."""
-    for rows in transactions.values():
-        rows.sort(key=lambda r: r['item_id'])
-        current_product = None
-        modifier_cost = 0.0
-
-        for r in rows:
-            if r['item_type'] == 'Product':
-                # Emit the previous product if it's one of ours
-                if current_product is not None:
-                    if current_product['unit_price'] == 0 and modifier_cost > 0:
-                        current_product['unit_price'] = modifier_cost
-                    yield current_product
-                    current_product = None
-                    modifier_cost = 0.0
-
-                # Check if this product is one we care about
-                if (r['name'] in allowed
-                        and r['department'] == 'Food'):
-                    current_product = r
-                    modifier_cost = 0.0
-                else:
-                    current_product = None
-                    modifier_cost = 0.0
-
-            elif r['item_type'] == 'Modifier' and current_product is not None:
-                modifier_cost += r['unit_price']
-
-        # Don't forget the last product in the transaction
-        if current_product is not None:
-            if current_product['unit_price'] == 0 and modifier_cost > 0:
-                current_product['unit_price'] = modifier_cost
-            yield current_product
+def _read_columns():
+    """Phase 1: Load Product/Modifier rows (columnar, via pos_cache)."""
+    table = load_pos_table(DATA_FILE)
+    rows = np.flatnonzero(active_rows(table) & table.matches('Item Type', 'Product', 'Modifier'))
+    names = [n.strip() for n in table.decode('Name', rows)]
+    day_codes, days = table_dates(table)
+    return {
+        'txn_id':     table['Transaction ID'][rows],
+        'item_id':    table['Item ID'][rows],
+        'kind':       item_kinds(table.decode('Item Type', rows)),
+        'name':       np.array([NAME_MERGE.get(n, n) for n in names], dtype=object),
+        'department': np.array([d.strip() for d in table.decode('Department', rows)], dtype=object),
+        'unit_price': table['Unit Amount'][rows],
+        'date':       np.array(days.values, dtype=object)[day_codes[rows]],
+        'day':        day_codes[rows],
+        'days':       days,   # DateIndex for the 'day' codes
+        'time':       np.array([t.strip() for t in table.decode('Item Created Time', rows)], dtype=object),
+    }
+
+
+def _resolve_products(cols, allowed):
+    """Phase 2: Link modifiers to parent products (modifier_resolve), fill
+    zero-priced products with their modifier cost, and yield resolved food
+    product dicts in transaction order."""
+    order, unit_prices = resolve_unit_prices(cols['txn_id'], cols['item_id'],
+                                             cols['kind'], cols['unit_price'])
+    names = cols['name'][order]
+    keep = ((cols['kind'][order] == PRODUCT)
+            & np.array([n in allowed for n in names], dtype=np.bool_)
+            & (cols['department'][order] == 'Food'))
+    for i in np.flatnonzero(keep).tolist():
+        j = order[i]
+        yield {
+            'name':       names[i],
+            'department': cols['department'][j],
+            'unit_price': int(unit_prices[i]) / 100,   # cents -> dollars
+            'date':       cols['date'][j],
+            'day':        int(cols['day'][j]),
+            'time':       cols['time'][j],
+        }
 
 
 def main():
@@ -111,27 +90,31 @@ def main():
     print(f'Loaded {len(allowed)} items from {FILTER_FILE}')
 
     print('Phase 1: Reading transactions...')
-    transactions = _read_transactions()
-    print(f'Phase 2: Resolving {len(transactions):,} transactions...')
+    cols = _read_columns()
+    print(f'Phase 2: Resolving {len(cols["txn_id"]):,} line items...')
 
     rows_written = 0
-    dates_seen = []
+    days_seen = []
+    days = cols['days']
+    valid = days.valid.tolist()
+    ordinals = days.ordinal.tolist()
+    weekdays = days.weekday.tolist()
     out_path = OUTPUT_FILE
 
     with open(out_path, 'w', encoding='utf-8', newline='') as fout:
         writer = csv.writer(fout)
         writer.writerow(['Name', 'Date', 'Time', 'Day_of_Week', 'Cost'])
 
-        for p in _resolve_products(transactions, allowed):
+        for p in _resolve_products(cols, allowed):
             date_str = p['date']
             time_str = p['time']
             cost = f'{p["unit_price"]:.4f}'
 
-            try:
-                dt = datetime.strptime(date_str, '%Y-%m-%d')
-                day_name = DAY_NAMES[dt.weekday()]
-                dates_seen.append(dt)
-            except ValueError:
+            day = p['day']
+            if valid[day]:
+                day_name = DAY_NAMES[weekdays[day]]
+                days_seen.append(ordinals[day])
+            else:
                 day_name = ''
 
             writer.writerow([p['name'], date_str, time_str, day_name, cost])
@@ -139,8 +122,8 @@ def main():
 
     # Summary
     size_kb = os.path.getsize(out_path) / 1024
-    min_d = min(dates_seen).strftime('%b %d, %Y') if dates_seen else 'N/A'
-    max_d = max(dates_seen).strftime('%b %d, %Y') if dates_seen else 'N/A'
+    min_d = datetime.fromordinal(min(days_seen)).strftime('%b %d, %Y') if days_seen else 'N/A'
+    max_d = datetime.fromordinal(max(days_seen)).strftime('%b %d, %Y') if days_seen else 'N/A'
 
     print(f'\nExported {rows_written:,} purchase records')
     print(f'Date range: {min_d} to {max_d}')
@@ -3,24 +3,81 @@
 export_dashboards.py  (v2)
 
 ETL: reads ALL POS CSVs, deduplicates, resolves modifiers, and outputs
-item x date rows for every department.
+item x date rows for every department. Each CSV is scanned once
+(pos_scan.scan_pos_files); products, deductions, modifiers and bowling
+revenue are collected by consumers fed from that single pass. Per-file
+aggregates are persisted (etl_state); --incremental only rescans new,
+changed or appended files; --workers N spreads files over N processes. Rows
+are then built from the aggregates a month at a time and streamed to every
+output below, so the full row list is never held in memory.
 
 Outputs:
   app/data/transactions.json  — one row per item per date (all departments)
+  app/data/transactions/      — the same rows as YYYY/MM.json partitions
+                                (columnar_export format) plus manifest.json,
+                                loaded lazily by the app
+  app/data/modifier_transactions(.columnar).json — Modifiers department rows
   app/data/summary.json       — pre-computed KPIs per department
+  app/data/rollups.json       — revenue/quantity/transactions cube by
+                                (day|week|month|year) x department x category
+  app/data/items/             — per-item daily/weekly series in name-hashed
+                                shards plus index.json (item history lookups)
+  app/data/item_search.json   — trigram name index + per-item totals
+  app/data/days/              — per-day detail (department/category totals,
+                                top items, deductions) as YYYY/MM.json month
+                                bundles plus index.json (calendar day modal)
   app/data/bowling_seasonality.json  — multi-year weekly by year
   app/data/bowling_forecast.json     — seasonal forecast + current year actuals
+  app/data/asset-manifest.json       — path -> content-hashed copy under hashed/
+                                       (scripts/publish.py; unchanged files are
+                                       never rewritten)
 """
 
+import argparse
 import csv
+import hashlib
 import json
 import os
+import pickle
+import shutil
+import sys
 import glob
-from datetime import datetime, timedelta
+import heapq
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
 from collections import defaultdict
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pos_scan import (
+    PosConsumer,
+    SALES_ITEM_TYPES,
+    line_revenue,
+    scan_pos_files,
+)
+from money import ROW_CENTS, group_sum, line_revenue_cents, row_cents, scale_cents, to_dollars
+from date_index import encode_dates
+from columnar_export import FORMAT as COLUMNAR_FORMAT, ROW_FIELDS, ColumnarEncoder, encode_rows
+from json_stream import JsonArrayWriter
+from publish import ENCODINGS, publish_bytes, publish_json, publish_outputs
+from etl_state import update_aggregates
+from modifier_resolve import (
+    PACKAGE,
+    PRODUCT,
+    item_kinds,
+    modifier_parents,
+    rollup_modifiers,
+    transaction_order,
+)
+
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_DIR = os.path.join(_ROOT, 'public', 'data')
+PARTITION_DIR = os.path.join(OUTPUT_DIR, 'transactions')
+ITEM_DIR = os.path.join(OUTPUT_DIR, 'items')
+DAY_DIR = os.path.join(OUTPUT_DIR, 'days')
 DATA_DIR = os.path.join(_ROOT, 'data')
 CATEGORY_OVERRIDES = os.path.join(_ROOT, 'config', 'categories.json')
 BOWLING_FORECAST_CSV = os.path.join(_ROOT, 'output', 'bowling_sarima_forecast.csv')
@@ -73,16 +130,6 @@ CATEGORY_COLORS = {
 YEAR_COLORS = ['#00b0ff', '#f5a623', '#ff5252', '#03dac6', '#ff9100', '#bb86fc']
 
 
-def normalize_subdepartment(subdept):
-    """Strip numbered prefixes from subdepartment names.
-    POS naming changed over time: '10. Draft Beer' -> 'Draft Beer'."""
-    import re
-    if not subdept:
-        return subdept
-    cleaned = re.sub(r'^\d+\.\s*', '', subdept)
-    return cleaned
-
-
 def load_category_overrides():
     """Load category overrides from config/categories.json."""
     if not os.path.isfile(CATEGORY_OVERRIDES):
@@ -103,460 +150,593 @@ def find_csv_files():
 
 
 # =============================================================================
-# DEDUCTIONS: Adjustments + Refunds (to align with POS Total Sale)
+# PHASE 1: Single scan of all CSVs, fanned out to consumers
 # =============================================================================
 
-def read_deductions(csv_files):
+class ProductConsumer(PosConsumer):
     """
-    Read Adjustments (Transaction Type=Sales, Item Type=Adjustment) and
-    Refunds (Transaction Type=Refund, Product/Modifier/Package).
-    Yields (date, department, amount) where amount reduces sales.
+    Deduplicated Product/Modifier/Package rows, consumed in columnar scan
+    blocks. Transactions whose last row is in the block are resolved
+    together (resolve_products) and bucketed; rows of still-open
+    transactions carry over to the next block. If open rows exceed
+    MAX_OPEN_ROWS (badly out-of-order input), the oldest open transactions
+    spill to disk and are resolved in finish().
+    Transactions are numbered in first-seen order (the 'ordinal' column) so
+    results come out as if resolved in that order, however they were flushed.
     """
-    columns = [
-        'Transaction ID', 'Item ID', 'Transaction Type', 'Item Type',
-        'Department', 'Quantity', 'Unit Amount', 'Total',
-        'Item Created Date', 'Deleted', 'Voided',
-    ]
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: i for i, c in enumerate(header) if c in columns}
-            if 'Item Created Date' not in idx or 'Item Type' not in idx:
+    columnar = True
+    MAX_OPEN_ROWS = 200000
+    SPILL_PARTITIONS = 16
+
+    def __init__(self):
+        self.items = new_item_buckets()
+        self.subdept_order = {}
+        self.transactions = 0
+        self.resolved = 0
+        self.next_ordinal = 0
+        self.open = None                                   # columns of open rows
+        self.spilled = (np.empty(0, np.int64), np.empty(0, np.int64))  # sorted txn ids, ordinals
+        self.spill_dir = None
+
+    def consume_columns(self, cols):
+        cols = dict(cols, name=np.array([NAME_MERGE.get(n, n) for n in cols['name']], dtype=object))
+        cols['ordinal'] = self._ordinals(cols['txn_id'])
+        spilled_ids = self.spilled[0]
+        if len(spilled_ids):
+            late = np.isin(cols['txn_id'], spilled_ids)
+            if late.any():
+                self._spill(_take(cols, late))
+                cols = _take(cols, ~late)
+        if self.open is not None:
+            cols = _concat(self.open, cols)
+        complete = np.isin(cols['txn_id'], cols['txn_id'][cols['txn_done']])
+        self._resolve(_take(cols, complete))
+        self.open = _take(cols, ~complete) if not complete.all() else None
+        if self.open is not None and len(self.open['txn_id']) > self.MAX_OPEN_ROWS:
+            self._spill_oldest()
+
+    def _ordinals(self, txn_ids):
+        """Per row ordinal: kept for open/spilled transactions, next free ones for new."""
+        uniq, first, inverse = np.unique(txn_ids, return_index=True, return_inverse=True)
+        ords = np.full(len(uniq), -1, dtype=np.int64)
+        for ids, known in (self._open_ordinals(), self.spilled):
+            if len(ids):
+                pos = np.minimum(np.searchsorted(ids, uniq), len(ids) - 1)
+                hit = ids[pos] == uniq
+                ords[hit] = known[pos[hit]]
+        new = np.flatnonzero(ords < 0)
+        new = new[np.argsort(first[new], kind='stable')]
+        ords[new] = self.next_ordinal + np.arange(len(new))
+        self.next_ordinal += len(new)
+        return ords[inverse.ravel()]
+
+    def _open_ordinals(self):
+        if self.open is None:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        ids, idx = np.unique(self.open['txn_id'], return_index=True)
+        return ids, self.open['ordinal'][idx]
+
+    def _resolve(self, cols):
+        if not len(cols['txn_id']):
+            return
+        products = resolve_products(cols)
+        self.transactions += len(np.unique(cols['ordinal']))
+        self.resolved += bucket_item_date(products, self.items, self.subdept_order)
+
+    def _spill_oldest(self):
+        """Move the oldest open transactions (about half the open rows) to disk."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='etl-spill-')
+            print(f'  Open transactions exceed {self.MAX_OPEN_ROWS:,} rows, spilling to {self.spill_dir}')
+        ords = self.open['ordinal']
+        cutoff = np.sort(ords)[len(ords) // 2]
+        out = ords <= cutoff
+        moved = _take(self.open, out)
+        ids, idx = np.unique(moved['txn_id'], return_index=True)
+        all_ids = np.concatenate([self.spilled[0], ids])
+        all_ords = np.concatenate([self.spilled[1], moved['ordinal'][idx]])
+        keep = np.argsort(all_ids, kind='stable')
+        self.spilled = (all_ids[keep], all_ords[keep])
+        self._spill(moved)
+        self.open = _take(self.open, ~out) if not out.all() else None
+
+    def _spill(self, cols):
+        part = cols['txn_id'] % self.SPILL_PARTITIONS
+        for p in np.unique(part).tolist():
+            with open(os.path.join(self.spill_dir, f'{p}.pkl'), 'ab') as f:
+                pickle.dump(_take(cols, part == p), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def finish(self):
+        if self.open is not None:
+            self._resolve(self.open)
+            self.open = None
+        if self.spill_dir is None:
+            return
+        # One partition in memory at a time
+        for part in range(self.SPILL_PARTITIONS):
+            path = os.path.join(self.spill_dir, f'{part}.pkl')
+            if not os.path.isfile(path):
                 continue
-            max_idx = max(idx.values())
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                txn_type = row[idx.get('Transaction Type', 0)].strip() if 'Transaction Type' in idx else 'Sales'
-                item_type = row[idx['Item Type']].strip()
-                date_str = row[idx['Item Created Date']].strip()
-                dept = row[idx.get('Department', 0)].strip() if 'Department' in idx else ''
-                total = float(row[idx.get('Total', 0)] or 0) if 'Total' in idx else 0
-                qty = float(row[idx.get('Quantity', 0)] or 0) if 'Quantity' in idx else 0
-                unit = float(row[idx.get('Unit Amount', 0)] or 0) if 'Unit Amount' in idx else 0
-                amount = total if total != 0 else (unit * qty if qty else unit)
-                if not date_str or len(date_str) < 10:
-                    continue
-                # Adjustments: Sales txn, Adjustment item (discounts, comps - reduce sales)
-                if txn_type == 'Sales' and item_type == 'Adjustment':
-                    yield (date_str, dept or '(blank)', amount)
-                # Refunds: Refund txn, Product/Modifier/Package (money back - reduce sales)
-                elif txn_type == 'Refund' and item_type in ('Product', 'Modifier', 'Package'):
-                    # Amount may be positive or negative in CSV; we need to subtract from sales
-                    yield (date_str, dept or '(blank)', -abs(amount) if amount != 0 else 0)
-
-
-def aggregate_deductions_by_date_dept(csv_files):
-    """Aggregate deductions to (date, department) -> total amount to subtract."""
-    agg = defaultdict(float)
-    for date_str, dept, amount in read_deductions(csv_files):
-        agg[(date_str, dept)] += amount
-    return agg
+            chunks = []
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        chunks.append(pickle.load(f))
+                    except EOFError:
+                        break
+            cols = chunks[0]
+            for chunk in chunks[1:]:
+                cols = _concat(cols, chunk)
+            self._resolve(cols)
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self.spill_dir = None
+        self.spilled = (np.empty(0, np.int64), np.empty(0, np.int64))
 
 
-# =============================================================================
-# PHASE 1: Read all CSVs, deduplicate, yield raw rows
-# =============================================================================
+def _take(cols, idx):
+    return {k: v[idx] for k, v in cols.items()}
+
+
+def _concat(a, b):
+    return {k: np.concatenate([a[k], b[k]]) for k in a}
 
-def read_all_csvs(csv_files):
+
+class DeductionConsumer(PosConsumer):
     """
-    Read all POS CSVs, deduplicate by (Transaction ID, Item ID).
-    Yields dicts with parsed fields.
+    Adjustments (Transaction Type=Sales, Item Type=Adjustment) and
+    Refunds (Transaction Type=Refund, Product/Modifier/Package), aggregated to
+    (date, department) -> amount to subtract (to align with POS Total Sale).
     """
-    seen = set()
-    total_rows = 0
-    dupes = 0
-
-    columns = [
-        'Transaction ID', 'Item ID', 'Name', 'Item Type',
-        'Department', 'Subdepartment', 'Quantity', 'Unit Amount',
-        'Total', 'Transaction Type',
-        'Deleted', 'Voided', 'Item Created Date',
-    ]
+    required = ('Item Created Date', 'Item Type')
+    sales_only = False
+
+    def __init__(self):
+        self.agg = defaultdict(int)
+
+    def consume(self, rec):
+        date_str = rec['date']
+        if not date_str or len(date_str) < 10:
+            return
+        txn_type = rec['txn_type'].strip()
+        item_type = rec['item_type'].strip()
+        # Adjustments: Sales txn, Adjustment item (discounts, comps - reduce sales)
+        if txn_type == 'Sales' and item_type == 'Adjustment':
+            self.agg[(date_str, rec['department'] or '(blank)')] += line_revenue(rec)
+        # Refunds: Refund txn, Product/Modifier/Package (money back - reduce sales)
+        elif txn_type == 'Refund' and item_type in SALES_ITEM_TYPES:
+            # Amount may be positive or negative in CSV; we need to subtract from sales
+            amount = line_revenue(rec)
+            self.agg[(date_str, rec['department'] or '(blank)')] -= abs(amount)
+
+
+class ModifierConsumer(PosConsumer):
+    """Food-department Modifier rows: per-name totals and per (name, date) buckets (money in cents)."""
+
+    def __init__(self):
+        self.totals = defaultdict(lambda: {'count': 0, 'revenue': 0, 'unit_price': 0, 'subdepartment': ''})
+        self.by_date = defaultdict(lambda: {'quantity': 0.0, 'revenue': 0, 'transactions': 0, 'subdepartment': ''})
+
+    def consume(self, rec):
+        if rec['item_type'] != 'Modifier' or rec['department'] != 'Food':
+            return
+        name = rec['name']
+        subdept = rec['subdepartment']
+        qty = rec['qty']
+        unit = rec['unit_price']
+        revenue = line_revenue(rec)
+
+        m = self.totals[name]
+        m['count'] += 1
+        m['revenue'] += revenue
+        if unit > 0:
+            m['unit_price'] = unit
+        if subdept:
+            m['subdepartment'] = subdept
 
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
+        bucket = self.by_date[(name, rec['date'])]
+        bucket['quantity'] += qty if qty else 1
+        bucket['revenue'] += revenue
+        bucket['transactions'] += 1
+        if subdept:
+            bucket['subdepartment'] = subdept
 
-            idx = {}
-            for c in columns:
-                if c in header:
-                    idx[c] = header.index(c)
-            if 'Transaction ID' not in idx or 'Item ID' not in idx:
-                continue
-            max_idx = max(idx.values())
 
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if 'Transaction Type' in idx and row[idx['Transaction Type']] != 'Sales':
-                    continue
-                item_type = row[idx['Item Type']]
-                if item_type not in ('Product', 'Modifier', 'Package'):
-                    continue
-
-                key = (row[idx['Transaction ID']], row[idx['Item ID']])
-                if key in seen:
-                    dupes += 1
-                    continue
-                seen.add(key)
-                total_rows += 1
-
-                name = row[idx['Name']].strip()
-                name = NAME_MERGE.get(name, name)
-
-                qty = float(row[idx['Quantity']] or 0)
-                unit_price = float(row[idx['Unit Amount']] or 0)
-                item_total = float(row[idx['Total']] or 0) if 'Total' in idx else 0
-
-                yield {
-                    'txn_id':       row[idx['Transaction ID']],
-                    'item_id':      int(row[idx['Item ID']]),
-                    'name':         name,
-                    'item_type':    item_type,
-                    'department':   row[idx.get('Department', 0)].strip() if 'Department' in idx else '',
-                    'subdepartment': normalize_subdepartment(row[idx.get('Subdepartment', 0)].strip()) if 'Subdepartment' in idx else '',
-                    'qty':          qty,
-                    'unit_price':   unit_price,
-                    'item_total':   item_total,
-                    'date':         row[idx['Item Created Date']].strip(),
-                }
-
-    print(f'  Read {total_rows:,} rows, skipped {dupes:,} duplicates')
+class BowlingConsumer(PosConsumer):
+    """Bowling Product revenue (cents) per Item Created Date."""
+    required = ('Transaction ID', 'Item ID', 'Transaction Type', 'Item Type',
+                'Department', 'Item Created Date')
 
+    columnar = True
 
-# =============================================================================
-# PHASE 2: Group by transaction, resolve modifiers
-# =============================================================================
+    def __init__(self):
+        self.daily = defaultdict(int)
 
-def group_by_transaction(rows):
-    """Group raw rows by Transaction ID."""
-    transactions = defaultdict(list)
-    for row in rows:
-        transactions[row['txn_id']].append(row)
-    return transactions
+    def consume_columns(self, cols):
+        rows = np.flatnonzero((cols['item_type'] == 'Product') & (cols['department'] == 'Bowling'))
+        if not len(rows):
+            return
+        codes, days = encode_dates(cols['date'][rows].tolist())
+        revenue = line_revenue_cents(cols['item_total'][rows], cols['unit_price'][rows],
+                                     cols['qty'][rows])
+        totals = group_sum(codes, revenue, len(days))
+        for date_str, ok, cents in zip(days.values, days.valid.tolist(), totals.tolist()):
+            if ok:
+                self.daily[date_str] += cents
 
 
-def resolve_all_products(transactions):
+def collect_aggregates(csv_files, seen=None, first_row=0):
     """
-    Walk each transaction, link modifiers to parent products,
-    compute true costs. Yields resolved product dicts for ALL departments.
+    Scan csv_files once and return the ETL's intermediate aggregates:
+      items            (name, date, dept) -> quantity/revenue/transactions/subdepartment
+      deductions       (date, dept) -> amount
+      modifiers        name -> count/revenue/unit_price/subdepartment
+      modifiersByDate  (name, date) -> quantity/revenue/transactions/subdepartment
+      bowlingDaily     date -> revenue
+    All money values are int cents (money.py); exporters convert to dollars.
+    seen, first_row: passed to scan_pos_files (used by etl_state for per-file
+    and appended-tail scans).
     """
-    for rows in transactions.values():
-        rows.sort(key=lambda r: r['item_id'])
-        current = None
-        mod_cost = 0.0
-
-        for r in rows:
-            if r['item_type'] == 'Package':
-                if current is not None:
-                    if mod_cost > 0:
-                        current['item_total'] = current.get('item_total', 0) + mod_cost
-                    yield current
-                    current = None
-                    mod_cost = 0.0
-                yield r
-                continue
+    products = ProductConsumer()
+    deductions = DeductionConsumer()
+    modifiers = ModifierConsumer()
+    bowling = BowlingConsumer()
+    rows_read, dupes = scan_pos_files(csv_files, [products, deductions, modifiers, bowling],
+                                     seen=seen, first_row=first_row)
+    print(f'  {products.transactions:,} unique transactions, '
+          f'{products.resolved:,} resolved product rows')
+
+    return {
+        'items': dict(products.items),
+        'deductions': dict(deductions.agg),
+        'modifiers': dict(modifiers.totals),
+        'modifiersByDate': dict(modifiers.by_date),
+        'bowlingDaily': dict(bowling.daily),
+        'stats': {
+            'rows': rows_read,
+            'duplicates': dupes,
+            'transactions': products.transactions,
+        },
+    }
 
-            if r['item_type'] == 'Product':
-                if current is not None:
-                    if mod_cost > 0:
-                        current['item_total'] = current.get('item_total', 0) + mod_cost
-                    yield current
-                current = r
-                mod_cost = 0.0
 
-            elif r['item_type'] == 'Modifier' and current is not None:
-                mt = r.get('item_total', 0)
-                mod_rev = mt if mt != 0 else (r['unit_price'] * (r['qty'] if r.get('qty') else 1))
-                mod_cost += mod_rev
+# =============================================================================
+# PHASE 2: Resolve modifiers (transactions streamed from the scan)
+# =============================================================================
 
-        if current is not None:
-            if mod_cost > 0:
-                current['item_total'] = current.get('item_total', 0) + mod_cost
-            yield current
+def resolve_products(cols):
+    """
+    Link modifiers to parent products (modifier_resolve) and compute true
+    costs: a Product's item_total gains its Modifiers' revenue when that sum
+    is positive. Packages are standalone. Returns the resolved Product and
+    Package rows as columns, ordered by (transaction ordinal, Item ID).
+    """
+    order = transaction_order(cols['txn_id'], cols['item_id'], cols['ordinal'])
+    cols = _take(cols, order)
+    kinds = item_kinds(cols['item_type'])
+    qty = cols['qty']
+    total = cols['item_total']
+    mod_rev = np.where(total != 0, total, scale_cents(cols['unit_price'], np.where(qty != 0, qty, 1)))
+    mod_cost = rollup_modifiers(modifier_parents(cols['ordinal'], kinds), mod_rev)
+    cols['item_total'] = np.where((kinds == PRODUCT) & (mod_cost > 0), total + mod_cost, total)
+    return _take(cols, (kinds == PRODUCT) | (kinds == PACKAGE))
 
 
 # =============================================================================
 # PHASE 3: Aggregate to item x date rows
 # =============================================================================
 
-def aggregate_item_date(products, category_overrides):
-    """
-    Aggregate resolved products into item x date rows.
-    Returns list of dicts, one per (item, date) combination.
-    """
-    # Key: (name, date, department) -> aggregated values
-    agg = defaultdict(lambda: {
+SKIP_DEPARTMENTS = {'', 'TEST DEPARTMENT', 'Parties test'}
+DEDUCTION_NAME = '[Adjustments & Refunds]'
+
+
+def new_item_buckets():
+    """Key: (name, date, department) -> aggregated values."""
+    return defaultdict(lambda: {
         'quantity': 0.0,
-        'revenue': 0.0,
+        'revenue': 0,
         'transactions': 0,
         'subdepartment': '',
     })
 
-    for p in products:
-        name = p['name']
-        date_str = p['date']
-        dept = p['department']
-        subdept = p.get('subdepartment', '')
-        qty = p['qty']
-        unit_price = p['unit_price']
-        item_total = p.get('item_total', 0)
-        revenue = item_total if item_total != 0 else (unit_price * qty if qty else unit_price)
 
+def bucket_item_date(products, agg, positions=None):
+    """
+    Add resolved product columns (see resolve_products) to (name, date,
+    department) buckets. Returns the count added. The last non-empty
+    subdepartment wins; with positions, "last" means the highest
+    (transaction ordinal, row) seen so far rather than call order.
+    """
+    qty = products['qty']
+    revenue = line_revenue_cents(products['item_total'], products['unit_price'], qty)
+
+    rows = zip(products['name'].tolist(), products['date'].tolist(),
+               products['department'].tolist(), products['subdepartment'].tolist(),
+               qty.tolist(), revenue.tolist(), products['ordinal'].tolist())
+    for i, (name, date_str, dept, subdept, q, rev, ordinal) in enumerate(rows):
         key = (name, date_str, dept)
         bucket = agg[key]
-        bucket['quantity'] += qty
-        bucket['revenue'] += revenue
+        bucket['quantity'] += q
+        bucket['revenue'] += rev
         bucket['transactions'] += 1
         if subdept:
-            bucket['subdepartment'] = subdept
+            if positions is None:
+                bucket['subdepartment'] = subdept
+            else:
+                pos = (ordinal, i)
+                if pos >= positions.get(key, pos):
+                    positions[key] = pos
+                    bucket['subdepartment'] = subdept
+    return len(qty)
 
-    rows = []
-    for (name, date_str, dept), data in agg.items():
-        subdept = data['subdepartment']
-        category = category_overrides.get(name) or subdept or dept
-        # Reassign department when category override moves item to Parties
-        department = 'Parties' if category == 'Parties' else dept
 
-        rows.append({
-            'date': date_str,
-            'name': name,
-            'department': department,
-            'subdepartment': subdept,
-            'category': category,
-            'quantity': round(data['quantity']),
-            'revenue': round(data['revenue'], 2),
-            'transactions': data['transactions'],
-        })
+def item_date_row(key, data, category_overrides):
+    """
+    transactions.json row for one item bucket (category overrides applied
+    here, so config changes never require re-reading CSVs).
+    """
+    name, date_str, dept = key
+    subdept = data['subdepartment']
+    category = category_overrides.get(name) or subdept or dept
+    # Reassign department when category override moves item to Parties
+    department = 'Parties' if category == 'Parties' else dept
+    return {
+        'date': date_str,
+        'name': name,
+        'department': department,
+        'subdepartment': subdept,
+        'category': category,
+        'quantity': round(data['quantity']),
+        'revenue': to_dollars(data['revenue']),
+        'transactions': data['transactions'],
+        ROW_CENTS: data['revenue'],
+    }
+
+
+def deduction_row(key, amount):
+    """Adjustments & refunds row for one (date, department) deduction total (cents)."""
+    date_str, dept = key
+    return {
+        'date': date_str,
+        'name': DEDUCTION_NAME,
+        'department': dept,
+        'subdepartment': '',
+        'category': dept,
+        'quantity': 0,
+        'revenue': to_dollars(amount),
+        'transactions': 0,
+        ROW_CENTS: amount,
+    }
 
-    SKIP_DEPARTMENTS = {'', 'TEST DEPARTMENT', 'Parties test'}
-    rows = [r for r in rows if r['department'] not in SKIP_DEPARTMENTS]
-    rows.sort(key=lambda r: (r['date'], r['department'], r['name']))
-    return rows
 
+def _row_order(r):
+    """transactions.json sort key."""
+    return (r['date'], r['department'], r['name'])
 
-# =============================================================================
-# MODIFIER ROWS (date-granular, same format as product rows)
-# =============================================================================
 
-def aggregate_modifier_transactions(csv_files):
+def _by_month(keys, date_of):
     """
-    Read modifier rows from CSVs, aggregate by (name, date).
-    Returns rows in same format as product transactions for Modifiers department.
+    Group keys by the first 7 characters of their date ('YYYY-MM'). Rows
+    sharing that prefix are contiguous in date order, so sorting each group
+    and emitting the groups in prefix order gives the full date order.
     """
-    agg = defaultdict(lambda: {'quantity': 0.0, 'revenue': 0.0, 'transactions': 0, 'subdepartment': ''})
+    groups = defaultdict(list)
+    for key in keys:
+        groups[date_of(key)[:7]].append(key)
+    return groups
 
-    columns = [
-        'Transaction ID', 'Item ID', 'Name', 'Item Type',
-        'Department', 'Subdepartment', 'Quantity', 'Unit Amount',
-        'Total', 'Transaction Type', 'Deleted', 'Voided', 'Item Created Date',
-    ]
 
-    seen = set()
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: header.index(c) for c in columns if c in header}
-            if 'Transaction ID' not in idx or 'Item ID' not in idx or 'Item Type' not in idx:
-                continue
-            max_idx = max(idx.values())
+def transaction_batches(items, deductions, category_overrides):
+    """
+    transactions.json rows, in order, one month at a time: yields (month,
+    rows) with the month's item rows (skipped departments dropped) and
+    adjustment & refund deduction rows merged by _row_order, item rows first
+    on ties. Only one month of row dicts exists at a time; the buckets are
+    the only full-history structure.
+    items: item buckets from bucket_item_date(); deductions: (date, dept) -> cents.
+    """
+    item_keys = _by_month(items, lambda key: key[1])
+    deduction_keys = _by_month(
+        (key for key, amount in deductions.items()
+         if amount and key[1] not in SKIP_DEPARTMENTS and key[1] != '(blank)'),
+        lambda key: key[0])
+
+    for month in sorted(item_keys.keys() | deduction_keys.keys()):
+        item_rows = [item_date_row(key, items[key], category_overrides) for key in item_keys[month]]
+        item_rows = sorted((r for r in item_rows if r['department'] not in SKIP_DEPARTMENTS),
+                           key=_row_order)
+        deduction_rows = sorted((deduction_row(key, deductions[key]) for key in deduction_keys[month]),
+                                key=_row_order)
+        if item_rows or deduction_rows:
+            yield month, list(heapq.merge(item_rows, deduction_rows, key=_row_order))
+
+
+class RowConsumer(ABC):
+    """
+    Export fed from the transactions.json row stream: consume_rows(rows) is
+    called once per month batch (transaction_batches order), finish() once
+    at the end to write its output.
+    """
 
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if 'Transaction Type' in idx and row[idx['Transaction Type']] != 'Sales':
-                    continue
-                if row[idx['Item Type']] != 'Modifier':
-                    continue
-                if row[idx.get('Department', 0)].strip() != 'Food':
-                    continue
-
-                key = (row[idx['Transaction ID']], row[idx['Item ID']])
-                if key in seen:
-                    continue
-                seen.add(key)
-
-                name = row[idx['Name']].strip()
-                date_str = row[idx['Item Created Date']].strip()
-                subdept = normalize_subdepartment(row[idx.get('Subdepartment', 0)].strip()) if 'Subdepartment' in idx else ''
-                qty = float(row[idx['Quantity']] or 0)
-                unit = float(row[idx['Unit Amount']] or 0)
-                total = float(row[idx['Total']] or 0) if 'Total' in idx else 0
-                revenue = total if total != 0 else (unit * qty if qty else unit)
-
-                bucket_key = (name, date_str)
-                bucket = agg[bucket_key]
-                bucket['quantity'] += qty if qty else 1
-                bucket['revenue'] += revenue
-                bucket['transactions'] += 1
-                if subdept:
-                    bucket['subdepartment'] = subdept
+    @abstractmethod
+    def consume_rows(self, rows):
+        """Called with each month's rows, in order."""
+
+    def finish(self):
+        """Called once after the last batch."""
+
+
+# =============================================================================
+# MODIFIER ROWS (date-granular, same format as product rows)
+# =============================================================================
+
+def modifier_row(key, data):
+    """Modifiers department row for one ModifierConsumer (name, date) bucket."""
+    name, date_str = key
+    return {
+        'date': date_str,
+        'name': name,
+        'department': 'Modifiers',
+        'subdepartment': data['subdepartment'] or '',
+        'category': data['subdepartment'] or 'Food Mods',
+        'quantity': round(data['quantity']),
+        'revenue': to_dollars(data['revenue']),
+        'transactions': data['transactions'],
+        ROW_CENTS: data['revenue'],
+    }
 
-    rows = []
-    for (name, date_str), data in agg.items():
-        category = data['subdepartment'] or 'Food Mods'
-        rows.append({
-            'date': date_str,
-            'name': name,
-            'department': 'Modifiers',
-            'subdepartment': data['subdepartment'] or '',
-            'category': category,
-            'quantity': round(data['quantity']),
-            'revenue': round(data['revenue'], 2),
-            'transactions': data['transactions'],
-        })
 
-    rows.sort(key=lambda r: (r['date'], r['name']))
-    return rows
+def modifier_batches(by_date):
+    """Modifier rows ordered by (date, name), one month at a time (see transaction_batches)."""
+    keys = _by_month(by_date, lambda key: key[1])
+    for month in sorted(keys):
+        rows = [modifier_row(key, by_date[key]) for key in keys[month]]
+        rows.sort(key=lambda r: (r['date'], r['name']))
+        yield month, rows
 
 
 # =============================================================================
 # EXPORT: modifier_transactions.json (date-granular, for Modifiers dashboard view)
 # =============================================================================
 
-def export_modifier_transactions(csv_files):
+def export_modifier_transactions(by_date):
     """
     Export modifier rows with date granularity to a separate file.
     Used for the Modifiers department view (calendar, weekly trends, etc.)
-    without double-counting in main transactions.json.
+    without double-counting in main transactions.json. Rows are written and
+    column-encoded a month at a time.
     """
-    rows = aggregate_modifier_transactions(csv_files)
     out = os.path.join(OUTPUT_DIR, 'modifier_transactions.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, separators=(',', ':'))
+    columnar = ColumnarEncoder()
+    with JsonArrayWriter(out, fields=ROW_FIELDS) as writer:
+        for _, rows in modifier_batches(by_date):
+            for r in rows:
+                writer.write(r)
+                columnar.add(r)
     size_kb = os.path.getsize(out) / 1024
-    print(f'  -> {out}  ({len(rows):,} rows, {size_kb:.0f} KB)')
-    return rows
+    print(f'  -> {out}  ({writer.count:,} rows, {size_kb:.0f} KB)')
+
+    out = os.path.join(OUTPUT_DIR, 'modifier_transactions.columnar.json')
+    publish_json(out, columnar.data(), separators=(',', ':'))
+    print(f'  -> {out}  ({os.path.getsize(out) / 1024:.0f} KB, columnar)')
+    return writer.count
 
 
 # =============================================================================
 # EXPORT: transactions.json
 # =============================================================================
 
-def export_transactions(csv_files, category_overrides):
+def export_transactions(items, deductions, category_overrides, consumers=()):
     """Export item x date rows for all departments, including Modifiers.
-    Includes Adjustments and Refunds as deduction rows to align with POS Total Sale."""
-    print('  Reading CSVs...')
-    raw_rows = list(read_all_csvs(csv_files))
-
-    print('  Grouping by transaction...')
-    transactions = group_by_transaction(raw_rows)
-    print(f'  {len(transactions):,} unique transactions')
-
-    print('  Resolving modifiers...')
-    products = list(resolve_all_products(transactions))
-    print(f'  {len(products):,} resolved product rows')
-
-    print('  Aggregating to item x date...')
-    rows = aggregate_item_date(products, category_overrides)
-    print(f'  {len(rows):,} item x date rows')
-
-    print('  Adding adjustments & refunds (POS alignment)...')
-    deductions = aggregate_deductions_by_date_dept(csv_files)
-    SKIP_DEPARTMENTS = {'', 'TEST DEPARTMENT', 'Parties test'}
-    deduction_count = 0
-    for (date_str, dept), amount in deductions.items():
-        if abs(amount) < 0.01:
-            continue
-        if dept in SKIP_DEPARTMENTS or dept == '(blank)':
-            continue
-        rows.append({
-            'date': date_str,
-            'name': '[Adjustments & Refunds]',
-            'department': dept,
-            'subdepartment': '',
-            'category': dept,
-            'quantity': 0,
-            'revenue': round(amount, 2),
-            'transactions': 0,
-        })
-        deduction_count += 1
-    rows.sort(key=lambda r: (r['date'], r['department'], r['name']))
-    print(f'  Added {deduction_count:,} deduction rows')
-
+    Includes Adjustments and Refunds as deduction rows to align with POS Total Sale.
+    Rows are produced a month at a time (transaction_batches), written to
+    transactions.json and its month partitions, and handed to consumers
+    (RowConsumer); their finish() is left to the caller. Returns the row count."""
     out = os.path.join(OUTPUT_DIR, 'transactions.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, separators=(',', ':'))
-
+    partitions = TransactionPartitions()
+    n_items = n_deductions = 0
+    with JsonArrayWriter(out, fields=ROW_FIELDS) as writer:
+        for _, rows in transaction_batches(items, deductions, category_overrides):
+            for r in rows:
+                writer.write(r)
+            n_deductions += sum(r['name'] == DEDUCTION_NAME for r in rows)
+            n_items += len(rows)
+            partitions.consume_rows(rows)
+            for consumer in consumers:
+                consumer.consume_rows(rows)
+    n_items -= n_deductions
+
+    print(f'  {n_items:,} item x date rows')
+    print(f'  Added {n_deductions:,} adjustment & refund deduction rows (POS alignment)')
     size_kb = os.path.getsize(out) / 1024
     print(f'  -> {out}  ({size_kb:.0f} KB)')
-    return rows
+    partitions.finish()
+    return writer.count
 
 
-# =============================================================================
-# EXPORT: modifiers.json
-# =============================================================================
+def _partition_path(date_str):
+    """'2026-01-15' -> '2026/01.json'; rows without a usable date share one file."""
+    if len(date_str) >= 7 and date_str[:4].isdigit() and date_str[5:7].isdigit():
+        return f'{date_str[:4]}/{date_str[5:7]}.json'
+    return 'undated.json'
+
 
-def export_modifiers(csv_files):
+class TransactionPartitions(RowConsumer):
     """
-    Extract and aggregate all Modifier items (Food department only).
-    Outputs modifiers.json for the Data Explorer Modifiers section.
+    Write transactions.json rows as year/month partitions under
+    transactions/YYYY/MM.json (columnar_export format, row order kept) plus
+    transactions/manifest.json listing each partition's date range, row
+    count, byte size and sha256, so the app only fetches the months a date
+    range covers. Each month batch is one partition, published as it
+    arrives; rows without a usable date are collected for undated.json.
     """
-    modifiers = defaultdict(lambda: {'count': 0, 'revenue': 0.0, 'unit_price': 0.0, 'subdepartment': ''})
 
-    columns = [
-        'Transaction ID', 'Item ID', 'Name', 'Item Type',
-        'Department', 'Subdepartment', 'Quantity', 'Unit Amount',
-        'Total', 'Transaction Type', 'Deleted', 'Voided',
-    ]
+    def __init__(self):
+        self.partitions = []
+        self.undated = []
+        self.rows = 0
+
+    def consume_rows(self, rows):
+        self.rows += len(rows)
+        path = _partition_path(rows[0]['date'])
+        if path == 'undated.json':
+            self.undated.extend(rows)
+        else:
+            self._publish(path, rows)
+
+    def _publish(self, path, rows):
+        body = json.dumps(encode_rows(rows), separators=(',', ':')).encode('utf-8')
+        publish_bytes(os.path.join(PARTITION_DIR, path), body)
+        dates = [r['date'] for r in rows]
+        self.partitions.append({
+            'key': path[:-len('.json')].replace('/', '-'),
+            'path': 'transactions/' + path,
+            'dateRange': [min(dates), max(dates)],
+            'rows': len(rows),
+            'bytes': len(body),
+            'sha256': hashlib.sha256(body).hexdigest(),
+        })
 
-    seen = set()
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: header.index(c) for c in columns if c in header}
-            if 'Transaction ID' not in idx or 'Item ID' not in idx or 'Item Type' not in idx:
-                continue
-            max_idx = max(idx.values())
+    def finish(self):
+        if self.undated:
+            self._publish('undated.json', self.undated)
+            self.undated = []
+        partitions = self.partitions
+        dated = [p for p in partitions if p['key'] != 'undated']
+        manifest = {
+            'generatedAt': datetime.now().isoformat(),
+            'dateRange': [dated[0]['dateRange'][0], dated[-1]['dateRange'][1]] if dated else [],
+            'rows': self.rows,
+            'format': COLUMNAR_FORMAT,
+            'partitions': partitions,
+        }
+        publish_json(os.path.join(PARTITION_DIR, 'manifest.json'), manifest, indent=2)
 
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if 'Transaction Type' in idx and row[idx['Transaction Type']] != 'Sales':
-                    continue
-                if row[idx['Item Type']] != 'Modifier':
-                    continue
-                if row[idx.get('Department', 0)].strip() != 'Food':
-                    continue
-
-                key = (row[idx['Transaction ID']], row[idx['Item ID']])
-                if key in seen:
-                    continue
-                seen.add(key)
-
-                name = row[idx['Name']].strip()
-                subdept = normalize_subdepartment(row[idx.get('Subdepartment', 0)].strip()) if 'Subdepartment' in idx else ''
-                qty = float(row[idx['Quantity']] or 0)
-                unit = float(row[idx['Unit Amount']] or 0)
-                total = float(row[idx['Total']] or 0) if 'Total' in idx else 0
-
-                m = modifiers[name]
-                m['count'] += 1
-                m['revenue'] += total if total != 0 else (unit * qty if qty else unit)
-                if unit > 0:
-                    m['unit_price'] = unit
-                if subdept:
-                    m['subdepartment'] = subdept
+        # Drop partitions left over from months that no longer have rows
+        keep = {os.path.normpath(os.path.join(OUTPUT_DIR, p['path'])) for p in partitions}
+        for dirpath, _, files in os.walk(PARTITION_DIR):
+            for name in files:
+                full = os.path.normpath(os.path.join(dirpath, name))
+                if name != 'manifest.json' and not name.endswith(ENCODINGS) and full not in keep:
+                    os.remove(full)
+        print(f'  -> {PARTITION_DIR}/  ({len(partitions)} monthly partitions + manifest.json)')
+
+
+# =============================================================================
+# EXPORT: modifiers.json
+# =============================================================================
 
+def export_modifiers(modifiers):
+    """
+    Export aggregated Modifier items (Food department only) from
+    ModifierConsumer.totals. Outputs modifiers.json for the Data Explorer
+    Modifiers section.
+    """
     rows = [
         {
             'name': name,
             'count': data['count'],
-            'revenue': round(data['revenue'], 2),
-            'unitPrice': round(data['unit_price'], 2),
+            'revenue': to_dollars(data['revenue']),
+            'unitPrice': to_dollars(data['unit_price']),
             'subdepartment': data['subdepartment'] or '',
         }
         for name, data in sorted(modifiers.items(), key=lambda x: x[1]['count'], reverse=True)
@@ -568,8 +748,7 @@ def export_modifiers(csv_files):
     }
 
     out = os.path.join(OUTPUT_DIR, 'modifiers.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(data, f, separators=(',', ':'))
+    publish_json(out, data, separators=(',', ':'))
     print(f'  -> {out}  ({len(rows)} modifiers)')
     return data
 
@@ -578,128 +757,517 @@ def export_modifiers(csv_files):
 # EXPORT: summary.json
 # =============================================================================
 
-def export_summary(rows):
-    """Export pre-computed KPIs per department."""
-    departments = defaultdict(lambda: {
-        'revenue': 0.0, 'quantity': 0, 'transactions': 0,
-        'items': set(), 'categories': set(), 'dates': set(),
-    })
+class DepartmentSummary(RowConsumer):
+    """Pre-computed KPIs per department (summary.json)."""
 
-    for r in rows:
-        dept = r['department']
-        d = departments[dept]
-        d['revenue'] += r['revenue']
-        d['quantity'] += r['quantity']
-        d['transactions'] += r['transactions']
-        d['items'].add(r['name'])
-        d['categories'].add(r['category'])
-        d['dates'].add(r['date'])
-
-    all_dates = set()
-    for d in departments.values():
-        all_dates |= d['dates']
-
-    dept_summary = {}
-    for dept, d in sorted(departments.items()):
-        dates_sorted = sorted(d['dates'])
-        dept_summary[dept] = {
-            'revenue': round(d['revenue'], 2),
-            'quantity': d['quantity'],
-            'transactions': d['transactions'],
-            'uniqueItems': len(d['items']),
-            'categories': sorted(d['categories']),
-            'dateRange': [dates_sorted[0], dates_sorted[-1]] if dates_sorted else [],
+    def __init__(self):
+        self.departments = defaultdict(lambda: {
+            'revenue': 0, 'quantity': 0, 'transactions': 0,
+            'items': set(), 'categories': set(), 'dates': set(),
+        })
+
+    def consume_rows(self, rows):
+        for r in rows:
+            d = self.departments[r['department']]
+            d['revenue'] += row_cents(r)
+            d['quantity'] += r['quantity']
+            d['transactions'] += r['transactions']
+            d['items'].add(r['name'])
+            d['categories'].add(r['category'])
+            d['dates'].add(r['date'])
+
+    def finish(self):
+        departments = self.departments
+        all_dates = set()
+        for d in departments.values():
+            all_dates |= d['dates']
+
+        dept_summary = {}
+        for dept, d in sorted(departments.items()):
+            dates_sorted = sorted(d['dates'])
+            dept_summary[dept] = {
+                'revenue': to_dollars(d['revenue']),
+                'quantity': d['quantity'],
+                'transactions': d['transactions'],
+                'uniqueItems': len(d['items']),
+                'categories': sorted(d['categories']),
+                'dateRange': [dates_sorted[0], dates_sorted[-1]] if dates_sorted else [],
+            }
+
+        all_dates_sorted = sorted(all_dates)
+        summary = {
+            'generatedAt': datetime.now().isoformat(),
+            'dateRange': [all_dates_sorted[0], all_dates_sorted[-1]] if all_dates_sorted else [],
+            'totalRevenue': to_dollars(sum(d['revenue'] for d in departments.values())),
+            'departments': dept_summary,
+            'categoryColors': CATEGORY_COLORS,
         }
 
-    all_dates_sorted = sorted(all_dates)
-    summary = {
-        'generatedAt': datetime.now().isoformat(),
-        'dateRange': [all_dates_sorted[0], all_dates_sorted[-1]] if all_dates_sorted else [],
-        'totalRevenue': round(sum(d['revenue'] for d in departments.values()), 2),
-        'departments': dept_summary,
-        'categoryColors': CATEGORY_COLORS,
+        out = os.path.join(OUTPUT_DIR, 'summary.json')
+        publish_json(out, summary, indent=2)
+        print(f'  -> {out}')
+        return summary
+
+
+# =============================================================================
+# EXPORT: rollups.json (period x department x category cube)
+# =============================================================================
+
+ROLLUP_LEVELS = ('day', 'week', 'month', 'year')
+ROLLUP_FORMAT = 'rollup-v1'
+
+
+def _measure_arrays(rows):
+    """revenueCents / quantity / transactions int64 arrays for row dicts."""
+    return {
+        'revenueCents': np.array([row_cents(r) for r in rows], dtype=np.int64),
+        'quantity': np.array([r['quantity'] for r in rows], dtype=np.int64),
+        'transactions': np.array([r['transactions'] for r in rows], dtype=np.int64),
     }
 
-    out = os.path.join(OUTPUT_DIR, 'summary.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
-    print(f'  -> {out}')
-    return summary
+
+def _period_keys(days, level):
+    """Period key per DateIndex code: YYYY-MM-DD (day, or Monday of the ISO week), YYYY-MM, YYYY."""
+    if level == 'day':
+        return list(days.values)
+    if level == 'week':
+        return [dt.strftime('%Y-%m-%d') if dt else None for dt in days.datetimes(days.week_start)]
+    width = 7 if level == 'month' else 4
+    return [v[:width] for v in days.values]
+
+
+def rollup_cube(rows):
+    """
+    Sum transactions.json rows (or DayCells.rows()) per (period,
+    department, category) at every ROLLUP_LEVELS granularity, in exact
+    cents. Rows without a valid date are left out. Returns the rollups.json
+    payload: shared department/category dictionaries and, per level,
+    parallel arrays sorted by (period, department, category).
+    """
+    codes, days = encode_dates([r['date'] for r in rows])
+    departments = sorted({r['department'] for r in rows})
+    categories = sorted({r['category'] for r in rows})
+    dept_index = {d: i for i, d in enumerate(departments)}
+    cat_index = {c: i for i, c in enumerate(categories)}
+
+    keep = days.valid[codes]
+    codes = codes[keep]
+    kept = [r for r, k in zip(rows, keep.tolist()) if k]
+    dept = np.array([dept_index[r['department']] for r in kept], dtype=np.int64)
+    cat = np.array([cat_index[r['category']] for r in kept], dtype=np.int64)
+    measures = _measure_arrays(kept)
+
+    levels = {}
+    for level in ROLLUP_LEVELS:
+        keys = _period_keys(days, level)
+        periods = sorted({keys[c] for c in set(codes.tolist())})
+        period_index = {p: i for i, p in enumerate(periods)}
+        period_of_code = np.array([period_index.get(k, -1) for k in keys], dtype=np.int64)
+        cell = (period_of_code[codes] * len(departments) + dept) * len(categories) + cat
+        cells, inverse = np.unique(cell, return_inverse=True)
+        out = {
+            'periods': periods,
+            'period': (cells // (len(departments) * len(categories))).tolist(),
+            'department': (cells // len(categories) % len(departments)).tolist(),
+            'category': (cells % len(categories)).tolist(),
+        }
+        for name, values in measures.items():
+            out[name] = group_sum(inverse.ravel(), values, len(cells)).tolist()
+        levels[level] = out
+
+    return {
+        'format': ROLLUP_FORMAT,
+        'departments': departments,
+        'categories': categories,
+        'levels': levels,
+    }
+
+
+class DayCells(RowConsumer):
+    """
+    transactions.json rows summed per (date, department, category): the
+    rollup cube's day level and everything holiday_analysis needs, at a
+    fraction of the row count.
+    """
+
+    def __init__(self):
+        self.cells = {}
+
+    def consume_rows(self, rows):
+        for r in rows:
+            c = self.cells.setdefault((r['date'], r['department'], r['category']), [0, 0, 0])
+            c[0] += row_cents(r)
+            c[1] += r['quantity']
+            c[2] += r['transactions']
+
+    def rows(self):
+        """One row-shaped dict per cell (date, department, category, cents, quantity, transactions)."""
+        return [{'date': date_str, 'department': dept, 'category': cat,
+                 ROW_CENTS: c[0], 'quantity': c[1], 'transactions': c[2]}
+                for (date_str, dept, cat), c in self.cells.items()]
+
+
+def export_rollups(cells):
+    """Export rollups.json (see rollup_cube) from DayCells; item-level rows stay in transactions.json."""
+    data = dict(rollup_cube(cells.rows()), generatedAt=datetime.now().isoformat())
+    out = os.path.join(OUTPUT_DIR, 'rollups.json')
+    publish_json(out, data, separators=(',', ':'))
+    summary = ', '.join(f'{level} {len(data["levels"][level]["period"]):,}' for level in ROLLUP_LEVELS)
+    print(f'  -> {out}  ({summary} cells, {os.path.getsize(out) / 1024:.0f} KB)')
+    return data
 
 
 # =============================================================================
-# EXPORT: bowling_seasonality.json (multi-year, from all CSVs)
+# EXPORT: items/ (per-item daily + weekly series, hash-sharded)
 # =============================================================================
 
-def export_bowling_seasonality(csv_files):
-    """Export bowling weekly revenue grouped by year for seasonality chart."""
-    daily = defaultdict(float)
-    all_dates = []
-    seen = set()
-
-    columns = [
-        'Transaction ID', 'Item ID', 'Transaction Type', 'Item Type',
-        'Department', 'Item Created Date', 'Total', 'Quantity',
-        'Unit Amount', 'Deleted', 'Voided',
-    ]
+ITEM_SHARDS = 64
+ITEM_SERIES_FORMAT = 'item-series-v1'
+
+
+def _item_shard(name):
+    """Shard number for an item name (crc32, stable across runs unlike hash())."""
+    return zlib.crc32(name.encode('utf-8')) % ITEM_SHARDS
+
+
+def _series_cells(entry, offsets, measures, n_entries):
+    """Sum measures per (entry, day offset); returns per-entry series dicts."""
+    span = int(offsets.max()) + 1 if len(offsets) else 1
+    cells, inverse = np.unique(entry * span + offsets, return_inverse=True)
+    sums = {name: group_sum(inverse.ravel(), values, len(cells))
+            for name, values in measures.items()}
+    cell_entry = cells // span
+    bounds = np.searchsorted(cell_entry, np.arange(n_entries + 1))
+    series = []
+    for i in range(n_entries):
+        lo, hi = bounds[i], bounds[i + 1]
+        out = {'day': (cells[lo:hi] % span).tolist()}
+        for name, values in sums.items():
+            out[name] = values[lo:hi].tolist()
+        series.append(out)
+    return series
+
+
+class ItemSeries(RowConsumer):
+    """
+    Daily and weekly (Monday) series per (item name, department, category),
+    in exact cents. Each month batch is reduced to int64 arrays (entry id,
+    day ordinal, week start, measures) as it arrives; rows without a valid
+    date are left out.
+    """
+
+    def __init__(self):
+        self.keys = {}      # (name, department, category) -> entry id, first-seen order
+        self.parts = []
+
+    def consume_rows(self, rows):
+        codes, days = encode_dates([r['date'] for r in rows])
+        keep = days.valid[codes]
+        codes = codes[keep]
+        kept = [r for r, k in zip(rows, keep.tolist()) if k]
+        entry = np.array([self.keys.setdefault((r['name'], r['department'], r['category']), len(self.keys))
+                          for r in kept], dtype=np.int64)
+        self.parts.append((entry, days.ordinal[codes], days.week_start[codes], _measure_arrays(kept)))
+
+    def series(self):
+        """(epoch, entries sorted by name/department/category); days are offsets from a Monday epoch."""
+        if not self.keys:
+            return None, []
+        keys = sorted(self.keys)
+        sorted_id = np.empty(len(keys), dtype=np.int64)
+        sorted_id[[self.keys[k] for k in keys]] = np.arange(len(keys))
+
+        entry = sorted_id[np.concatenate([p[0] for p in self.parts])]
+        ordinal = np.concatenate([p[1] for p in self.parts])
+        week_start = np.concatenate([p[2] for p in self.parts])
+        measures = {name: np.concatenate([p[3][name] for p in self.parts]) for name in self.parts[0][3]}
+        epoch = int(week_start.min())
+
+        daily = _series_cells(entry, ordinal - epoch, measures, len(keys))
+        weekly = _series_cells(entry, week_start - epoch, measures, len(keys))
+        entries = [
+            {'name': name, 'department': dept, 'category': cat, 'daily': d, 'weekly': w}
+            for (name, dept, cat), d, w in zip(keys, daily, weekly)
+        ]
+        return datetime.fromordinal(epoch).strftime('%Y-%m-%d'), entries
+
+    def finish(self):
+        """
+        Write items/shards/NN.json (entries sharded by item name) and
+        items/index.json mapping each name to its [shard, offset,
+        department, category] entries, so an item's history is one small
+        fetch instead of a scan of every transaction row.
+        """
+        epoch, entries = self.series()
+        shard_dir = os.path.join(ITEM_DIR, 'shards')
+        os.makedirs(shard_dir, exist_ok=True)
+
+        by_shard = defaultdict(list)
+        index = defaultdict(list)
+        for e in entries:
+            shard = _item_shard(e['name'])
+            index[e['name']].append([shard, len(by_shard[shard]), e['department'], e['category']])
+            by_shard[shard].append(e)
+
+        shards = []
+        for shard in sorted(by_shard):
+            body = json.dumps({'format': ITEM_SERIES_FORMAT, 'epoch': epoch, 'items': by_shard[shard]},
+                              separators=(',', ':')).encode('utf-8')
+            path = f'{shard:02d}.json'
+            publish_bytes(os.path.join(shard_dir, path), body)
+            shards.append({
+                'shard': shard,
+                'path': 'items/shards/' + path,
+                'items': len(by_shard[shard]),
+                'bytes': len(body),
+                'sha256': hashlib.sha256(body).hexdigest(),
+            })
+
+        data = {
+            'format': ITEM_SERIES_FORMAT,
+            'generatedAt': datetime.now().isoformat(),
+            'epoch': epoch,
+            'shards': shards,
+            'items': dict(sorted(index.items())),
+        }
+        publish_json(os.path.join(ITEM_DIR, 'index.json'), data, separators=(',', ':'))
+
+        # Drop shards that no longer hold any item (publish_outputs drops their .gz/.br)
+        written = {s['path'].rsplit('/', 1)[1] for s in shards}
+        for name in os.listdir(shard_dir):
+            if name not in written and not name.endswith(ENCODINGS):
+                os.remove(os.path.join(shard_dir, name))
+        print(f'  -> {ITEM_DIR}/  ({len(index):,} items in {len(shards)} shards + index.json)')
+
+
+# =============================================================================
+# EXPORT: item_search.json (trigram name index + per-item totals)
+# =============================================================================
+
+ITEM_SEARCH_FORMAT = 'item-search-v1'
+
+
+def _trigrams(text):
+    """Distinct 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ItemSearch(RowConsumer):
+    """
+    Name search index over transactions.json rows. One item per (name,
+    department, category), in order of first appearance, with all-time
+    totals in cents; names are normalized with lower() (the app's substring
+    match is name.toLowerCase().includes(query)). trigrams maps every
+    trigram of a normalized name to the ascending item ids containing it.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.totals = []
+
+    def consume_rows(self, rows):
+        for r in rows:
+            key = (r['name'], r['department'], r['category'])
+            i = self.ids.setdefault(key, len(self.ids))
+            if i == len(self.totals):
+                self.totals.append([0, 0, 0])
+            t = self.totals[i]
+            t[0] += row_cents(r)
+            t[1] += r['quantity']
+            t[2] += r['transactions']
+
+    def index(self):
+        """The item_search.json payload (without generatedAt)."""
+        keys = list(self.ids)
+        normalized = [name.lower() for name, _, _ in keys]
+        postings = defaultdict(list)
+        for i, norm in enumerate(normalized):
+            for tri in _trigrams(norm):
+                postings[tri].append(i)
+
+        return {
+            'format': ITEM_SEARCH_FORMAT,
+            'items': {
+                'name': [k[0] for k in keys],
+                'normalized': normalized,
+                'department': [k[1] for k in keys],
+                'category': [k[2] for k in keys],
+                'revenueCents': [t[0] for t in self.totals],
+                'quantity': [t[1] for t in self.totals],
+                'transactions': [t[2] for t in self.totals],
+            },
+            'trigrams': dict(sorted(postings.items())),
+        }
+
+    def finish(self):
+        data = dict(self.index(), generatedAt=datetime.now().isoformat())
+        out = os.path.join(OUTPUT_DIR, 'item_search.json')
+        publish_json(out, data, separators=(',', ':'))
+        print(f'  -> {out}  ({len(data["items"]["name"]):,} items, '
+              f'{len(data["trigrams"]):,} trigrams, {os.path.getsize(out) / 1024:.0f} KB)')
+        return data
+
+
+# =============================================================================
+# EXPORT: days/ (per-day detail records in month bundles)
+# =============================================================================
+
+DAY_DETAIL_FORMAT = 'day-detail-v1'
+DAY_TOP_ITEMS = 10
 
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {}
-            for c in columns:
-                if c in header:
-                    idx[c] = header.index(c)
-            required = {'Transaction ID', 'Item ID', 'Transaction Type',
-                        'Item Type', 'Department', 'Item Created Date',
-                        'Deleted', 'Voided'}
-            if not required.issubset(idx.keys()):
+
+def day_details(rows):
+    """
+    Per-day detail from transactions.json rows, in exact cents, for the
+    revenue calendar's day modal. Each day has
+      departments  [department, revenueCents, quantity, transactions, items]
+      categories   [department, category, revenueCents, quantity, transactions, items]
+      items        [name, department, category, revenueCents, quantity, transactions]
+                   (the DAY_TOP_ITEMS highest-revenue rows per department,
+                   in transactions.json order)
+      deductions   [department, revenueCents] (adjustment & refund rows)
+    where items counts the day's item rows. Rows without a valid date are
+    left out. Returns {date: day} in date order.
+    """
+    codes, days = encode_dates([r['date'] for r in rows])
+    valid = days.valid[codes].tolist()
+
+    by_date = defaultdict(list)
+    for r, ok in zip(rows, valid):
+        if ok:
+            by_date[r['date']].append(r)
+
+    out = {}
+    for date_str in sorted(by_date):
+        cats = {}
+        top = defaultdict(list)
+        deductions = []
+        for i, r in enumerate(by_date[date_str]):
+            cents = row_cents(r)
+            if r['name'] == DEDUCTION_NAME:
+                deductions.append([r['department'], cents])
                 continue
-            max_idx = max(idx.values())
+            c = cats.setdefault((r['department'], r['category']), [0, 0, 0, 0])
+            c[0] += cents
+            c[1] += r['quantity']
+            c[2] += r['transactions']
+            c[3] += 1
+            item = [r['name'], r['department'], r['category'], cents, r['quantity'], r['transactions']]
+            top[r['department']].append((-cents, i, item))
+
+        depts = {}
+        for (dept, _), c in sorted(cats.items()):
+            d = depts.setdefault(dept, [0, 0, 0, 0])
+            for j in range(4):
+                d[j] += c[j]
+        kept = sorted((e for group in top.values() for e in sorted(group)[:DAY_TOP_ITEMS]),
+                      key=lambda e: e[1])
+        out[date_str] = {
+            'departments': [[dept] + d for dept, d in depts.items()],
+            'categories': [[dept, cat] + c for (dept, cat), c in sorted(cats.items())],
+            'items': [e[2] for e in kept],
+            'deductions': deductions,
+        }
+    return out
 
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if row[idx['Transaction Type']] != 'Sales':
-                    continue
-                if row[idx['Item Type']] != 'Product':
-                    continue
-                if row[idx['Department']].strip() != 'Bowling':
-                    continue
-
-                key = (row[idx['Transaction ID']], row[idx['Item ID']])
-                if key in seen:
-                    continue
-                seen.add(key)
-
-                date_str = row[idx['Item Created Date']].strip()
-                total_val = float(row[idx.get('Total', 0)] or 0) if 'Total' in idx else 0
-                qty = float(row[idx['Quantity']] or 0) if 'Quantity' in idx else 0
-                unit = float(row[idx['Unit Amount']] or 0) if 'Unit Amount' in idx else 0
-                revenue = total_val if total_val != 0 else (qty * unit if qty else unit)
-
-                try:
-                    dt = datetime.strptime(date_str, '%Y-%m-%d')
-                except ValueError:
-                    continue
-
-                daily[date_str] += revenue
-                all_dates.append(dt)
 
+def _day_bundle(month, days):
+    """
+    Month bundle payload for day_details() days: names, departments and
+    categories become indexes into bundle-level lists (first-use order).
+    """
+    tables = {'names': {}, 'departments': {}, 'categories': {}}
+
+    def ref(table, value):
+        return tables[table].setdefault(value, len(tables[table]))
+
+    encoded = {}
+    for date_str, day in days.items():
+        encoded[date_str] = {
+            'departments': [[ref('departments', d[0])] + d[1:] for d in day['departments']],
+            'categories': [[ref('departments', c[0]), ref('categories', c[1])] + c[2:]
+                           for c in day['categories']],
+            'items': [[ref('names', i[0]), ref('departments', i[1]), ref('categories', i[2])] + i[3:]
+                      for i in day['items']],
+            'deductions': [[ref('departments', d[0]), d[1]] for d in day['deductions']],
+        }
+    return {
+        'format': DAY_DETAIL_FORMAT,
+        'month': month,
+        'names': list(tables['names']),
+        'departments': list(tables['departments']),
+        'categories': list(tables['categories']),
+        'days': encoded,
+    }
+
+
+class DayDetails(RowConsumer):
+    """
+    day_details() as days/YYYY/MM.json month bundles (_day_bundle), each
+    published as its month batch arrives, plus days/index.json listing each
+    month's path, date range, byte size and sha256, so opening a calendar
+    day fetches one small bundle instead of needing every transaction row
+    in memory.
+    """
+
+    def __init__(self):
+        self.months = []
+        self.day_revenue = {}
+
+    def consume_rows(self, rows):
+        days = day_details(rows)
+        if not days:
+            return
+        month = next(iter(days))[:7]
+        path = f'{month[:4]}/{month[5:7]}.json'
+        body = json.dumps(_day_bundle(month, days), separators=(',', ':')).encode('utf-8')
+        publish_bytes(os.path.join(DAY_DIR, path), body)
+        dates = list(days)
+        self.months.append({
+            'month': month,
+            'path': 'days/' + path,
+            'dateRange': [dates[0], dates[-1]],
+            'days': len(dates),
+            'bytes': len(body),
+            'sha256': hashlib.sha256(body).hexdigest(),
+        })
+
+    def finish(self):
+        months = self.months
+        data = {
+            'format': DAY_DETAIL_FORMAT,
+            'generatedAt': datetime.now().isoformat(),
+            'topItems': DAY_TOP_ITEMS,
+            'dateRange': [months[0]['dateRange'][0], months[-1]['dateRange'][1]] if months else [],
+            'months': months,
+        }
+        publish_json(os.path.join(DAY_DIR, 'index.json'), data, indent=2)
+
+        # Drop bundles for months that no longer have rows
+        keep = {os.path.normpath(os.path.join(OUTPUT_DIR, m['path'])) for m in months}
+        for dirpath, _, files in os.walk(DAY_DIR):
+            for name in files:
+                full = os.path.normpath(os.path.join(dirpath, name))
+                if name != 'index.json' and not name.endswith(ENCODINGS) and full not in keep:
+                    os.remove(full)
+        total = sum(m['bytes'] for m in months)
+        print(f'  -> {DAY_DIR}/  ({sum(m["days"] for m in months):,} days in {len(months)} month bundles, '
+              f'{total / 1024:.0f} KB + index.json)')
+
+
+# =============================================================================
+# EXPORT: bowling_seasonality.json (multi-year, from all CSVs)
+# =============================================================================
+
+def export_bowling_seasonality(daily):
+    """Export bowling weekly revenue grouped by year for seasonality chart."""
     if not daily:
         print('  WARNING: No bowling data found!')
         return
 
-    weekly = defaultdict(float)
-    for date_str, rev in daily.items():
-        dt = datetime.strptime(date_str, '%Y-%m-%d')
-        ws = dt - timedelta(days=dt.weekday())
-        weekly[ws] += rev
+    weekly = bowling_weekly(daily)
 
-    by_year_week = defaultdict(lambda: defaultdict(float))
+    by_year_week = defaultdict(lambda: defaultdict(int))
     for ws, rev in weekly.items():
         iso = ws.isocalendar()
         year, week_num = iso[0], min(iso[1], 52)
@@ -709,11 +1277,14 @@ def export_bowling_seasonality(csv_files):
     for year in sorted(by_year_week.keys()):
         weeks = by_year_week[year]
         by_year_json[str(year)] = [
-            {'week': w, 'revenue': round(rev, 2)}
+            {'week': w, 'revenue': to_dollars(rev)}
             for w, rev in sorted(weeks.items())
         ]
 
-    min_d, max_d = min(all_dates), max(all_dates)
+    days = encode_dates(list(daily))[1]
+    ordinals = days.ordinal[days.valid]
+    min_d = datetime.fromordinal(int(ordinals.min()))
+    max_d = datetime.fromordinal(int(ordinals.max()))
     total_rev = sum(daily.values())
 
     data = {
@@ -722,84 +1293,31 @@ def export_bowling_seasonality(csv_files):
             'start': min_d.strftime('%b %d, %Y'),
             'end': max_d.strftime('%b %d, %Y'),
         },
-        'totalRevenue': round(total_rev, 2),
+        'totalRevenue': to_dollars(total_rev),
         'yearColors': YEAR_COLORS,
         'years': sorted(by_year_week.keys()),
     }
 
     out = os.path.join(OUTPUT_DIR, 'bowling_seasonality.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
-    print(f'  -> {out}  ({len(by_year_week)} years, ${total_rev:,.0f})')
+    publish_json(out, data, indent=2)
+    print(f'  -> {out}  ({len(by_year_week)} years, ${total_rev / 100:,.0f})')
 
 
 # =============================================================================
 # EXPORT: bowling_forecast.json
 # =============================================================================
 
-def _load_bowling_weekly(csv_files):
-    """Load bowling weekly revenue from POS CSVs. Returns dict: week_start -> revenue."""
-    daily = defaultdict(float)
-    columns = [
-        'Transaction ID', 'Item ID', 'Transaction Type', 'Item Type',
-        'Department', 'Item Created Date', 'Total', 'Quantity',
-        'Unit Amount', 'Deleted', 'Voided',
-    ]
-    seen = set()
-
-    for csv_path in csv_files:
-        if not os.path.isfile(csv_path):
-            continue
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: header.index(c) for c in columns if c in header}
-            required = {'Transaction ID', 'Item ID', 'Transaction Type',
-                        'Item Type', 'Department', 'Item Created Date',
-                        'Deleted', 'Voided'}
-            if not required.issubset(idx.keys()):
-                continue
-            max_idx = max(idx.values())
-
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if row[idx['Transaction Type']] != 'Sales':
-                    continue
-                if row[idx['Item Type']] != 'Product':
-                    continue
-                if row[idx['Department']].strip() != 'Bowling':
-                    continue
-
-                key = (row[idx['Transaction ID']], row[idx['Item ID']])
-                if key in seen:
-                    continue
-                seen.add(key)
-
-                date_str = row[idx['Item Created Date']].strip()
-                total_val = float(row[idx.get('Total', 0)] or 0) if 'Total' in idx else 0
-                qty = float(row[idx['Quantity']] or 0) if 'Quantity' in idx else 0
-                unit = float(row[idx['Unit Amount']] or 0) if 'Unit Amount' in idx else 0
-                revenue = total_val if total_val != 0 else (qty * unit if qty else unit)
-
-                try:
-                    dt = datetime.strptime(date_str, '%Y-%m-%d')
-                except ValueError:
-                    continue
-
-                daily[date_str] += revenue
-
-    weekly = defaultdict(float)
-    for date_str, rev in daily.items():
-        dt = datetime.strptime(date_str, '%Y-%m-%d')
-        ws = dt - timedelta(days=dt.weekday())
+def bowling_weekly(daily):
+    """Roll bowling daily revenue up to weeks. Returns dict: week_start -> revenue (cents)."""
+    days = encode_dates(list(daily))[1]
+    week_starts = days.datetimes(days.week_start)
+    weekly = defaultdict(int)
+    for ws, rev in zip(week_starts, daily.values()):
         weekly[ws] += rev
     return weekly
 
 
-def export_bowling_forecast(csv_files):
+def export_bowling_forecast(daily):
     """Export bowling forecast: seasonal model + current year actuals (replaces SARIMA)."""
     forecasts = {}
 
@@ -820,7 +1338,7 @@ def export_bowling_forecast(csv_files):
             print(f'  Loaded seasonal: {len(rows)} weeks')
 
     # Current year actuals from POS data
-    weekly = _load_bowling_weekly(csv_files)
+    weekly = bowling_weekly(daily)
     if weekly:
         max_year = max(ws.year for ws in weekly.keys())
         actual_rows = []
@@ -831,7 +1349,7 @@ def export_bowling_forecast(csv_files):
                     'weekStart': ws.strftime('%Y-%m-%d'),
                     'weekOfYear': min(iso[1], 52),
                     'year': ws.year,
-                    'predictedRevenue': round(rev, 2),
+                    'predictedRevenue': to_dollars(rev),
                 })
         if actual_rows:
             forecasts['actual'] = actual_rows
@@ -847,8 +1365,7 @@ def export_bowling_forecast(csv_files):
     }
 
     out = os.path.join(OUTPUT_DIR, 'bowling_forecast.json')
-    with open(out, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    publish_json(out, data, indent=2)
     print(f'  -> {out}')
 
 
@@ -857,6 +1374,21 @@ def export_bowling_forecast(csv_files):
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description='Export dashboard JSON from POS CSVs.')
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='Reuse per-file aggregates from data/.cache/etl/ and only scan new, changed or appended CSVs'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1, metavar='N',
+        help='Parse and aggregate CSVs in N worker processes (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--precompress', action='store_true',
+        help='Also write .gz/.br siblings of every output, for hosts that serve precompressed files'
+    )
+    args = parser.parse_args()
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     print('=' * 60)
@@ -874,40 +1406,65 @@ def main():
     category_overrides = load_category_overrides()
     print(f'Category overrides: {len(category_overrides)} entries')
 
+    if args.incremental:
+        print('\nIncremental scan (per-file watermarks)...')
+    else:
+        print('\nScanning CSVs...')
+    agg = update_aggregates(csv_files, collect_aggregates,
+                            incremental=args.incremental, workers=args.workers)
+    stats = agg['stats']
+    print(f'  Total: {stats["rows"]:,} rows, {stats["duplicates"]:,} duplicates, '
+          f'{stats["transactions"]:,} transactions')
+
     print('\n[1/6] Transactions...')
-    rows = export_transactions(csv_files, category_overrides)
+    summary, cells, items, search, days = (DepartmentSummary(), DayCells(), ItemSeries(),
+                                           ItemSearch(), DayDetails())
+    n_rows = export_transactions(agg['items'], agg['deductions'], category_overrides,
+                                 consumers=(summary, cells, items, search, days))
 
     print('\n[2/6] Modifiers...')
-    export_modifiers(csv_files)
+    export_modifiers(agg['modifiers'])
     print('  Modifier transactions (date-granular)...')
-    export_modifier_transactions(csv_files)
+    export_modifier_transactions(agg['modifiersByDate'])
 
     print('\n[3/6] Summary...')
-    summary = export_summary(rows)
+    summary = summary.finish()
     for dept, info in summary['departments'].items():
         print(f'  {dept}: ${info["revenue"]:,.0f}  '
               f'({info["uniqueItems"]} items, {info["transactions"]:,} txns)')
+    print('  Rollup cube...')
+    export_rollups(cells)
+    print('  Item series...')
+    items.finish()
+    print('  Item search index...')
+    search.finish()
+    print('  Day details...')
+    days.finish()
 
     print('\n[4/6] Bowling Seasonality...')
-    export_bowling_seasonality(csv_files)
+    export_bowling_seasonality(agg['bowlingDaily'])
 
     print('\n[5/6] Bowling Forecast...')
-    export_bowling_forecast(csv_files)
+    export_bowling_forecast(agg['bowlingDaily'])
 
     print('\n[6/6] Holiday Analysis...')
     try:
-        import sys
         _scripts = os.path.join(_ROOT, 'scripts')
         if _scripts not in sys.path:
             sys.path.insert(0, _scripts)
         from holiday_analysis import export_holiday_analysis
-        if export_holiday_analysis(rows, quiet=True) == 0:
+        if export_holiday_analysis(cells.rows(), quiet=True) == 0:
             print(f'  -> {os.path.join(OUTPUT_DIR, "holiday_analysis.json")}')
     except ImportError as e:
         print(f'  SKIP: holiday_analysis not available ({e})')
 
+    print('\nPublishing...')
+    files, changed = publish_outputs(OUTPUT_DIR, precompress=args.precompress)
+    print(f'  Asset manifest: {changed:,} of {files:,} files changed '
+          f'-> {os.path.join(OUTPUT_DIR, "asset-manifest.json")}')
+
     print('\n' + '=' * 60)
-    print(f'Done! {len(rows):,} transaction rows written to {OUTPUT_DIR}')
+    print(f'Done! {n_rows:,} transaction rows written to {OUTPUT_DIR}')
     print('=' * 60)
     return 0
 
@@ -11,9 +11,7 @@ Lightweight bar sales forecasting. Same structure as forecast_food_sales.
 
 import statistics
 from collections import defaultdict
-from datetime import datetime
-
-from build_bar_dashboard import _read_transactions, _resolve_products, load_data
+from build_bar_dashboard import _read_columns, _resolve_products, load_data
 
 # =============================================================================
 # CONFIG
@@ -51,22 +49,22 @@ def load_day_of_week_data():
     with open(FILTER_FILE, 'r', encoding='utf-8') as f:
         allowed = set(line.strip() for line in f if line.strip())
 
-    transactions = _read_transactions()
+    cols = _read_columns()
+    days = cols['days']
+    weekday_names = [DAY_NAMES[wd] if ok else None
+                     for wd, ok in zip(days.weekday.tolist(), days.valid.tolist())]
     daily_revenue = defaultdict(float)
     daily_items = defaultdict(int)
     date_to_weekday = {}
 
-    for p in _resolve_products(transactions, allowed):
+    for p in _resolve_products(cols, allowed):
         date_str = p['date']
         revenue = p['unit_price'] * p['qty'] if p['qty'] else p['unit_price']
         qty = p['qty'] or 1
         daily_revenue[date_str] += revenue
         daily_items[date_str] += qty
-        try:
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-            date_to_weekday[date_str] = DAY_NAMES[dt.weekday()]
-        except ValueError:
-            pass
+        if weekday_names[p['day']]:
+            date_to_weekday[date_str] = weekday_names[p['day']]
 
     # Group by weekday
     weekday_revenue = defaultdict(list)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+fourier_forecast.py
+
+Fast alternative to s=52 SARIMA. Weekly revenue is regressed on an
+intercept, a linear trend, FOURIER_K yearly sine/cosine pairs and one dummy
+per holiday (every week its holiday_analysis.get_holiday_periods period
+touches), with AR(1) errors. Forecasts are clipped at 0. All series are fitted together: they share one design
+matrix, each series masks out the weeks before its first sale, and the
+ridge normal equations of every series are solved in one batched
+np.linalg.solve.
+
+  model = fit_fourier(week_ordinals, Y, mask)   # Y, mask: (weeks, series)
+  model.forecast(future_week_ordinals)          # (horizon, series)
+
+Week ordinals are datetime.toordinal() of each week's Monday; weeks must be
+consecutive and end at the same week for every series.
+"""
+
+import os
+import sys
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from holiday_analysis import get_holiday_periods
+
+FOURIER_K = 6          # yearly harmonics (period 365.25 days)
+RIDGE = 1.0            # L2 penalty on every coefficient but the intercept
+MIN_HOLIDAY_WEEKS = 2  # a holiday needs this many observed weeks to get a dummy
+YEAR_DAYS = 365.25
+
+
+def _holiday_weeks(first_year, last_year):
+    """{holiday name: set of Monday ordinals of every week its periods touch}."""
+    weeks = {}
+    for name, start, end, _ in get_holiday_periods(list(range(first_year, last_year + 1))):
+        first = start.toordinal() - start.weekday()
+        weeks.setdefault(name, set()).update(range(first, end.toordinal() + 1, 7))
+    return weeks
+
+
+class FourierModel:
+    """Fitted coefficients (one column per series) plus what design() needs to extend them."""
+
+    def __init__(self, origin, k, holidays, coef, phi, last_resid, last_week):
+        self.origin = origin          # ordinal the trend is measured from
+        self.k = k
+        self.holidays = holidays      # [(name, set of week ordinals)] with a dummy column
+        self.coef = coef              # (p, series)
+        self.phi = phi                # AR(1) coefficient per series
+        self.last_resid = last_resid  # residual of the last observed week per series
+        self.last_week = last_week
+
+    def design(self, week_ordinals):
+        """Design matrix (weeks, p): intercept, trend (years), K sin/cos pairs, holiday dummies."""
+        weeks = np.asarray(week_ordinals, dtype=np.int64)
+        days = weeks + 3   # mid-week
+        angle = 2 * np.pi * (days % YEAR_DAYS)[:, None] * np.arange(1, self.k + 1) / YEAR_DAYS
+        cols = [np.ones(len(weeks)), (weeks - self.origin) / YEAR_DAYS, np.sin(angle), np.cos(angle)]
+        if self.holidays:
+            cols.append(np.array([[w in hw for _, hw in self.holidays] for w in weeks.tolist()],
+                                 dtype=np.float64).reshape(len(weeks), -1))
+        return np.column_stack(cols)
+
+    def forecast(self, week_ordinals):
+        """
+        Predicted revenue (len(week_ordinals), series) for weeks after the
+        last observed one, clipped at 0 (revenue is never negative).
+        """
+        weeks = np.asarray(week_ordinals, dtype=np.int64)
+        steps = ((weeks - self.last_week) // 7).clip(min=0)
+        ar = self.phi[None, :] ** steps[:, None] * self.last_resid[None, :]
+        return np.maximum(self.design(weeks) @ self.coef + ar, 0.0)
+
+
+def fit_fourier(week_ordinals, Y, mask=None, k=FOURIER_K, ridge=RIDGE, horizon_year=None):
+    """
+    Fit every column of Y (weeks, series) at once. mask (weeks, series) is
+    True for observed weeks (default: all). horizon_year: last year a
+    forecast may reach, for the holiday calendar (default: a year past the
+    data). Returns a FourierModel.
+    """
+    weeks = np.asarray(week_ordinals, dtype=np.int64)
+    Y = np.asarray(Y, dtype=np.float64)
+    mask = np.ones(Y.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    first_year = date.fromordinal(int(weeks[0])).year
+    last_year = horizon_year or date.fromordinal(int(weeks[-1])).year + 1
+
+    observed = weeks[mask.any(axis=1)]
+    holidays = [(name, hw) for name, hw in sorted(_holiday_weeks(first_year, last_year).items())
+                if np.isin(observed, list(hw)).sum() >= MIN_HOLIDAY_WEEKS]
+    model = FourierModel(int(weeks[0]), k, holidays, None, None, None, int(weeks[-1]))
+    X = model.design(weeks)
+
+    # Per-series ridge normal equations, solved as one (series, p, p) batch
+    W = mask.astype(np.float64)
+    XtWX = np.einsum('tp,ts,tq->spq', X, W, X)
+    XtWy = np.einsum('tp,ts->sp', X, W * Y)
+    penalty = np.full(X.shape[1], ridge)
+    penalty[0] = 1e-9   # intercept: effectively unpenalized
+    coef = np.linalg.solve(XtWX + np.diag(penalty), XtWy[..., None])[..., 0].T
+
+    # AR(1) on the in-sample residuals of consecutive observed weeks
+    resid = np.where(mask, Y - X @ coef, 0.0)
+    pair = mask[1:] & mask[:-1]
+    num = (pair * resid[1:] * resid[:-1]).sum(axis=0)
+    den = (pair * resid[:-1] ** 2).sum(axis=0)
+    phi = np.clip(np.divide(num, den, out=np.zeros_like(num), where=den > 0), -0.99, 0.99)
+
+    model.coef, model.phi, model.last_resid = coef, phi, resid[-1]
+    return model
@@ -6,8 +6,11 @@ Reads config/specialty_cocktails.txt and writes public/data/specialty_cocktails.
 Run when the specialty cocktail list changes.
 """
 
-import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from publish import publish_json, publish_outputs
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_FILE = os.path.join(_ROOT, 'config', 'specialty_cocktails.txt')
@@ -18,9 +21,8 @@ def main():
     with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
         names = [line.strip() for line in f if line.strip()]
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(names, f, indent=2)
+    publish_json(OUTPUT_FILE, names, indent=2)
+    publish_outputs()
 
     print(f'Wrote {len(names)} specialty cocktails to {OUTPUT_FILE}')
 
@@ -4,16 +4,27 @@ holiday_analysis.py
 
 Generates holiday_analysis.json: US holiday dates (including variable-date holidays)
 with aggregated POS revenue/transactions per holiday period, for YoY analysis.
+Rows are summed once into per-day cumulative totals (DayTotals), so every
+holiday or custom --event window, single- or multi-day, is two lookups.
 
 Reads from public/data/transactions.json (created by export_dashboards.py).
 Outputs to public/data/holiday_analysis.json.
 """
 
+import argparse
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from date_index import encode_dates
+from money import group_sum, row_cents, to_dollars
+from publish import publish_json, publish_outputs
+
 try:
     import holidays
 except ImportError:
@@ -120,36 +131,86 @@ def load_transactions(rows=None):
         return json.load(f)
 
 
-def aggregate_by_date_range(rows, start_date, end_date):
-    """Aggregate revenue, transactions, and byDepartment for rows in date range."""
-    total_revenue = 0.0
-    total_transactions = 0
-    by_dept = defaultdict(float)
-
-    for r in rows:
-        try:
-            d = datetime.strptime(r['date'], '%Y-%m-%d').date()
-        except (ValueError, KeyError):
-            continue
-        if start_date <= d <= end_date:
-            rev = r.get('revenue', 0) or 0
-            txns = r.get('transactions', 0) or 0
-            dept = r.get('department', 'Other')
-            total_revenue += rev
-            total_transactions += txns
-            by_dept[dept] += rev
-
-    return {
-        'revenue': round(total_revenue, 2),
-        'transactions': total_transactions,
-        'byDepartment': dict(by_dept),
-    }
-
+class DayTotals:
+    """
+    Revenue (cents), transactions, row counts and per-department revenue for
+    every calendar day from the first to the last dated row, kept as
+    cumulative sums so any [start, end] window costs two lookups regardless
+    of its length or the number of rows.
+    """
 
-def export_holiday_analysis(rows=None, quiet=False):
+    def __init__(self, rows):
+        codes, days = encode_dates([r.get('date') for r in rows])
+        ordinals = days.ordinal[codes]
+        dated = np.flatnonzero(ordinals >= 0)
+        self.departments = sorted({rows[i].get('department', 'Other') for i in dated.tolist()})
+        self.first = int(ordinals[dated].min()) if len(dated) else 0
+        n_days = int(ordinals[dated].max()) - self.first + 1 if len(dated) else 0
+        n_depts = len(self.departments)
+
+        dept_index = {d: i for i, d in enumerate(self.departments)}
+        day = ordinals[dated] - self.first
+        dept = np.array([dept_index[rows[i].get('department', 'Other')] for i in dated.tolist()],
+                        dtype=np.int64)
+        cents = [row_cents(rows[i]) for i in dated.tolist()]
+        txns = [rows[i].get('transactions', 0) or 0 for i in dated.tolist()]
+
+        cell = day * n_depts + dept
+        revenue = group_sum(cell, cents, n_days * n_depts).reshape(n_days, n_depts)
+        counts = np.bincount(cell, minlength=n_days * n_depts).reshape(n_days, n_depts)
+        # Row d of each prefix array sums days [0, d)
+        self._revenue = np.vstack([np.zeros((1, n_depts), dtype=np.int64), revenue.cumsum(axis=0)])
+        self._rows = np.vstack([np.zeros((1, n_depts), dtype=np.int64), counts.cumsum(axis=0)])
+        self._transactions = np.concatenate([[0], group_sum(day, txns, n_days).cumsum()])
+
+    def _bounds(self, start_date, end_date):
+        n_days = len(self._transactions) - 1
+        lo = min(max(start_date.toordinal() - self.first, 0), n_days)
+        hi = min(max(end_date.toordinal() - self.first + 1, lo), n_days)
+        return lo, hi
+
+    def window(self, start_date, end_date):
+        """
+        Revenue, transactions and byDepartment for rows dated start_date
+        through end_date (inclusive). byDepartment lists departments with
+        rows in the window, in transactions.json (date, department) order.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        revenue = self._revenue[hi] - self._revenue[lo]
+        present = np.flatnonzero(self._rows[hi] > self._rows[lo])
+        # First day in the window on which each department has a row
+        first_day = {j: int(np.searchsorted(self._rows[:, j], self._rows[lo, j], side='right'))
+                     for j in present.tolist()}
+        order = sorted(first_day, key=lambda j: (first_day[j], self.departments[j]))
+        return {
+            'revenue': to_dollars(int(revenue.sum())),
+            'transactions': int(self._transactions[hi] - self._transactions[lo]),
+            'byDepartment': {self.departments[j]: to_dollars(int(revenue[j])) for j in order},
+        }
+
+
+def parse_event(text):
+    """'Name:YYYY-MM-DD[:YYYY-MM-DD]' -> (name, start, end) for a custom event window."""
+    parts = text.split(':')
+    try:
+        if len(parts) not in (2, 3) or not parts[0]:
+            raise ValueError
+        start = datetime.strptime(parts[1], '%Y-%m-%d').date()
+        end = datetime.strptime(parts[-1], '%Y-%m-%d').date()
+        if end < start:
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected NAME:YYYY-MM-DD[:YYYY-MM-DD], got {text!r}')
+    return parts[0], start, end
+
+
+def export_holiday_analysis(rows=None, quiet=False, events=()):
     """
-    Generate holiday_analysis.json. If rows is provided (from export_dashboards),
-    use them; otherwise load from transactions.json.
+    Generate holiday_analysis.json. If rows is provided (from export_dashboards:
+    transactions.json rows, or its per-(date, department, category) DayCells
+    rows, which give the same totals), use them; otherwise load from
+    transactions.json. events: extra
+    (name, start, end) windows (parse_event) exported alongside the holidays.
     Returns 0 on success, 1 on failure.
     """
     rows = load_transactions(rows)
@@ -168,16 +229,17 @@ def export_holiday_analysis(rows=None, quiet=False):
             print('ERROR: No valid dates in transactions')
         return 1
 
-    periods = get_holiday_periods(years)
+    periods = get_holiday_periods(years) + [(name, start, end, start.year) for name, start, end in events]
     if not quiet:
         print(f'Transactions: {len(rows):,} rows')
         print(f'Years: {years}')
         print(f'Holiday periods: {len(periods)}')
 
     # Group by holiday name
+    totals = DayTotals(rows)
     by_holiday = defaultdict(list)
     for name, start, end, year in periods:
-        agg = aggregate_by_date_range(rows, start, end)
+        agg = totals.window(start, end)
         by_holiday[name].append({
             'year': year,
             'startDate': start.strftime('%Y-%m-%d'),
@@ -202,14 +264,23 @@ def export_holiday_analysis(rows=None, quiet=False):
         'yearColors': YEAR_COLORS,
     }
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(out, f, indent=2)
+    publish_json(OUTPUT_FILE, out, indent=2)
 
     return 0
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Export holiday_analysis.json from transactions.json.')
+    parser.add_argument(
+        '--event', action='append', default=[], type=parse_event, metavar='NAME:START[:END]',
+        help='Extra event window to export, e.g. "Spring Break:2025-03-14:2025-03-23" (repeatable)'
+    )
+    parser.add_argument(
+        '--precompress', action='store_true',
+        help='Also write .gz/.br siblings of every output, for hosts that serve precompressed files'
+    )
+    args = parser.parse_args()
+
     print('=' * 60)
     print('HOLIDAY ANALYSIS')
     print('=' * 60)
@@ -218,9 +289,10 @@ def main():
     if not rows:
         return 1
 
-    result = export_holiday_analysis(rows)
+    result = export_holiday_analysis(rows, events=args.event)
     if result == 0:
         print(f'  -> {OUTPUT_FILE}')
+        publish_outputs(precompress=args.precompress)
         print('Done!')
     return result
 
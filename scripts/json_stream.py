@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+json_stream.py
+
+Incremental writer for large JSON arrays of rows (transactions.json,
+modifier_transactions.json). Rows are handed over one at a time, encoded in
+fixed-size batches with the C json encoder and written as each batch fills,
+so only one batch of encoded text is held at once. json.dump(rows, f) walks
+the whole list through the pure-Python iterencode instead (about 3x slower).
+Output bytes are identical to json.dump(rows, f, separators=(',', ':')).
+The array goes to a temp file that is published atomically on close
+(publish.publish_file: left alone when the content is unchanged).
+
+  with JsonArrayWriter(path) as out:
+      for row in sorted_rows:
+          out.write(row)
+  out.count, out.bytes, out.changed
+
+With fields, only those keys of each row are written (in that order), so
+rows can carry working values that are not part of the file.
+"""
+
+import json
+import os
+
+from publish import publish_file, temp_path
+
+BATCH_ROWS = 4096
+
+
+class JsonArrayWriter:
+    """Compact JSON array at path, written batch by batch."""
+
+    def __init__(self, path, batch_rows=BATCH_ROWS, fields=None):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.fields = fields
+        self.count = 0
+        self.bytes = 0
+        self.changed = False
+        self._batch = []
+        self._f = None
+        self._tmp = None
+
+    def __enter__(self):
+        self._tmp = temp_path(self.path)
+        self._f = open(self._tmp, 'w', encoding='utf-8')
+        self._write('[')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._flush()
+                self._write(']')
+        finally:
+            self._f.close()
+        if exc_type is None:
+            self.changed = publish_file(self._tmp, self.path)
+        else:
+            os.remove(self._tmp)
+        return False
+
+    def write(self, row):
+        if self.fields is not None:
+            row = {f: row[f] for f in self.fields}
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        text = json.dumps(self._batch, separators=(',', ':'))[1:-1]
+        self._write(',' + text if self.count else text)
+        self.count += len(self._batch)
+        self._batch = []
+
+    def _write(self, text):
+        self._f.write(text)
+        self.bytes += len(text)   # ASCII-escaped output: one byte per char
+
+
+def write_json_rows(path, rows, batch_rows=BATCH_ROWS, fields=None):
+    """Stream an iterable of rows to path; returns the number written."""
+    with JsonArrayWriter(path, batch_rows, fields) as out:
+        for row in rows:
+            out.write(row)
+    return out.count
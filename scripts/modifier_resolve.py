@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+modifier_resolve.py
+
+Vectorized modifier-to-parent resolution over columnar line items.
+
+POS exports list Modifiers (extra cheese, sauce choice, ...) as separate rows
+after their Product within a transaction. The per-script walkers sorted each
+transaction by Item ID and attached every Modifier to the most recent
+Product; a Package (or the start of a transaction) breaks the chain, so
+Modifiers before any Product are dropped. Here the same rules run as array
+operations:
+
+  order   = transaction_order(txn_ids, item_ids)       # one sort
+  parents = modifier_parents(txn_ids[order], kinds[order])   # forward-fill
+  cost    = rollup_modifiers(parents, amounts[order])  # grouped reduction
+
+Amounts are summed in row order, so results match the Python walk exactly;
+integer amounts (cents, see money.py) stay integers.
+"""
+
+import numpy as np
+
+OTHER, PRODUCT, MODIFIER, PACKAGE = -1, 0, 1, 2
+KINDS = {'Product': PRODUCT, 'Modifier': MODIFIER, 'Package': PACKAGE}
+
+
+def item_kinds(item_types):
+    """Kind code per row from Item Type strings (OTHER for anything else)."""
+    item_types = np.asarray(item_types, dtype=object)
+    kinds = np.full(len(item_types), OTHER, dtype=np.int8)
+    for item_type, kind in KINDS.items():
+        kinds[item_types == item_type] = kind
+    return kinds
+
+
+def first_seen_rank(txn_ids):
+    """Per row: rank of its transaction by first appearance (0, 1, 2, ...)."""
+    txn_ids = np.asarray(txn_ids)
+    if not len(txn_ids):
+        return np.empty(0, dtype=np.int64)
+    _, first, inverse = np.unique(txn_ids, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    return rank[inverse.ravel()]
+
+
+def transaction_order(txn_ids, item_ids, ranks=None):
+    """
+    Permutation that groups rows by transaction (in first-seen order, or by
+    ranks when given) and sorts each transaction by Item ID. Stable, like the
+    walkers' list.sort().
+    """
+    if ranks is None:
+        ranks = first_seen_rank(txn_ids)
+    return np.lexsort((np.asarray(item_ids), ranks))
+
+
+def modifier_parents(txn_ids, kinds):
+    """
+    For rows already in transaction_order: index of the Product each Modifier
+    attaches to, -1 for unattached Modifiers and for every other row.
+    """
+    n = len(kinds)
+    parents = np.full(n, -1, dtype=np.int64)
+    if not n:
+        return parents
+    idx = np.arange(n)
+    txn_start = np.ones(n, dtype=np.bool_)
+    txn_start[1:] = txn_ids[1:] != txn_ids[:-1]
+    anchor = (kinds == PRODUCT) | (kinds == PACKAGE)
+    # Segmented forward-fill: latest Product/Package or transaction start
+    last = np.maximum.accumulate(np.where(anchor | txn_start, idx, 0))
+    attached = (kinds == MODIFIER) & (kinds[last] == PRODUCT)
+    parents[attached] = last[attached]
+    return parents
+
+
+def rollup_modifiers(parents, amounts):
+    """Per row: sum of amounts of the Modifiers attached to it (0 elsewhere)."""
+    mods = parents >= 0
+    amounts = np.asarray(amounts)
+    if amounts.dtype.kind in 'iu':
+        out = np.zeros(len(parents), dtype=np.int64)
+        np.add.at(out, parents[mods], amounts[mods])
+        return out
+    return np.bincount(parents[mods], weights=amounts.astype(np.float64)[mods],
+                       minlength=len(parents))
+
+
+def resolve_unit_prices(txn_ids, item_ids, kinds, unit_prices):
+    """
+    Rule used by the PDF/CSV exporters: a Product with a zero Unit Amount
+    takes the summed Unit Amount of its Modifiers. Returns (order,
+    unit_prices) with unit_prices in transaction_order.
+    """
+    order = transaction_order(txn_ids, item_ids)
+    kinds = kinds[order]
+    unit = np.asarray(unit_prices)[order]
+    cost = rollup_modifiers(modifier_parents(np.asarray(txn_ids)[order], kinds), unit)
+    return order, np.where((kinds == PRODUCT) & (unit == 0) & (cost > 0), cost, unit)
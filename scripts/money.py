@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+money.py
+
+Integer-cents money helpers. POS exports carry amounts with four decimals
+but always whole cents ('139.0500'), so Unit Amount and Total are parsed to
+int64 cents once (pos_cache) and aggregated exactly. Values are converted to
+dollars only at the JSON/report boundary.
+
+Quantity stays a float (fractional quantities such as 0.1667 exist); a
+Unit Amount x Quantity line is rounded to the nearest cent (half to even).
+
+Item x date rows built by the ETL carry their bucket's integer cents under
+ROW_CENTS next to the dollar 'revenue' that is exported; row_cents() reads
+a row's revenue in cents either way.
+"""
+
+import numpy as np
+
+ROW_CENTS = '_revenueCents'   # not in columnar_export.ROW_FIELDS, so never serialized
+
+
+def parse_cents(text):
+    """'139.0500' -> 13905 ('' -> 0)."""
+    return round(float(text or 0) * 100)
+
+
+def scale_cents(cents, qty):
+    """Cents x quantity, rounded to whole cents (scalar or array)."""
+    if isinstance(cents, np.ndarray) or isinstance(qty, np.ndarray):
+        return np.rint(cents * qty).astype(np.int64)
+    return round(cents * qty)
+
+
+def line_revenue_cents(total, unit, qty):
+    """
+    POS line revenue in cents: Total when set, else Unit Amount x Quantity
+    (or Unit Amount when Quantity is 0). Works on scalars and arrays.
+    """
+    if isinstance(total, np.ndarray):
+        return np.where(total != 0, total,
+                        np.where(qty != 0, scale_cents(unit, qty), unit))
+    if total != 0:
+        return total
+    return scale_cents(unit, qty) if qty else unit
+
+
+def group_sum(groups, cents, n_groups):
+    """Exact int64 sum of cents per group index (0..n_groups-1)."""
+    out = np.zeros(n_groups, dtype=np.int64)
+    np.add.at(out, groups, np.asarray(cents, dtype=np.int64))
+    return out
+
+
+def to_dollars(cents):
+    """Cents -> dollars (float, or float array) for output."""
+    if isinstance(cents, np.ndarray):
+        return cents / 100
+    return round(cents / 100, 2)
+
+
+def row_cents(row):
+    """
+    Revenue of an item x date row in cents: the ETL's exact ROW_CENTS when
+    present, else the row's dollar 'revenue' (rows read back from
+    transactions.json) rounded to whole cents.
+    """
+    cents = row.get(ROW_CENTS)
+    if cents is not None:
+        return cents
+    return round((row.get('revenue') or 0) * 100)
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+pos_cache.py
+
+Persistent columnar cache of parsed POS exports. Each data/*.csv is tokenized
+once into typed NumPy columns (int64 IDs, int64 cents for Unit Amount and
+Total, float64 quantities, bool flags and dictionary-encoded strings) stored under data/.cache/ as memory-mappable
+.npy files plus a meta.json.
+
+A cache entry is fresh when the source path, size and mtime match. If only the
+mtime changed (file copied or touched), the content hash is compared and the
+entry is reused when the bytes are unchanged.
+
+Usage:
+  python scripts/pos_cache.py            # build/refresh cache for data/*.csv
+  python scripts/pos_cache.py --rebuild  # force re-parse of every file
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from money import line_revenue_cents, parse_cents
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(_ROOT, 'data')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+CACHE_VERSION = 2
+MIN_CHUNK_BYTES = 8 << 20   # don't split files into chunks smaller than this
+
+INT_COLUMNS = ['Transaction ID', 'Item ID']
+FLOAT_COLUMNS = ['Quantity']
+MONEY_COLUMNS = ['Unit Amount', 'Total']   # int64 cents (money.py)
+FLAG_COLUMNS = ['Deleted', 'Voided']   # True when the CSV value is not 'False'
+STRING_COLUMNS = [
+    'Name', 'Item Type', 'Transaction Type', 'Department', 'Subdepartment',
+    'Item Created Date', 'Item Created Time', 'Transaction Created Date',
+]
+CACHED_COLUMNS = INT_COLUMNS + FLOAT_COLUMNS + MONEY_COLUMNS + FLAG_COLUMNS + STRING_COLUMNS
+
+
+class PosTable:
+    """
+    Columnar view of one POS export. Only columns present in the CSV header
+    are available. String columns are stored as int32 codes into a dictionary
+    of raw (unstripped) values; use strings()/stripped() to decode.
+    """
+
+    def __init__(self, path, columns, arrays, dictionaries):
+        self.path = path
+        self.columns = columns
+        self.arrays = arrays
+        self.dictionaries = dictionaries
+        self.n_rows = len(next(iter(arrays.values()))) if arrays else 0
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, col):
+        return self.arrays[col]
+
+    def has(self, *cols):
+        return all(c in self.arrays for c in cols)
+
+    def strings(self, col):
+        """Dictionary of raw values for a string column (index = code)."""
+        return self.dictionaries[col]
+
+    def stripped(self, col):
+        """
+        (codes, values) with whitespace stripped. Raw values that only differ
+        in surrounding whitespace share one code.
+        """
+        values = []
+        index = {}
+        remap = np.empty(len(self.dictionaries[col]), dtype=np.int32)
+        for i, raw in enumerate(self.dictionaries[col]):
+            s = raw.strip()
+            if s not in index:
+                index[s] = len(values)
+                values.append(s)
+            remap[i] = index[s]
+        return remap[self.arrays[col]], values
+
+    def matches(self, col, *values, strip=False):
+        """Boolean row mask: value (optionally whitespace-stripped) is one of values."""
+        lut = np.array(
+            [(raw.strip() if strip else raw) in values for raw in self.dictionaries[col]],
+            dtype=np.bool_,
+        )
+        if not len(lut):
+            return np.zeros(self.n_rows, dtype=np.bool_)
+        return lut[self.arrays[col]]
+
+    def decode(self, col, rows=None):
+        """Per-row raw string values (optionally for a row index array)."""
+        codes = self.arrays[col] if rows is None else self.arrays[col][rows]
+        d = self.dictionaries[col]
+        return [d[c] for c in codes.tolist()]
+
+    def dollars(self, col):
+        """Money column (stored as int64 cents) as float64 dollars."""
+        return self.arrays[col] / 100
+
+
+def revenue_column(table):
+    """
+    Per-row POS line revenue in int64 cents: Total when set, else Unit Amount
+    x Quantity (or Unit Amount).
+    """
+    return line_revenue_cents(table['Total'], table['Unit Amount'], table['Quantity'])
+
+
+def active_rows(table):
+    """Boolean mask of rows that are neither Deleted nor Voided."""
+    return ~(table['Deleted'] | table['Voided'])
+
+
+# =============================================================================
+# FINGERPRINT
+# =============================================================================
+
+def file_fingerprint(path, with_hash=True):
+    """Fingerprint of a source file: absolute path, size, mtime and content hash."""
+    st = os.stat(path)
+    fp = {
+        'path': os.path.abspath(path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+    if with_hash:
+        fp['sha256'] = file_sha256(path)
+    return fp
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_path(csv_path):
+    abs_path = os.path.abspath(csv_path)
+    tag = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(CACHE_DIR, f'{os.path.basename(abs_path)}-{tag}')
+
+
+def _column_file(col):
+    return col.lower().replace(' ', '_') + '.npy'
+
+
+# =============================================================================
+# BUILD / LOAD
+# =============================================================================
+
+def _read_header(csv_path):
+    """(header, byte offset of the first data row) of a semicolon CSV."""
+    with open(csv_path, 'rb') as f:
+        first = f.readline()
+    header = next(csv.reader([first.decode('utf-8')], delimiter=';'), None)
+    return header, len(first)
+
+
+def _parse_rows(reader, idx):
+    """
+    Tokenize rows into typed columns. Returns (arrays, dictionaries) where
+    string columns are int32 codes into chunk-local dictionaries.
+    """
+    max_idx = max(idx.values())
+    ints = {c: [] for c in INT_COLUMNS if c in idx}
+    floats = {c: [] for c in FLOAT_COLUMNS if c in idx}
+    money = {c: [] for c in MONEY_COLUMNS if c in idx}
+    flags = {c: [] for c in FLAG_COLUMNS if c in idx}
+    codes = {c: [] for c in STRING_COLUMNS if c in idx}
+    lookup = {c: {} for c in codes}
+
+    int_cols = [(idx[c], ints[c].append) for c in ints]
+    float_cols = [(idx[c], floats[c].append) for c in floats]
+    money_cols = [(idx[c], money[c].append) for c in money]
+    flag_cols = [(idx[c], flags[c].append) for c in flags]
+    str_cols = [(idx[c], codes[c].append, lookup[c]) for c in codes]
+
+    for row in reader:
+        if len(row) <= max_idx:
+            continue
+        for i, append in int_cols:
+            v = row[i]
+            append(int(v) if v else -1)
+        for i, append in float_cols:
+            append(float(row[i] or 0))
+        for i, append in money_cols:
+            append(parse_cents(row[i]))
+        for i, append in flag_cols:
+            append(row[i] != 'False')
+        for i, append, d in str_cols:
+            v = row[i]
+            code = d.get(v)
+            if code is None:
+                code = d[v] = len(d)
+            append(code)
+
+    arrays = {}
+    for c, vals in ints.items():
+        arrays[c] = np.array(vals, dtype=np.int64)
+    for c, vals in floats.items():
+        arrays[c] = np.array(vals, dtype=np.float64)
+    for c, vals in money.items():
+        arrays[c] = np.array(vals, dtype=np.int64)
+    for c, vals in flags.items():
+        arrays[c] = np.array(vals, dtype=np.bool_)
+    for c, vals in codes.items():
+        arrays[c] = np.array(vals, dtype=np.int32)
+    dictionaries = {c: list(d.keys()) for c, d in lookup.items()}
+    return arrays, dictionaries
+
+
+def _parse_chunk(csv_path, start, end, idx):
+    """
+    Tokenize bytes [start, end) of a CSV (both on row boundaries). Returns None
+    when the chunk holds a quote character, since a quoted field could span
+    the boundary; the caller then parses the file serially.
+    """
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if b'"' in data:
+        return None
+    return _parse_rows(csv.reader(io.StringIO(data.decode('utf-8')), delimiter=';'), idx)
+
+
+def _chunk_bounds(csv_path, start, n_chunks):
+    """Split [start, EOF) into n_chunks byte ranges ending on newlines."""
+    size = os.path.getsize(csv_path)
+    bounds = [start]
+    with open(csv_path, 'rb') as f:
+        for k in range(1, n_chunks):
+            f.seek(max(start + (size - start) * k // n_chunks, bounds[-1]))
+            f.readline()
+            pos = min(f.tell(), size)
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _concat_chunks(chunks):
+    """Concatenate chunk columns, re-coding strings into file-wide dictionaries
+    (first-seen order, so codes match a serial parse)."""
+    arrays = {}
+    dictionaries = {}
+    for col in chunks[0][0]:
+        if col not in chunks[0][1]:
+            arrays[col] = np.concatenate([a[col] for a, _ in chunks])
+            continue
+        lookup = {}
+        parts = []
+        for a, d in chunks:
+            remap = np.array([lookup.setdefault(v, len(lookup)) for v in d[col]], dtype=np.int32)
+            parts.append(remap[a[col]] if len(remap) else a[col])
+        arrays[col] = np.concatenate(parts)
+        dictionaries[col] = list(lookup)
+    return arrays, dictionaries
+
+
+def parse_pos_csv(csv_path, workers=1):
+    """
+    Tokenize a POS CSV into a PosTable (no caching). Returns None when the file
+    is not a POS export (no Deleted/Voided columns). Rows too short to hold
+    every cached column are dropped, as the per-script readers did.
+
+    With workers > 1, files larger than MIN_CHUNK_BYTES are split at newline
+    boundaries into byte ranges tokenized in a process pool; the result is
+    identical to a serial parse. Rows are only tokenized here, so transactions
+    that straddle a chunk boundary are grouped later over the whole table.
+    """
+    header, data_start = _read_header(csv_path)
+    if not header or 'Deleted' not in header or 'Voided' not in header:
+        return None
+    idx = {c: header.index(c) for c in CACHED_COLUMNS if c in header}
+
+    n_chunks = min(workers, os.path.getsize(csv_path) // MIN_CHUNK_BYTES)
+    chunks = None
+    if n_chunks > 1:
+        bounds = _chunk_bounds(csv_path, data_start, n_chunks)
+        with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+            chunks = list(pool.map(
+                _parse_chunk, *zip(*[(csv_path, a, b, idx) for a, b in bounds])
+            ))
+        if any(c is None for c in chunks):
+            chunks = None
+
+    if chunks is None:
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter=';')
+            next(reader, None)
+            chunks = [_parse_rows(reader, idx)]
+
+    arrays, dictionaries = _concat_chunks(chunks) if len(chunks) > 1 else chunks[0]
+    columns = [c for c in header if c in idx]
+    return PosTable(os.path.abspath(csv_path), columns, arrays, dictionaries)
+
+
+def _write_cache(table, fingerprint):
+    target = _cache_path(table.path)
+    tmp = target + '.tmp'
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    files = {}
+    for col, arr in table.arrays.items():
+        files[col] = _column_file(col)
+        np.save(os.path.join(tmp, files[col]), arr)
+    meta = {
+        'version': CACHE_VERSION,
+        'source': fingerprint,
+        'rows': table.n_rows,
+        'columns': table.columns,
+        'files': files,
+        'dictionaries': table.dictionaries,
+    }
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.replace(tmp, target)
+
+
+def _read_meta(csv_path):
+    meta_path = os.path.join(_cache_path(csv_path), 'meta.json')
+    if not os.path.isfile(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    return meta
+
+
+def _is_fresh(csv_path, meta):
+    """Check meta against the file; refresh the stored mtime when only it changed."""
+    src = meta['source']
+    fp = file_fingerprint(csv_path, with_hash=False)
+    if fp['path'] != src['path'] or fp['size'] != src['size']:
+        return False
+    if fp['mtime_ns'] == src['mtime_ns']:
+        return True
+    if file_sha256(csv_path) != src['sha256']:
+        return False
+    src['mtime_ns'] = fp['mtime_ns']
+    with open(os.path.join(_cache_path(csv_path), 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return True
+
+
+def _load_cached(csv_path, meta):
+    cache_dir = _cache_path(csv_path)
+    arrays = {
+        col: np.load(os.path.join(cache_dir, name), mmap_mode='r')
+        for col, name in meta['files'].items()
+    }
+    return PosTable(os.path.abspath(csv_path), meta['columns'], arrays, meta['dictionaries'])
+
+
+def load_pos_table(csv_path, use_cache=True, workers=1):
+    """
+    Load a POS export as a PosTable, from data/.cache/ when fresh, otherwise
+    parse the CSV (in up to `workers` byte-range chunks) and (re)write the
+    cache. Returns None for non-POS files.
+    """
+    if use_cache:
+        meta = _read_meta(csv_path)
+        if meta is not None and _is_fresh(csv_path, meta):
+            return _load_cached(csv_path, meta)
+
+    fingerprint = file_fingerprint(csv_path) if use_cache else None
+    table = parse_pos_csv(csv_path, workers=workers)
+    if table is None:
+        return None
+    if use_cache:
+        try:
+            _write_cache(table, fingerprint)
+        except OSError as e:
+            print(f'  WARNING: could not write cache for {os.path.basename(csv_path)}: {e}')
+    return table
+
+
+def load_pos_tables(csv_files, use_cache=True):
+    """Load several exports, skipping non-POS files. Returns list of PosTable."""
+    tables = []
+    for path in csv_files:
+        if not os.path.isfile(path):
+            continue
+        table = load_pos_table(path, use_cache=use_cache)
+        if table is not None:
+            tables.append(table)
+    return tables
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Build/refresh the columnar POS cache.')
+    parser.add_argument('files', nargs='*', help='CSV files (default: data/*.csv)')
+    parser.add_argument('--rebuild', action='store_true', help='Re-parse every file')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Tokenize large files in N byte-range chunks in parallel')
+    args = parser.parse_args()
+
+    csv_files = args.files or sorted(glob.glob(os.path.join(DATA_DIR, '*.csv')))
+    for path in csv_files:
+        table = load_pos_table(path, use_cache=not args.rebuild, workers=args.workers)
+        if table is None:
+            print(f'  {os.path.basename(path)}: not a POS export, skipped')
+            continue
+        if args.rebuild:
+            _write_cache(table, file_fingerprint(path))
+        print(f'  {os.path.basename(path)}: {len(table):,} rows -> {_cache_path(path)}')
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
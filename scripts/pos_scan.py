@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+pos_scan.py
+
+Single-pass scan engine for POS CSV exports. Each file is loaded once (from
+the pos_cache columnar cache when fresh, otherwise tokenized and cached);
+the shared Deleted/Voided filter and the (Transaction ID, Item ID) dedup
+(dedup_index, vectorized per file) are applied once, and every surviving
+row is fanned out to the registered consumers.
+
+Consumers subclass PosConsumer and declare which stream they want:
+  sales_only = True   deduplicated Sales line items (Product/Modifier/Package)
+  sales_only = False  every non-deleted, non-voided row (Adjustments, Refunds,
+                      Tax, ... and duplicates included), e.g. for deductions
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dedup_index import DedupIndex, pack_keys
+from money import line_revenue_cents
+from pos_cache import active_rows, load_pos_tables
+
+SALES_ITEM_TYPES = ('Product', 'Modifier', 'Package')
+SCAN_BLOCK_ROWS = 1 << 16   # rows decoded into Python objects at a time
+
+
+def normalize_subdepartment(subdept):
+    """Strip numbered prefixes from subdepartment names.
+    POS naming changed over time: '10. Draft Beer' -> 'Draft Beer'."""
+    if not subdept:
+        return subdept
+    return re.sub(r'^\d+\.\s*', '', subdept)
+
+
+class PosConsumer:
+    """
+    Base class for scan_pos_files() consumers.
+
+    required: header columns a file must have for this consumer to see its rows.
+    sales_only: see module docstring.
+    consume(rec) is called once per row with a parsed record dict:
+      txn_id, item_id, name, item_type, txn_type, department, subdepartment,
+      qty, unit_price, item_total, date, txn_done
+    txn_id and item_id are ints; unit_price and item_total are int cents
+    (money.py), qty is a float. txn_done is True on the last deduplicated
+    sales row of its transaction within the file, so sales consumers can
+    flush a transaction as soon as it is complete. Records are shared
+    between consumers; copy before mutating.
+
+    columnar = True consumers (sales_only only) get consume_columns(cols)
+    once per scan block instead: the same fields as NumPy arrays over the
+    block's deduplicated sales rows (strings as object arrays).
+
+    Subclasses implement at least one of the two; the default of each
+    adapts to the other, so either kind of consumer works in either mode.
+    """
+    required = ('Transaction ID', 'Item ID', 'Item Type')
+    sales_only = True
+    columnar = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.consume is PosConsumer.consume and cls.consume_columns is PosConsumer.consume_columns:
+            raise TypeError(f'{cls.__name__} must implement consume() or consume_columns()')
+
+    def consume(self, rec):
+        """Default: hand the record to consume_columns() as a one-row block."""
+        self.consume_columns({
+            key: np.array([value], dtype=object if isinstance(value, str) else None)
+            for key, value in rec.items()
+        })
+
+    def consume_columns(self, cols):
+        """Default: feed the block to consume() one record at a time."""
+        keys = list(cols)
+        for values in zip(*(cols[key].tolist() for key in keys)):
+            self.consume(dict(zip(keys, values)))
+
+    def finish(self):
+        """Called once after the last file has been scanned."""
+
+
+def line_revenue(rec):
+    """POS line revenue in cents: Total when set, else Unit Amount x Quantity (or Unit Amount)."""
+    return line_revenue_cents(rec['item_total'], rec['unit_price'], rec['qty'])
+
+
+def _column(table, col, rows, default):
+    """Per-row Python values of a cached column for the given rows, or a constant."""
+    if not table.has(col):
+        return [default] * len(rows)
+    return table[col][rows].tolist()
+
+
+def _decoded(table, col, rows, default, clean=str.strip):
+    """Per-row decoded strings; clean() runs once per dictionary entry, not per row."""
+    if not table.has(col):
+        return [default] * len(rows)
+    values = [clean(v) for v in table.strings(col)]
+    return [values[c] for c in table[col][rows].tolist()]
+
+
+def _normalized_subdepartment(raw):
+    return normalize_subdepartment(raw.strip())
+
+
+_STRING_FIELDS = [
+    # (record key, column, default when missing, clean)
+    ('name', 'Name', '', str.strip),
+    ('item_type', 'Item Type', '', str),
+    ('txn_type', 'Transaction Type', 'Sales', str),
+    ('department', 'Department', '', str.strip),
+    ('subdepartment', 'Subdepartment', '', _normalized_subdepartment),
+    ('date', 'Item Created Date', '', str.strip),
+]
+
+
+def _sales_mask(table):
+    """Active Sales line items (Product/Modifier/Package) that take part in dedup."""
+    if not table.has('Transaction ID', 'Item ID', 'Item Type'):
+        return np.zeros(len(table), dtype=np.bool_)
+    mask = active_rows(table) & table.matches('Item Type', *SALES_ITEM_TYPES)
+    if table.has('Transaction Type'):
+        mask &= table.matches('Transaction Type', 'Sales')
+    return mask
+
+
+def sales_keys(table, first_row=0):
+    """
+    Packed (Transaction ID, Item ID) keys (see dedup_index) of the rows
+    scan_pos_files() dedups, in row order, duplicates included.
+    """
+    rows = np.flatnonzero(_sales_mask(table))
+    if first_row:
+        rows = rows[rows >= first_row]
+    if not len(rows):
+        return np.empty(0, dtype=np.int64)
+    return pack_keys(table['Transaction ID'][rows], table['Item ID'][rows])
+
+
+def _array(table, col, rows, default, dtype):
+    if not table.has(col):
+        return np.full(len(rows), default, dtype=dtype)
+    return np.asarray(table[col][rows], dtype=dtype)
+
+
+def _scan_block(table, rows, is_sale, txn_done, sales_consumers, all_consumers,
+                columnar_consumers=()):
+    """Decode one block of rows and feed them to the consumers."""
+    if columnar_consumers:
+        sale = is_sale.nonzero()[0]
+        srows = rows[sale]
+        cols = {
+            'txn_id':     _array(table, 'Transaction ID', srows, -1, np.int64),
+            'item_id':    _array(table, 'Item ID', srows, -1, np.int64),
+            'qty':        _array(table, 'Quantity', srows, 0, np.float64),
+            'unit_price': _array(table, 'Unit Amount', srows, 0, np.int64),
+            'item_total': _array(table, 'Total', srows, 0, np.int64),
+            'txn_done':   txn_done[sale],
+        }
+        for key, col, default, clean in _STRING_FIELDS:
+            cols[key] = np.array(_decoded(table, col, srows, default, clean=clean), dtype=object)
+        for c in columnar_consumers:
+            c.consume_columns(cols)
+        if not sales_consumers and not all_consumers:
+            return
+
+    txn_ids = _column(table, 'Transaction ID', rows, -1)
+    item_ids = _column(table, 'Item ID', rows, -1)
+    names = _decoded(table, 'Name', rows, '')
+    item_types = _decoded(table, 'Item Type', rows, '', clean=str)
+    txn_types = _decoded(table, 'Transaction Type', rows, 'Sales', clean=str)
+    depts = _decoded(table, 'Department', rows, '')
+    subdepts = _decoded(table, 'Subdepartment', rows, '', clean=_normalized_subdepartment)
+    qtys = _column(table, 'Quantity', rows, 0)
+    units = _column(table, 'Unit Amount', rows, 0)
+    totals = _column(table, 'Total', rows, 0)
+    dates = _decoded(table, 'Item Created Date', rows, '')
+
+    for i, (sale, done) in enumerate(zip(is_sale.tolist(), txn_done.tolist())):
+        rec = {
+            'txn_id':        txn_ids[i],
+            'item_id':       item_ids[i],
+            'name':          names[i],
+            'item_type':     item_types[i],
+            'txn_type':      txn_types[i],
+            'department':    depts[i],
+            'subdepartment': subdepts[i],
+            'qty':           qtys[i],
+            'unit_price':    units[i],
+            'item_total':    totals[i],
+            'date':          dates[i],
+            'txn_done':      done,
+        }
+
+        if sale:
+            for c in sales_consumers:
+                c.consume(rec)
+        for c in all_consumers:
+            c.consume(rec)
+
+
+def scan_pos_files(csv_files, consumers, use_cache=True, seen=None, first_row=0):
+    """
+    Scan each POS CSV once (from the columnar cache when fresh, see pos_cache)
+    and feed every registered consumer.
+    seen: optional DedupIndex shared across calls; keys already in it count
+    as duplicates, new sales keys are added to it.
+    first_row: skip rows before this index in every file (appended-tail scans).
+    Returns (rows_read, duplicates_skipped) for the deduplicated sales stream.
+    """
+    if seen is None:
+        seen = DedupIndex()
+    total_rows = 0
+    dupes = 0
+
+    for table in load_pos_tables(csv_files, use_cache=use_cache):
+        active = [c for c in consumers if table.has(*c.required)]
+        if not active:
+            continue
+        columnar_consumers = [c for c in active if c.sales_only and c.columnar]
+        sales_consumers = [c for c in active if c.sales_only and not c.columnar]
+        all_consumers = [c for c in active if not c.sales_only]
+
+        # Dedup the whole file's sales rows in one vectorized pass
+        rows = np.flatnonzero(active_rows(table))
+        if first_row:
+            rows = rows[rows >= first_row]
+        is_sale = _sales_mask(table)[rows]
+        sale_pos = np.flatnonzero(is_sale)
+        if len(sale_pos):
+            dup = seen.mark_duplicates(
+                pack_keys(table['Transaction ID'][rows[sale_pos]], table['Item ID'][rows[sale_pos]])
+            )
+            is_sale[sale_pos[dup]] = False
+            dupes += int(dup.sum())
+            total_rows += len(sale_pos) - int(dup.sum())
+        # Last row of each transaction (rows are clustered by Transaction ID
+        # in POS exports, but this holds for any order)
+        sale_pos = np.flatnonzero(is_sale)
+        txn_done = np.zeros(len(rows), dtype=np.bool_)
+        if len(sale_pos):
+            rev_txn = table['Transaction ID'][rows[sale_pos]][::-1]
+            last = len(sale_pos) - 1 - np.unique(rev_txn, return_index=True)[1]
+            txn_done[sale_pos[last]] = True
+        if not all_consumers:
+            rows = rows[is_sale]
+            txn_done = txn_done[is_sale]
+            is_sale = is_sale[is_sale]
+
+        for start in range(0, len(rows), SCAN_BLOCK_ROWS):
+            block = slice(start, start + SCAN_BLOCK_ROWS)
+            _scan_block(table, rows[block], is_sale[block], txn_done[block],
+                        sales_consumers, all_consumers, columnar_consumers)
+
+    for c in consumers:
+        c.finish()
+
+    print(f'  Read {total_rows:,} rows, skipped {dupes:,} duplicates')
+    return total_rows, dupes
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+publish.py
+
+Atomic, content-aware writes for public/data/. Every export is written to a
+temp file in the destination directory, fsynced, and then either dropped
+(content unchanged, so the old file and its mtime/ETag stay) or moved into
+place with os.replace, so the site never sees half-written JSON.
+
+JSON payloads whose only difference from the file on disk is the
+'generatedAt' stamp count as unchanged.
+
+write_asset_manifest() then walks public/data/, hard-links every file to a
+content-hashed name under hashed/ (e.g. hashed/summary.3f2a9c0d1e4b.json)
+and writes asset-manifest.json mapping each path to its hashed name:
+
+  {"generatedAt": "...",
+   "files": {"summary.json": {"hashed": "hashed/summary.3f2a9c0d1e4b.json",
+                              "sha256": "...", "bytes": 5321}, ...}}
+
+Hashed files never change, so they can be served with immutable cache
+headers (netlify.toml). Because they are hard links, files under
+public/data/ must only ever be replaced through this module, never
+rewritten in place. The app resolves /data/ URLs through the manifest
+(app/lib/data-url.ts).
+
+write_compressed() adds precompressed siblings (x.json.gz, and x.json.br
+when the brotli package is installed) at maximum compression for every
+file of COMPRESS_MIN_BYTES or more, compressing files in parallel threads
+and only when the source is newer than its sibling (unchanged files keep
+their mtime). Hosts that serve precompressed files (nginx gzip_static /
+brotli_static, Caddy precompressed) then skip on-the-fly compression.
+Netlify (netlify.toml) compresses responses itself and never serves the
+siblings, so they are opt-in: publish_outputs(precompress=True), i.e.
+--precompress on export_dashboards.py / holiday_analysis.py. Without it,
+siblings left by an earlier precompressed run are removed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(_ROOT, 'public', 'data')
+HASHED_DIR = 'hashed'
+MANIFEST_NAME = 'asset-manifest.json'
+STAMP_KEY = 'generatedAt'
+HASH_CHARS = 12
+COMPRESS_MIN_BYTES = 1024
+ENCODINGS = ('.gz', '.br')
+
+# mkstemp creates 0600 files; published files get the usual umask-based mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_sha256(path):
+    """sha256 hex digest of a file ('' when it doesn't exist)."""
+    if not os.path.isfile(path):
+        return ''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def temp_path(dest):
+    """New empty temp file next to dest (same filesystem, so os.replace is atomic)."""
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest) or '.',
+                               prefix='.' + os.path.basename(dest) + '.', suffix='.tmp')
+    os.close(fd)
+    os.chmod(tmp, 0o666 & ~_UMASK)
+    return tmp
+
+
+def _sync(path):
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+def publish_file(tmp, dest, same=None):
+    """
+    Move a finished temp file over dest unless it has the same content
+    (byte-identical, or same(dest) returns True); the temp file is removed
+    either way. Returns True when dest changed.
+    """
+    try:
+        unchanged = os.path.isfile(dest) and (
+            (os.path.getsize(tmp) == os.path.getsize(dest) and file_sha256(tmp) == file_sha256(dest))
+            or (same is not None and same(dest)))
+        if unchanged:
+            return False
+        _sync(tmp)
+        os.replace(tmp, dest)
+        return True
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def publish_bytes(dest, body, same=None):
+    """Atomically write body (bytes) to dest; returns True when dest changed."""
+    tmp = temp_path(dest)
+    with open(tmp, 'wb') as f:
+        f.write(body)
+    return publish_file(tmp, dest, same)
+
+
+def _without_stamp(data):
+    return {k: v for k, v in data.items() if k != STAMP_KEY} if isinstance(data, dict) else data
+
+
+def _same_ignoring_stamp(body):
+    """publish_file comparator: the file holds body's JSON dict apart from STAMP_KEY."""
+    new = _without_stamp(json.loads(body))
+
+    def same(existing):
+        try:
+            with open(existing, 'r', encoding='utf-8') as f:
+                old = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return isinstance(old, dict) and _without_stamp(old) == new
+    return same
+
+
+def publish_json(dest, data, **dump_kwargs):
+    """
+    json.dumps(data, **dump_kwargs) to dest via publish_bytes; a dict that
+    differs from the file on disk only in STAMP_KEY counts as unchanged.
+    """
+    body = json.dumps(data, **dump_kwargs).encode('utf-8')
+    stamped = isinstance(data, dict) and STAMP_KEY in data
+    return publish_bytes(dest, body, _same_ignoring_stamp(body) if stamped else None)
+
+
+def _hashed_name(rel, sha):
+    stem, ext = os.path.splitext(rel)
+    return f'{HASHED_DIR}/{stem}.{sha[:HASH_CHARS]}{ext}'
+
+
+def _link(path, target):
+    """Hard-link path to target unless target already exists (copy when links fail)."""
+    if os.path.isfile(target):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(path, target)
+    except OSError:   # no hard links on this filesystem: copy
+        with open(path, 'rb') as f:
+            publish_bytes(target, f.read())
+
+
+def _fresh(path, sibling):
+    """True when sibling exists and is at least as new as path."""
+    return os.path.isfile(sibling) and os.path.getmtime(sibling) >= os.path.getmtime(path)
+
+
+def write_asset_manifest(data_dir=DATA_DIR):
+    """
+    Hash every file under data_dir, hard-link it to its hashed name, drop
+    hashed files no longer referenced and publish asset-manifest.json.
+    Returns (files, changed) counts versus the previous manifest.
+    """
+    manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        previous = {}
+
+    files = {}
+    for dirpath, dirnames, names in os.walk(data_dir):
+        rel_dir = os.path.relpath(dirpath, data_dir)
+        if rel_dir == HASHED_DIR or rel_dir.startswith(HASHED_DIR + os.sep):
+            continue
+        dirnames.sort()
+        for name in sorted(names):
+            rel = os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, '/')
+            if rel == MANIFEST_NAME or name.startswith('.') or name.endswith(ENCODINGS):
+                continue
+            path = os.path.join(dirpath, name)
+            sha = file_sha256(path)
+            hashed = _hashed_name(rel, sha)
+            _link(path, os.path.join(data_dir, hashed))
+            entry = {'hashed': hashed, 'sha256': sha, 'bytes': os.path.getsize(path)}
+            encodings = [ext for ext in ENCODINGS if _fresh(path, path + ext)]
+            for ext in encodings:
+                _link(path + ext, os.path.join(data_dir, hashed + ext))
+            if encodings:
+                entry['encodings'] = [ext[1:] for ext in encodings]
+            files[rel] = entry
+
+    # Remove hashed copies of content that is no longer published
+    keep = set()
+    for f in files.values():
+        target = os.path.normpath(os.path.join(data_dir, f['hashed']))
+        keep.add(target)
+        keep.update(target + '.' + enc for enc in f.get('encodings', []))
+    for dirpath, _, names in os.walk(os.path.join(data_dir, HASHED_DIR), topdown=False):
+        for name in names:
+            full = os.path.normpath(os.path.join(dirpath, name))
+            if full not in keep:
+                os.remove(full)
+        if dirpath != os.path.join(data_dir, HASHED_DIR) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+    publish_json(manifest_path, {'generatedAt': datetime.now().isoformat(), 'files': files}, indent=2)
+    changed = sum(1 for rel, f in files.items() if previous.get(rel, {}).get('sha256') != f['sha256'])
+    return len(files), changed
+
+
+# =============================================================================
+# PRECOMPRESSED SIBLINGS (.gz / .br)
+# =============================================================================
+
+def _compress(path, ext):
+    with open(path, 'rb') as f:
+        body = f.read()
+    if ext == '.gz':
+        packed = gzip.compress(body, compresslevel=9, mtime=0)
+    else:
+        packed = brotli.compress(body, mode=brotli.MODE_TEXT, quality=11, lgwin=24)
+    if not publish_bytes(path + ext, packed):
+        os.utime(path + ext)   # same bytes (source only touched): mark fresh
+    return len(body), len(packed)
+
+
+def write_compressed(data_dir=DATA_DIR, workers=None):
+    """
+    Write stale or missing .gz/.br siblings for files under data_dir (hashed/
+    excluded) and remove siblings whose source is gone. zlib and brotli
+    release the GIL, so files are compressed in a thread pool. Returns
+    (written, skipped, raw_bytes, compressed_bytes) for the written ones.
+    """
+    exts = ENCODINGS if brotli is not None else ('.gz',)
+    jobs = []
+    skipped = 0
+    for dirpath, dirnames, names in os.walk(data_dir):
+        rel_dir = os.path.relpath(dirpath, data_dir)
+        if rel_dir == HASHED_DIR or rel_dir.startswith(HASHED_DIR + os.sep):
+            dirnames[:] = []
+            continue
+        for name in sorted(names):
+            path = os.path.join(dirpath, name)
+            if name.endswith(ENCODINGS):
+                if not os.path.isfile(path[:-3]):
+                    os.remove(path)
+                continue
+            if name.startswith('.') or name == MANIFEST_NAME or os.path.getsize(path) < COMPRESS_MIN_BYTES:
+                continue
+            for ext in ENCODINGS:
+                if _fresh(path, path + ext):
+                    skipped += 1
+                elif ext in exts:
+                    jobs.append((path, ext))
+                elif os.path.isfile(path + ext):
+                    os.remove(path + ext)   # stale and can't be rebuilt here
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        sizes = list(pool.map(lambda job: _compress(*job), jobs))
+    return len(jobs), skipped, sum(r for r, _ in sizes), sum(c for _, c in sizes)
+
+
+def remove_compressed(data_dir=DATA_DIR):
+    """
+    Delete every .gz/.br sibling under data_dir; hashed/ copies are pruned by
+    write_asset_manifest once no entry lists them. Returns the count removed.
+    """
+    removed = 0
+    for dirpath, dirnames, names in os.walk(data_dir):
+        rel_dir = os.path.relpath(dirpath, data_dir)
+        if rel_dir == HASHED_DIR or rel_dir.startswith(HASHED_DIR + os.sep):
+            dirnames[:] = []
+            continue
+        for name in names:
+            if name.endswith(ENCODINGS):
+                os.remove(os.path.join(dirpath, name))
+                removed += 1
+    return removed
+
+
+def publish_outputs(data_dir=DATA_DIR, precompress=False):
+    """
+    Refresh the hashed copies and asset-manifest.json. With precompress,
+    changed files get their .gz/.br siblings first; without it, any
+    siblings are removed.
+    """
+    if not precompress:
+        removed = remove_compressed(data_dir)
+        if removed:
+            print(f'  Removed {removed:,} precompressed variants (--precompress not set)')
+        return write_asset_manifest(data_dir)
+
+    written, skipped, raw, packed = write_compressed(data_dir)
+    if written:
+        print(f'  Compressed {written:,} variants ({raw / 1e6:.1f} MB -> {packed / 1e6:.1f} MB), '
+              f'{skipped:,} up to date')
+    elif skipped:
+        print(f'  Compressed variants: {skipped:,} up to date')
+    if brotli is None:
+        print('  (brotli not installed: .gz only; pip install brotli for .br)')
+    return write_asset_manifest(data_dir)
@@ -5,12 +5,17 @@ Usage: python scripts/reconcile_day.py 2026-01-15
 
 Outputs totals by Item Type and Department so you can compare to the POS report.
 """
-import csv
 import glob
 import os
 import sys
 from collections import defaultdict
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from money import group_sum, to_dollars
+from pos_cache import active_rows, load_pos_tables, revenue_column
+
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT, 'data')
 
@@ -26,45 +31,38 @@ def reconcile(target_date: str):
         print("No CSV files found in data/")
         return 1
 
-    columns = [
-        'Transaction ID', 'Item ID', 'Transaction Type', 'Item Type',
-        'Department', 'Quantity', 'Unit Amount', 'Total',
-        'Item Created Date', 'Transaction Created Date', 'Transaction Fiscal',
-        'Deleted', 'Voided',
-    ]
-
-    by_item_type = defaultdict(float)
+    by_item_type = defaultdict(int)   # cents
     by_item_type_count = defaultdict(int)
-    by_dept = defaultdict(float)
-
-    for csv_path in csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            header = next(reader)
-            idx = {c: i for i, c in enumerate(header) if c in columns}
-            if 'Item Created Date' not in idx:
-                continue
-            max_idx = max(idx.values()) if idx else 0
-            for row in reader:
-                if len(row) <= max_idx:
-                    continue
-                if row[idx['Deleted']] != 'False' or row[idx['Voided']] != 'False':
-                    continue
-                if idx.get('Transaction Type') and row[idx['Transaction Type']] != 'Sales':
-                    continue
-                item_type = row[idx['Item Type']].strip()
-                total_val = float(row[idx.get('Total', 0)] or 0) if 'Total' in idx else 0
-                qty = float(row[idx.get('Quantity', 0)] or 0) if 'Quantity' in idx else 0
-                unit = float(row[idx.get('Unit Amount', 0)] or 0) if 'Unit Amount' in idx else 0
-                rev = total_val if total_val != 0 else (unit * qty if qty else unit)
-                dept = row[idx.get('Department', 0)].strip() if 'Department' in idx else ''
-                by_item_type[item_type] += rev
-                by_item_type_count[item_type] += 1
-                if item_type in ('Product', 'Modifier', 'Package'):
-                    item_date = row[idx['Item Created Date']].strip()
-                    if item_date == target_date:
-                        by_dept[dept or '(blank)'] += rev
+    by_dept = defaultdict(int)
+
+    for table in load_pos_tables(csv_files):
+        if not table.has('Item Created Date', 'Item Type'):
+            continue
+        mask = active_rows(table)
+        if table.has('Transaction Type'):
+            mask &= table.matches('Transaction Type', 'Sales')
+        rev = revenue_column(table)
+
+        type_codes, types = table.stripped('Item Type')
+        sums = group_sum(type_codes[mask], rev[mask], len(types))
+        counts = np.bincount(type_codes[mask], minlength=len(types))
+        for item_type, total, n in zip(types, sums.tolist(), counts.tolist()):
+            if n:
+                by_item_type[item_type] += total
+                by_item_type_count[item_type] += n
+
+        day = (mask
+               & table.matches('Item Type', 'Product', 'Modifier', 'Package', strip=True)
+               & table.matches('Item Created Date', target_date, strip=True))
+        dept_codes, depts = table.stripped('Department')
+        sums = group_sum(dept_codes[day], rev[day], len(depts))
+        counts = np.bincount(dept_codes[day], minlength=len(depts))
+        for dept, total, n in zip(depts, sums.tolist(), counts.tolist()):
+            if n:
+                by_dept[dept or '(blank)'] += total
 
+    by_item_type = {t: to_dollars(v) for t, v in by_item_type.items()}
+    by_dept = {d: to_dollars(v) for d, v in by_dept.items()}
     product_total = by_item_type.get('Product', 0) + by_item_type.get('Modifier', 0) + by_item_type.get('Package', 0)
     our_daily = sum(by_dept.values())
 
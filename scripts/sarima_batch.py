@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+sarima_batch.py
+
+SARIMA forecasts for every department (and optionally every department x
+category) at once. Weekly series come from the ETL's transactions.json
+(weekly_series.weekly_revenue); each series is fitted with bowling_sarima's
+SARIMAX orders, including its (0,0,0,52) fallback, in a process pool, so
+the whole venue takes about as long as the slowest single series. A fit
+that runs past --timeout seconds falls back, and then gives up, instead of
+holding up the batch. --engine fourier instead fits every series in one
+batched Fourier-seasonality regression (fourier_forecast). All forecasts go
+to one CSV.
+
+Run export_dashboards.py first.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bowling_sarima import (ORDER, SEASONAL_ORDER, fit_sarima, fmt_currency, sarima_forecast,
+                            weekly_to_series)
+from fourier_forecast import FOURIER_K, fit_fourier
+from weekly_series import TRANSACTIONS_FILE, load_rows, weekly_revenue
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(_ROOT, 'output', 'sarima_forecasts.csv')
+FORECAST_CSV_COLS = ['department', 'category', 'engine', 'week_start', 'week_of_year', 'year',
+                     'predicted_revenue', 'order', 'seasonal_order', 'saved_at']
+MIN_WEEKS = 104        # two seasons for s=52
+FIT_TIMEOUT = 600      # seconds per fit attempt
+
+
+# =============================================================================
+# FITTING (worker processes)
+# =============================================================================
+
+def fit_series(job):
+    """
+    Fit one series and forecast it; runs in a worker process. job is
+    (key, weekly, forecast_weeks, timeout). Returns a result dict with the
+    forecast [(week_start, revenue)], the orders and a model label (fallback,
+    convergence), seconds and error.
+    """
+    key, weekly, forecast_weeks, timeout = job
+    started = time.monotonic()
+    series = weekly_to_series(weekly)
+    with warnings.catch_warnings():
+        # Reported per series (model label) instead of interleaved worker output
+        warnings.simplefilter('ignore')
+        fitted, err = fit_sarima(series, timeout=timeout, quiet=True)
+    result = {'key': key, 'engine': 'sarima', 'forecast': [], 'order': None, 'seasonal_order': None,
+              'model': 'failed', 'error': err}
+    if fitted is not None:
+        result['forecast'] = sarima_forecast(fitted, series, forecast_weeks)
+        result['order'] = fitted.model.order
+        result['seasonal_order'] = fitted.model.seasonal_order
+        result['model'] = 'seasonal' if fitted.model.seasonal_order == SEASONAL_ORDER else 'fallback (0,0,0,52)'
+        if not fitted.mle_retvals.get('converged', True):
+            result['model'] += ', not converged'
+    result['seconds'] = time.monotonic() - started
+    return result
+
+
+def fit_all(jobs, workers=None):
+    """Fit jobs in a process pool (longest series first); results in job order."""
+    order = sorted(range(len(jobs)), key=lambda i: -len(jobs[i][1]))
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fit_series, [jobs[i] for i in order]))
+    by_job = dict(zip(order, results))
+    return [by_job[i] for i in range(len(jobs))]
+
+
+def fourier_all(selected, forecast_weeks):
+    """
+    Fit every selected (key, WeeklySeries, row) with the Fourier engine in a
+    single fit_fourier call (one column per series; weeks before a series'
+    first sale are masked out). Results match fit_series().
+    """
+    started = time.monotonic()
+    first = selected[0][1]
+    Y = np.column_stack([series.cents[i] / 100 for _, series, i in selected])
+    mask = np.cumsum(Y != 0, axis=0) > 0
+    weeks = first.first_week + 7 * np.arange(Y.shape[0])
+    future = weeks[-1] + 7 * np.arange(1, forecast_weeks + 1)
+    model = fit_fourier(weeks, Y, mask, horizon_year=datetime.fromordinal(int(future[-1])).year)
+    preds = model.forecast(future)
+    seconds = time.monotonic() - started
+
+    future_weeks = [datetime.fromordinal(int(w)) for w in future.tolist()]
+    return [{
+        'key': key,
+        'engine': 'fourier',
+        'forecast': list(zip(future_weeks, preds[:, j].tolist())),
+        'order': f'K={FOURIER_K}',
+        'seasonal_order': f'{len(model.holidays)} holiday dummies',
+        'model': f'fourier K={FOURIER_K}, AR(1)',
+        'error': None,
+        'seconds': seconds,
+    } for j, (key, _, _) in enumerate(selected)]
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def save_forecasts(results, path):
+    """One CSV for all series (bowling_sarima.save_forecast columns plus series and model)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    saved_at = datetime.now().isoformat()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(FORECAST_CSV_COLS)
+        for r in results:
+            department, category = (r['key'] + ('',))[:2]
+            for week_start, rev in r['forecast']:
+                w.writerow([
+                    department,
+                    category,
+                    r['engine'],
+                    week_start.strftime('%Y-%m-%d'),
+                    min(week_start.isocalendar()[1], 52),
+                    week_start.year,
+                    f'{rev:.2f}',
+                    str(r['order']),
+                    str(r['seasonal_order']),
+                    saved_at,
+                ])
+    print(f'  Forecasts saved to: {path}')
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='SARIMA forecasts for every department (and category) in parallel.'
+    )
+    parser.add_argument(
+        '--transactions', default=TRANSACTIONS_FILE,
+        help=f'transactions.json from export_dashboards.py (default: {TRANSACTIONS_FILE})'
+    )
+    parser.add_argument(
+        '--categories', action='store_true',
+        help='Also forecast every department x category series'
+    )
+    parser.add_argument(
+        '--departments', nargs='+', default=None,
+        help='Only these departments (default: all with enough history)'
+    )
+    parser.add_argument(
+        '--forecast-weeks', type=int, default=4,
+        help='Number of future weeks to forecast (default: 4)'
+    )
+    parser.add_argument(
+        '--engine', choices=('sarima', 'fourier'), default='sarima',
+        help='SARIMA per series in worker processes, or the Fourier regression for all series at once'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None, metavar='N',
+        help='Fit N series at a time in worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=FIT_TIMEOUT,
+        help=f'Seconds per series, fallback fit included (default: {FIT_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--output', default=DEFAULT_OUTPUT,
+        help=f'Forecast CSV path (default: {DEFAULT_OUTPUT})'
+    )
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('SARIMA BATCH FORECAST')
+    print('=' * 60)
+
+    rows = load_rows(args.transactions)
+    if not rows:
+        return 1
+
+    levels = ['department', 'category'] if args.categories else ['department']
+    selected = []
+    for level in levels:
+        series = weekly_revenue(rows, level)
+        for i, key in enumerate(series.keys):
+            if args.departments and key[0] not in args.departments:
+                continue
+            n_weeks = len(series.weekly(i))
+            if n_weeks < MIN_WEEKS:
+                print(f'  Skipping {series.label(i)}: {n_weeks} weeks (need {MIN_WEEKS})')
+                continue
+            selected.append((key, series, i))
+    if not selected:
+        print('No series with enough history to fit.')
+        return 1
+
+    started = time.monotonic()
+    if args.engine == 'fourier':
+        print(f'\nFitting {len(selected)} series together, Fourier K={FOURIER_K} + holidays + AR(1)...')
+        results = fourier_all(selected, args.forecast_weeks)
+    else:
+        print(f'\nFitting {len(selected)} series, order={ORDER} seasonal_order={SEASONAL_ORDER}...')
+        jobs = [(key, series.weekly(i), args.forecast_weeks, args.timeout) for key, series, i in selected]
+        results = fit_all(jobs, args.workers)
+    elapsed = time.monotonic() - started
+
+    print(f'\n{"Series":<36} {"Model":<36} {"Seconds":>8}  Forecast/week')
+    print('-' * 100)
+    for r in results:
+        label = ' / '.join(r['key'])
+        if r['error'] or not r['forecast']:
+            print(f'{label:<36} {"failed":<36} {r["seconds"]:>8.1f}  {r["error"]}')
+            continue
+        preds = [v for _, v in r['forecast']]
+        print(f'{label:<36} {r["model"]:<36} {r["seconds"]:>8.1f}  '
+              f'{fmt_currency(min(preds))}-{fmt_currency(max(preds))}')
+    if args.engine == 'fourier':
+        print(f'\n  {len(results)} series in {elapsed:.2f}s (one batched fit)')
+    else:
+        slowest = max(r['seconds'] for r in results)
+        print(f'\n  {len(results)} series in {elapsed:.1f}s '
+              f'(slowest {slowest:.1f}s, sum {sum(r["seconds"] for r in results):.1f}s)')
+
+    save_forecasts([r for r in results if r['forecast']], args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+sarima_cache.py
+
+Persisted SARIMAX parameters, so a weekly forecast refresh doesn't rerun the
+optimizer from scratch. Stored under data/.cache/sarima/, one JSON file per
+(series name, order, seasonal_order):
+
+  params / param_names   fitted parameters of the last fit
+  start, n_obs, sha256   first week, length and fingerprint of the weekly
+                         values the parameters were last applied to
+  full_fit_obs           series length at the last optimizer run
+
+plan() decides how the next fit of that series runs:
+  apply  history unchanged apart from appended weeks, and fewer than
+         refit_weeks weeks since the last optimizer run -> filter the
+         extended series with the cached parameters (no optimization)
+  warm   anything else with cached parameters (history restated, refit
+         due)                  -> optimize starting from the cached parameters
+  cold   no cached parameters, or refit forced -> optimize from scratch
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pos_cache import CACHE_DIR
+
+MODEL_DIR = os.path.join(CACHE_DIR, 'sarima')
+CACHE_VERSION = 1
+REFIT_WEEKS = 13   # full optimizer run at least once a quarter of new data
+
+
+def series_sha256(series, n_obs=None):
+    """Fingerprint of the first n_obs values (float64) and the start date of a weekly series."""
+    values = np.asarray(series.values[:n_obs], dtype=np.float64)
+    h = hashlib.sha256(series.index[0].strftime('%Y-%m-%d').encode('ascii'))
+    h.update(values.tobytes())
+    return h.hexdigest()
+
+
+class SarimaCache:
+    """Cached parameters for one named series (e.g. 'bowling')."""
+
+    def __init__(self, name, refit_weeks=REFIT_WEEKS, force_refit=False, model_dir=MODEL_DIR):
+        self.name = name
+        self.refit_weeks = refit_weeks
+        self.force_refit = force_refit
+        self.model_dir = model_dir
+
+    def _path(self, order, seasonal_order):
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', self.name).strip('-').lower() or 'series'
+        tag = hashlib.sha1(repr((self.name, tuple(order), tuple(seasonal_order))).encode('utf-8'))
+        return os.path.join(self.model_dir, f'{slug}-{tag.hexdigest()[:10]}.json')
+
+    def _load(self, order, seasonal_order):
+        try:
+            with open(self._path(order, seasonal_order), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('version') == CACHE_VERSION else None
+
+    def plan(self, series, order, seasonal_order, param_names):
+        """(mode, params) for fitting series: 'apply' / 'warm' with cached params, or ('cold', None)."""
+        entry = None if self.force_refit else self._load(order, seasonal_order)
+        if entry is None or entry['param_names'] != list(param_names):
+            return 'cold', None
+        params = np.array(entry['params'], dtype=np.float64)
+        appended = (
+            series.index[0].strftime('%Y-%m-%d') == entry['start']
+            and len(series) >= entry['n_obs']
+            and series_sha256(series, entry['n_obs']) == entry['sha256']
+        )
+        if appended and len(series) - entry['full_fit_obs'] < self.refit_weeks:
+            return 'apply', params
+        return 'warm', params
+
+    def store(self, series, order, seasonal_order, fitted, mode):
+        """Save fitted's parameters for series; mode is the plan() mode that produced them."""
+        previous = self._load(order, seasonal_order) if mode == 'apply' else None
+        entry = {
+            'version': CACHE_VERSION,
+            'name': self.name,
+            'order': list(order),
+            'seasonal_order': list(seasonal_order),
+            'param_names': list(fitted.model.param_names),
+            'params': [float(p) for p in fitted.params],
+            'start': series.index[0].strftime('%Y-%m-%d'),
+            'n_obs': len(series),
+            'sha256': series_sha256(series),
+            'full_fit_obs': previous['full_fit_obs'] if previous else len(series),
+            'fitted_at': previous['fitted_at'] if previous else datetime.now().isoformat(),
+            'applied_at': datetime.now().isoformat(),
+        }
+        path = self._path(order, seasonal_order)
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, path)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+seasonal_forecast.py
+
+bowling_seasonality.compute_weekly_forecast for every series at once. The
+weekly_series matrix is folded into a (series x year x week-of-year) array
+(ISO year and week, week 53 added to 52, like build_52week_by_year) and each
+forecast week is predicted as:
+
+  seasonal  mean of that week-of-year over years before the forecast week's
+            year, counting only weeks with sales (no leakage of the year
+            being forecast)
+  fallback  otherwise the mean of the last `lookback` weeks of history (of
+            the weeks before start_from_year, for a full-year forecast)
+
+Optionally (trend_weeks > 0) seasonal predictions are scaled by how the
+last trend_weeks weeks compare with their own prior-year seasonal means,
+clipped to TREND_CLIP.
+
+  future, preds, seasonal = seasonal_forecast(weekly_revenue(rows, 'item'))
+  preds[i, h]   dollars for series i in week future[h]
+
+Run export_dashboards.py first.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bowling_seasonality import FORECAST_WEEKS_LOOKBACK, fmt_currency
+from weekly_series import LEVEL_FIELDS, TRANSACTIONS_FILE, load_rows, weekly_revenue
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(_ROOT, 'output', 'seasonal_forecasts.csv')
+FORECAST_CSV_COLS = ['department', 'category', 'name', 'week_start', 'week_of_year', 'year',
+                     'predicted_revenue', 'method', 'saved_at']
+TREND_CLIP = (0.5, 2.0)   # bounds on the trend scaling factor
+
+
+# =============================================================================
+# FORECAST
+# =============================================================================
+
+def _iso_week(ordinal):
+    """(ISO year, week 1-52) of a date ordinal; week 53 counts as 52."""
+    year, week, _ = date.fromordinal(ordinal).isocalendar()
+    return year, min(week, 52)
+
+
+def year_week_array(series):
+    """
+    (years, cents) for a WeeklySeries: years is the sorted ISO years of its
+    weeks and cents an int64 array (series, years, 52) of weekly revenue.
+    """
+    n_series, n_weeks = series.cents.shape
+    iso = [date.fromordinal(series.first_week + 7 * w).isocalendar()[:2] for w in range(n_weeks)]
+    years = sorted({y for y, _ in iso})
+    cell = np.array([years.index(y) * 52 + min(wk, 52) - 1 for y, wk in iso], dtype=np.int64)
+    week53 = np.array([wk == 53 for _, wk in iso], dtype=bool)
+
+    # Every other week has its own (year, week) cell; week 53 is added to 52's
+    out = np.zeros((n_series, len(years) * 52), dtype=np.int64)
+    out[:, cell[~week53]] = series.cents[:, ~week53]
+    out[:, cell[week53]] += series.cents[:, week53]
+    return np.array(years), out.reshape(n_series, len(years), 52)
+
+
+def prior_year_means(years, cents, week_ordinals):
+    """
+    Leakage-free seasonal means for the weeks starting on week_ordinals:
+    per series, the mean over years before each week's calendar year of that
+    week-of-year's revenue, ignoring weeks without sales. Returns (means in
+    cents as float, has_history) arrays of shape (series, weeks).
+    """
+    iso = [_iso_week(int(w)) for w in week_ordinals]
+    week_idx = np.array([wk - 1 for _, wk in iso], dtype=np.int64)
+    forecast_year = np.array([date.fromordinal(int(w)).year for w in week_ordinals])
+    prior = years[:, None] < forecast_year[None, :]                        # (years, weeks)
+
+    values = cents[:, :, week_idx]                                         # (series, years, weeks)
+    use = (values > 0) & prior[None, :, :]
+    count = use.sum(axis=1)
+    total = np.where(use, values, 0).sum(axis=1)
+    means = np.divide(total, count, out=np.zeros(count.shape), where=count > 0)
+    return means, count > 0
+
+
+def seasonal_forecast(series, num_future_weeks=4, lookback=FORECAST_WEEKS_LOOKBACK,
+                      start_from_year=None, trend_weeks=0):
+    """
+    Forecast every series of a WeeklySeries (compute_weekly_forecast
+    semantics; each series' history starts at its first sale). Forecasts
+    num_future_weeks after the last week, or the 52 weeks from ISO week 1 of
+    start_from_year. Returns (future weeks, dollars (series, weeks),
+    seasonal (series, weeks) bool: False where the lookback fallback was used).
+    Future weeks are datetimes, or dates for a full-year forecast, as
+    compute_weekly_forecast returns them.
+    """
+    n_series, n_weeks = series.cents.shape
+    ordinals = series.first_week + 7 * np.arange(n_weeks)
+    if start_from_year is not None:
+        first = date.fromisocalendar(start_from_year, 1, 1).toordinal()
+        future = first + 7 * np.arange(52)
+        end = int(np.searchsorted(ordinals, date(start_from_year, 1, 1).toordinal()))
+    else:
+        future = ordinals[-1] + 7 * np.arange(1, num_future_weeks + 1)
+        end = n_weeks
+
+    # Fallback: mean of the last `lookback` weeks before `end`, from each series' first sale
+    first_sale = np.where(series.cents.any(axis=1), (series.cents != 0).argmax(axis=1), n_weeks)
+    start = max(end - lookback, 0)
+    window = series.cents[:, start:end]
+    in_history = np.arange(start, end)[None, :] >= first_sale[:, None]
+    count = in_history.sum(axis=1)
+    fallback = np.divide(np.where(in_history, window, 0).sum(axis=1), count,
+                         out=np.zeros(n_series), where=count > 0)
+
+    years, cents = year_week_array(series)
+    means, seasonal = prior_year_means(years, cents, future)
+    preds = np.where(seasonal, means, fallback[:, None])
+
+    if trend_weeks > 0 and end > 0:
+        recent = ordinals[max(end - trend_weeks, 0):end]
+        ref, has_ref = prior_year_means(years, cents, recent)
+        actual = series.cents[:, max(end - trend_weeks, 0):end]
+        ref_total = np.where(has_ref, ref, 0).sum(axis=1)
+        act_total = np.where(has_ref, actual, 0).sum(axis=1)
+        ratio = np.divide(act_total, ref_total, out=np.ones(n_series), where=ref_total > 0)
+        preds = np.where(seasonal, preds * np.clip(ratio, *TREND_CLIP)[:, None], preds)
+
+    week = date.fromordinal if start_from_year is not None else datetime.fromordinal
+    return [week(int(w)) for w in future], preds / 100, seasonal
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def save_forecasts(series, future, preds, seasonal, path):
+    """One CSV row per series and week (department, category and name as far as the level has them)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    saved_at = datetime.now().isoformat()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(FORECAST_CSV_COLS)
+        for i, key in enumerate(series.keys):
+            labels = (key + ('', ''))[:3]
+            for h, week_start in enumerate(future):
+                w.writerow([
+                    *labels,
+                    week_start.strftime('%Y-%m-%d'),
+                    min(week_start.isocalendar()[1], 52),
+                    week_start.year,
+                    f'{preds[i, h]:.2f}',
+                    'seasonal' if seasonal[i, h] else 'fallback',
+                    saved_at,
+                ])
+    print(f'  Forecasts saved to: {path}')
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='52-week seasonal-mean forecasts for every department, category or item.'
+    )
+    parser.add_argument(
+        '--transactions', default=TRANSACTIONS_FILE,
+        help=f'transactions.json from export_dashboards.py (default: {TRANSACTIONS_FILE})'
+    )
+    parser.add_argument(
+        '--level', choices=sorted(LEVEL_FIELDS), default='item',
+        help='Series to forecast (default: item)'
+    )
+    parser.add_argument(
+        '--departments', nargs='+', default=None,
+        help='Only these departments (default: all)'
+    )
+    parser.add_argument(
+        '--forecast-weeks', type=int, default=4,
+        help='Number of future weeks to forecast (default: 4)'
+    )
+    parser.add_argument(
+        '--forecast-full-year', type=int, metavar='YEAR', default=None,
+        help='Forecast the 52 weeks from Jan 1 of YEAR (overrides --forecast-weeks)'
+    )
+    parser.add_argument(
+        '--lookback', type=int, default=FORECAST_WEEKS_LOOKBACK,
+        help=f'Weeks averaged when a week has no seasonal history (default: {FORECAST_WEEKS_LOOKBACK})'
+    )
+    parser.add_argument(
+        '--trend-weeks', type=int, default=0, metavar='N',
+        help='Scale seasonal means by the last N weeks vs their seasonal means (default: 0, off)'
+    )
+    parser.add_argument(
+        '--output', default=DEFAULT_OUTPUT,
+        help=f'Forecast CSV path (default: {DEFAULT_OUTPUT})'
+    )
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('SEASONAL FORECAST')
+    print('=' * 60)
+
+    rows = load_rows(args.transactions)
+    if not rows:
+        return 1
+    if args.departments:
+        rows = [r for r in rows if r['department'] in args.departments]
+    series = weekly_revenue(rows, args.level)
+    if not len(series):
+        print('No sales to forecast.')
+        return 1
+
+    started = time.monotonic()
+    future, preds, seasonal = seasonal_forecast(
+        series, num_future_weeks=args.forecast_weeks, lookback=args.lookback,
+        start_from_year=args.forecast_full_year, trend_weeks=args.trend_weeks,
+    )
+    elapsed = time.monotonic() - started
+
+    print(f'  {len(series)} {args.level} series x {len(future)} weeks in {elapsed * 1000:.0f} ms '
+          f'({future[0].strftime("%Y-%m-%d")} to {future[-1].strftime("%Y-%m-%d")})')
+    print(f'  Seasonal: {int(seasonal.sum()):,} of {seasonal.size:,} series-weeks '
+          f'(rest: {args.lookback}-week average)')
+    top = np.argsort(-preds.sum(axis=1))[:10]
+    print(f'\n{"Series":<48} {"Forecast/week":>24}')
+    print('-' * 74)
+    for i in top.tolist():
+        print(f'{series.label(i):<48} '
+              f'{fmt_currency(preds[i].min()) + "-" + fmt_currency(preds[i].max()):>24}')
+    print()
+
+    save_forecasts(series, future, preds, seasonal, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+weekly_series.py
+
+Weekly (Monday) revenue series for every department, department x category
+or item, built from the ETL's transactions.json rows in one pass and held as
+a single matrix (one row per series, one column per week):
+
+  series = weekly_revenue(load_rows(), level='department')
+  series.keys         [('Bar',), ('Bowling',), ...]   (per LEVEL_FIELDS)
+  series.weeks        Monday datetimes, every week from first to last
+  series.cents        int64 array, shape (len(keys), len(weeks))
+  series.weekly(i)    {week_start: dollars} for series i (bowling_seasonality shape)
+
+Adjustment & refund rows are left out, so each series is product sales like
+bowling_seasonality.load_bowling_data.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from date_index import encode_dates
+from money import group_sum, row_cents, to_dollars
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSACTIONS_FILE = os.path.join(_ROOT, 'public', 'data', 'transactions.json')
+DEDUCTION_NAME = '[Adjustments & Refunds]'   # export_dashboards deduction rows
+
+LEVEL_FIELDS = {
+    'department': ('department',),
+    'category': ('department', 'category'),
+    'item': ('department', 'category', 'name'),
+}
+
+
+def load_rows(path=TRANSACTIONS_FILE):
+    """transactions.json rows (written by export_dashboards.py), or None when missing."""
+    if not os.path.isfile(path):
+        print(f'ERROR: {path} not found. Run export_dashboards.py first.')
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class WeeklySeries:
+    """Series labels, contiguous Monday week starts and a cents matrix."""
+
+    def __init__(self, level, keys, first_week, cents):
+        self.level = level
+        self.keys = keys
+        self.first_week = first_week
+        self.cents = cents
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def weeks(self):
+        return [datetime.fromordinal(self.first_week + 7 * i) for i in range(self.cents.shape[1])]
+
+    def label(self, i):
+        return ' / '.join(self.keys[i])
+
+    def weekly(self, i, trim=True):
+        """{week_start: dollars} for series i; trim drops weeks before its first sale."""
+        row = self.cents[i]
+        nonzero = np.flatnonzero(row)
+        start = int(nonzero[0]) if trim and len(nonzero) else 0
+        return {datetime.fromordinal(self.first_week + 7 * w): to_dollars(int(row[w]))
+                for w in range(start, len(row))}
+
+
+def weekly_revenue(rows, level='department'):
+    """
+    Sum rows into weekly revenue per LEVEL_FIELDS[level] key, in exact
+    cents. Rows without a valid date and adjustment rows are left out; weeks
+    with no sales are 0. Keys are sorted.
+    """
+    fields = LEVEL_FIELDS[level]
+    codes, days = encode_dates([r['date'] for r in rows])
+    keep = days.valid[codes] & np.array([r['name'] != DEDUCTION_NAME for r in rows], dtype=bool)
+    kept = np.flatnonzero(keep).tolist()
+    if not kept:
+        return WeeklySeries(level, [], 0, np.zeros((0, 0), dtype=np.int64))
+
+    key_of = [tuple(rows[i][f] for f in fields) for i in kept]
+    keys = sorted(set(key_of))
+    key_index = {k: i for i, k in enumerate(keys)}
+    series = np.array([key_index[k] for k in key_of], dtype=np.int64)
+
+    week_start = days.week_start[codes[kept]]
+    first = int(week_start.min())
+    n_weeks = (int(week_start.max()) - first) // 7 + 1
+    cell = series * n_weeks + (week_start - first) // 7
+    cents = group_sum(cell, [row_cents(rows[i]) for i in kept], len(keys) * n_weeks)
+    return WeeklySeries(level, keys, first, cents.reshape(len(keys), n_weeks))